@@ -1,5 +1,9 @@
 from flask import Blueprint, jsonify, request
-from backend.db_connection import db
+from backend.db_connection import db, streaming
+from backend.audit import audit
+from backend.cache import cache
+from backend.analytics.cube import attendance_cube
+from backend.events.telemetry import search_telemetry
 from mysql.connector import Error
 from flask import current_app
 
@@ -12,11 +16,16 @@ admin_routes = Blueprint('admin_routes', __name__)
 def get_audit_logs():
     """
     Return audit logs for authentication, event activity, and system actions.
-    Uses EventLog + Servers tables.
+    Uses EventLog + Servers tables. The JSON response holds the newest
+    500 entries; ?format=ndjson|csv streams the whole log.
     """
+    try:
+        fmt = streaming.requested_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     cursor = None
     try:
-        cursor = db.cursor(dictionary=True)
         query = """
             SELECT 
                 el.logID,
@@ -30,9 +39,12 @@ def get_audit_logs():
             FROM EventLog el
             LEFT JOIN Servers s ON el.serverID = s.serverID
             ORDER BY el.logTimestamp DESC
-            LIMIT 500
         """
-        cursor.execute(query)
+        if fmt:
+            return streaming.stream_response(query, fmt=fmt, filename="audit_logs")
+
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(query + " LIMIT 500")
         logs = cursor.fetchall()
         return jsonify(logs), 200
     except Error as e:
@@ -197,4 +209,57 @@ def get_system_metrics():
         return jsonify({"error": "Error fetching system metrics"}), 500
     finally:
         if cursor:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
+
+
+# GET /admin/db-pool
+@admin_routes.route('/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    """
+    Return connection pool statistics: size, utilization, and how long
+    requests have waited to check out a connection.
+    """
+    return jsonify(db.pool_stats()), 200
+
+
+
+# GET /admin/cache
+@admin_routes.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """
+    Return result cache hit/miss counters, overall and per endpoint.
+    """
+    return jsonify(cache.stats()), 200
+
+
+
+# GET /admin/audit-pipeline
+@admin_routes.route('/audit-pipeline', methods=['GET'])
+def get_audit_pipeline_stats():
+    """
+    Return Audit_Logs writer statistics: queue depth, rows written,
+    batch sizes, and rows dropped on a full queue or a failed write.
+    """
+    return jsonify(audit.stats()), 200
+
+
+
+# GET /admin/search-telemetry
+@admin_routes.route('/search-telemetry', methods=['GET'])
+def get_search_telemetry_stats():
+    """
+    Return search telemetry writer statistics: searches and clicks
+    recorded, searches written, pending records, and drops.
+    """
+    return jsonify(search_telemetry.stats()), 200
+
+
+
+# GET /admin/attendance-cube
+@admin_routes.route('/attendance-cube', methods=['GET'])
+def get_attendance_cube_stats():
+    """
+    Return the in-memory check-in store's size, memory use and budget,
+    and whether the demographics endpoints are being served from it.
+    """
+    return jsonify(attendance_cube.stats()), 200
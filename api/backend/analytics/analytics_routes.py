@@ -1,44 +1,41 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.cache import cache
+from backend.analytics import engagement, funnel, reports, sketches, underserved
+from backend.analytics.cube import attendance_cube
+from backend.events.search import event_search
 from pymysql import Error
 from flask import current_app
 from pymysql.cursors import DictCursor
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 analytics_routes = Blueprint("analytics_routes", __name__)
 
 
+def _exact():
+    """exact=true: count distinct students from raw check-ins instead of the day sketches."""
+    return request.args.get("exact", "false").lower() == "true"
+
+
+# GET /analytics/engagement/overview
+@analytics_routes.route("/engagement/overview", methods=["GET"])
+@cache.cached("analytics.engagement.overview", ttl=60, tags=("events", "attendance", "invitations", "students"))
+def get_engagement_overview():
+    try:
+        return jsonify(engagement.overview(exact=_exact())), 200
+    except Error as e:
+        current_app.logger.error(f"Error fetching engagement overview: {e}")
+        return jsonify({"error": "Error fetching engagement overview"}), 500
+
+
 # GET /analytics/engagement/current-metrics
 @analytics_routes.route("/engagement/current-metrics", methods=["GET"])
+@cache.cached("analytics.engagement.current-metrics", ttl=60, tags=("events", "attendance", "invitations"))
 def get_current_period_metrics():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        start_date_str = start_date.strftime('%Y-%m-%d %H:%M:%S')
-        
-        query = """
-            SELECT
-                COUNT(DISTINCT e.eventID) AS total_events,
-                (
-                    SELECT COUNT(DISTINCT invitationID)
-                    FROM Event_Invitations
-                    WHERE status = 'accepted'
-                      AND sentAt >= %s
-                ) AS total_rsvps,
-                COUNT(DISTINCT sea.attendanceID) AS total_checkins,
-                COUNT(DISTINCT sea.studentID) AS active_users
-            FROM Events e
-            LEFT JOIN Students_Event_Attendees sea 
-                ON e.eventID = sea.eventID 
-                AND sea.timestamp >= %s
-            WHERE e.startDateTime >= %s
-        """
-        
-        cursor.execute(query, (start_date_str, start_date_str, start_date_str))
-        result = cursor.fetchone()
+        result = engagement.period_comparison(cursor, exact=_exact())["current"]
         return jsonify(result), 200
     except Error as e:
         current_app.logger.error(f"Error fetching current metrics: {e}")
@@ -50,41 +47,12 @@ def get_current_period_metrics():
 
 # GET /analytics/engagement/previous-metrics
 @analytics_routes.route("/engagement/previous-metrics", methods=["GET"])
+@cache.cached("analytics.engagement.previous-metrics", ttl=600, tags=("events", "attendance", "invitations"))
 def get_previous_period_metrics():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-        
-        # 30-60 days ago
-        end_date = datetime.now() - timedelta(days=30)
-        start_date = datetime.now() - timedelta(days=60)
-
-        end_date_str = end_date.strftime('%Y-%m-%d %H:%M:%S')
-        start_date_str = start_date.strftime('%Y-%m-%d %H:%M:%S')
-        
-        query = """
-            SELECT
-                COUNT(DISTINCT e.eventID) AS total_events,
-                (
-                    SELECT COUNT(DISTINCT invitationID)
-                    FROM Event_Invitations
-                    WHERE status = 'accepted'
-                      AND sentAt >= %s
-                      AND sentAt < %s
-                ) AS total_rsvps,
-                COUNT(DISTINCT sea.attendanceID) AS total_checkins,
-                COUNT(DISTINCT sea.studentID) AS active_users
-            FROM Events e
-            LEFT JOIN Students_Event_Attendees sea 
-                ON e.eventID = sea.eventID 
-                AND sea.timestamp >= %s
-                AND sea.timestamp < %s
-            WHERE e.startDateTime >= %s
-              AND e.startDateTime < %s
-        """
-        
-        cursor.execute(query, (start_date_str, end_date_str, start_date_str, end_date_str, start_date_str, end_date_str))
-        result = cursor.fetchone()
+        result = engagement.period_comparison(cursor, exact=_exact())["previous"]
         return jsonify(result), 200
     except Error as e:
         current_app.logger.error(f"Error fetching previous metrics: {e}")
@@ -95,30 +63,12 @@ def get_previous_period_metrics():
 
 # GET /analytics/engagement/events-by-month
 @analytics_routes.route("/engagement/events-by-month", methods=["GET"])
+@cache.cached("analytics.engagement.events-by-month", ttl=600, tags=("events",))
 def get_events_by_month():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-        
-        # Last 6 months
-        start_date = datetime.now() - timedelta(days=180)
-        start_date_str = start_date.strftime('%Y-%m-%d')
-        
-        query = """
-            SELECT
-                DATE_FORMAT(startDateTime, '%%Y-%%m') AS month,
-                DATE_FORMAT(startDateTime, '%%M %%Y') AS month_name,
-                COUNT(DISTINCT eventID) AS event_count
-            FROM Events
-            WHERE DATE(startDateTime) >= %s
-            GROUP BY 
-                DATE_FORMAT(startDateTime, '%%Y-%%m'),
-                DATE_FORMAT(startDateTime, '%%M %%Y')
-            ORDER BY month ASC;
-        """
-        
-        cursor.execute(query, (start_date_str,))
-        rows = cursor.fetchall()
+        rows = engagement.events_by_month(cursor)
         return jsonify(rows), 200
     except Error as e:
         current_app.logger.error(f"Error fetching events by month: {e}")
@@ -129,34 +79,12 @@ def get_events_by_month():
 
 # GET /analytics/engagement/top-clubs
 @analytics_routes.route("/engagement/top-clubs", methods=["GET"])
+@cache.cached("analytics.engagement.top-clubs", ttl=120, tags=("events", "attendance"))
 def get_top_clubs_by_engagement():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-        
-        start_date = datetime.now() - timedelta(days=30)
-        
-        query = """
-            SELECT
-                c.clubID,
-                c.name AS club_name,
-                COUNT(DISTINCT sea.attendanceID) AS total_checkins,
-                COUNT(DISTINCT e.eventID) AS events_hosted,
-                COUNT(DISTINCT sea.studentID) AS unique_attendees
-            FROM Clubs c
-            JOIN Events e ON c.clubID = e.clubID
-            LEFT JOIN Students_Event_Attendees sea 
-                ON e.eventID = sea.eventID
-                AND sea.timestamp >= %s
-            WHERE e.startDateTime >= %s
-            GROUP BY c.clubID, c.name
-            HAVING events_hosted > 0
-            ORDER BY total_checkins DESC
-            LIMIT 10
-        """
-        
-        cursor.execute(query, (start_date, start_date))
-        rows = cursor.fetchall()
+        rows = engagement.top_clubs(cursor, exact=_exact())
         return jsonify(rows), 200
     except Error as e:
         current_app.logger.error(f"Error fetching top clubs: {e}")
@@ -167,27 +95,12 @@ def get_top_clubs_by_engagement():
 
 # GET /engagement/engagement-rate
 @analytics_routes.route("/engagement/engagement-rate", methods=["GET"])
+@cache.cached("analytics.engagement.engagement-rate", ttl=120, tags=("attendance", "students"))
 def get_engagement_rate():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-        
-        start_date = datetime.now() - timedelta(days=30)
-        
-        query = """
-            SELECT
-                COUNT(DISTINCT sea.studentID) AS active_students,
-                (SELECT COUNT(*) FROM Students) AS total_students,
-                ROUND(
-                    (COUNT(DISTINCT sea.studentID) / (SELECT COUNT(*) FROM Students)) * 100,
-                    2
-                ) AS engagement_rate
-            FROM Students_Event_Attendees sea
-            WHERE sea.timestamp >= %s
-        """
-        
-        cursor.execute(query, (start_date,))
-        result = cursor.fetchone()
+        result = engagement.engagement_rate(cursor, exact=_exact())
         return jsonify(result), 200
     except Error as e:
         current_app.logger.error(f"Error calculating engagement rate: {e}")
@@ -196,8 +109,90 @@ def get_engagement_rate():
         if cursor:
             cursor.close()
 
+# GET /analytics/active-students
+@analytics_routes.route("/active-students", methods=["GET"])
+@cache.cached("analytics.active-students", ttl=120, tags=("attendance", "students"))
+def get_active_students():
+    """
+    Distinct students who checked in over whole days: the last `days`
+    days (default 30) or from/to (ISO dates, to exclusive), overall or
+    per club or major (`by`). Estimated from the day sketches within
+    about `relative_error` (one standard error) unless exact=true.
+    """
+    scope = request.args.get("by", sketches.ALL)
+    if scope not in sketches.SCOPES:
+        return jsonify({"error": f"by must be one of: {', '.join(sketches.SCOPES)}"}), 400
+    try:
+        start = _parse_date(request.args.get("from"))
+        end = _parse_date(request.args.get("to"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if start is None:
+        start = datetime.now() - timedelta(days=request.args.get("days", 30, type=int) - 1)
+    exact = _exact()
+
+    cursor = None
+    try:
+        cursor = db.get_db().cursor(DictCursor)
+        count = sketches.exact_distinct_students if exact else sketches.distinct_students
+        counts = count(cursor, start, end, scope)
+        payload = {
+            "from": start.date().isoformat(),
+            "to": end.date().isoformat() if end else None,
+            "exact": exact,
+            "relative_error": 0.0 if exact else round(sketches.RELATIVE_ERROR, 4),
+        }
+        if scope == sketches.ALL:
+            payload["active_students"] = counts.get("", 0)
+        else:
+            payload[scope] = [{scope: key, "active_students": n}
+                              for key, n in sorted(counts.items(), key=lambda item: -item[1])]
+        return jsonify(payload), 200
+    except Exception as e:
+        current_app.logger.error(f"Error counting active students: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
+# GET /analytics/funnel
+@analytics_routes.route("/funnel", methods=["GET"])
+@cache.cached("analytics.funnel", ttl=300, tags=("searches", "rsvps", "attendance"))
+def get_funnel():
+    """
+    Search -> click -> RSVP -> check-in conversion per event, club or
+    search keyword (`by`, default event), over the last `days` finished
+    days (default 30) or from/to (ISO dates, both inclusive), summed
+    from the daily funnel. `limit` caps the rows (default 50).
+    """
+    by = request.args.get("by", "event")
+    if by not in funnel.GROUPS:
+        return jsonify({"error": f"by must be one of: {', '.join(funnel.GROUPS)}"}), 400
+    try:
+        first = _parse_date(request.args.get("from"))
+        last = _parse_date(request.args.get("to"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    last = last.date() if last else date.today() - timedelta(days=1)
+    first = first.date() if first else last - timedelta(days=request.args.get("days", 30, type=int) - 1)
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+
+    cursor = None
+    try:
+        funnel.catch_up()
+        cursor = db.get_db().cursor(DictCursor)
+        result = funnel.report(cursor, first, last, by, limit)
+        return jsonify({"from": first.isoformat(), "to": last.isoformat(), "by": by, **result}), 200
+    except Exception as e:
+        current_app.logger.error(f"Error computing funnel: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
 # GET /search/summary
 @analytics_routes.route("/search/summary", methods=["GET"])
+@cache.cached("analytics.search.summary", ttl=300, tags=("searches",))
 def get_search_summary():
     cursor = None
     try:
@@ -207,18 +202,14 @@ def get_search_summary():
         
         query = """
             SELECT
-                COUNT(*) as total_searches,
+                CAST(COALESCE(SUM(searches), 0) AS SIGNED) as total_searches,
                 COUNT(DISTINCT searchQuery) as unique_queries,
-                (SELECT COUNT(DISTINCT s.searchID) 
-                 FROM Searches s
-                 LEFT JOIN Searches_Search_Results ssr ON s.searchID = ssr.searchID
-                 WHERE DATE(s.timestamp) >= %s 
-                   AND ssr.resultID IS NULL) as no_result_searches
-            FROM Searches
-            WHERE DATE(timestamp) >= %s
+                CAST(COALESCE(SUM(noResults), 0) AS SIGNED) as no_result_searches
+            FROM Rollup_Search_Daily
+            WHERE day >= %s
         """
         
-        cursor.execute(query, (start_date, start_date))
+        cursor.execute(query, (start_date,))
         result = cursor.fetchone()
         return jsonify(result), 200
         
@@ -231,6 +222,7 @@ def get_search_summary():
 
 # GET /search/top-keywords
 @analytics_routes.route("/search/top-keywords", methods=["GET"])
+@cache.cached("analytics.search.top-keywords", ttl=300, tags=("searches",))
 def get_top_keywords():
     cursor = None
     try:
@@ -249,7 +241,7 @@ def get_top_keywords():
             FROM Searches s
             LEFT JOIN Searches_Search_Results ssr ON s.searchID = ssr.searchID
             LEFT JOIN Search_Result sr ON ssr.resultID = sr.resultID
-            WHERE DATE(s.timestamp) >= %s
+            WHERE s.timestamp >= %s
             GROUP BY s.searchQuery
             HAVING search_count > 0
             ORDER BY search_count DESC
@@ -269,6 +261,7 @@ def get_top_keywords():
 
 # GET /search/no-results
 @analytics_routes.route("/search/no-results", methods=["GET"])
+@cache.cached("analytics.search.no-results", ttl=300, tags=("searches",))
 def get_no_result_searches():
     cursor = None
     try:
@@ -278,13 +271,12 @@ def get_no_result_searches():
         
         query = """
             SELECT
-                s.searchQuery as query,
-                COUNT(*) as search_count
-            FROM Searches s
-            LEFT JOIN Searches_Search_Results ssr ON s.searchID = ssr.searchID
-            WHERE DATE(s.timestamp) >= %s
-              AND ssr.resultID IS NULL
-            GROUP BY s.searchQuery
+                searchQuery as query,
+                CAST(SUM(noResults) AS SIGNED) as search_count
+            FROM Rollup_Search_Daily
+            WHERE day >= %s
+            GROUP BY searchQuery
+            HAVING search_count > 0
             ORDER BY search_count DESC
             LIMIT 20
         """
@@ -300,14 +292,72 @@ def get_no_result_searches():
         if cursor:
             cursor.close()
 
+# GET /search/fuzzy
+@analytics_routes.route("/search/fuzzy", methods=["GET"])
+def get_fuzzy_search_stats():
+    """
+    Typo-fallback counters for /events/search since this API process started:
+    searches, fallbacks (exact search found too few events), rescued (the
+    fallback found more) and rescued_from_empty (it found some where exact
+    search found none), with fallback_rate and rescue_rate.
+    """
+    return jsonify(event_search.fuzzy_stats()), 200
+
+# GET /activity
+@analytics_routes.route("/activity", methods=["GET"])
+@cache.cached("analytics.activity", ttl=300, tags=("attendance", "students"))
+def get_activity():
+    """
+    Check-ins over the last `days` days (default 90) grouped by any of
+    year, major and category (`by`, comma-separated, default year),
+    summed from the daily demographic rollups.
+    """
+    groups = {"year": "r.year", "major": "r.major", "category": "cat.name"}
+    by = [g.strip() for g in request.args.get("by", "year").split(",") if g.strip()]
+    if not by or set(by) - set(groups):
+        return jsonify({"error": f"by must be a subset of: {', '.join(groups)}"}), 400
+    days = request.args.get("days", 90, type=int)
+
+    cursor = None
+    try:
+        cursor = db.get_db().cursor(DictCursor)
+        start_date = (datetime.now() - timedelta(days=days)).date()
+        columns = ", ".join(f"{groups[g]} AS {g}" for g in by)
+        query = f"""
+            SELECT {columns}, CAST(SUM(r.attendance) AS SIGNED) AS total_attendance
+            FROM Rollup_Demographic_Daily r
+            LEFT JOIN Categories cat ON cat.categoryID = r.categoryID
+            WHERE r.day >= %s
+            GROUP BY {", ".join(groups[g] for g in by)}
+            ORDER BY total_attendance DESC
+        """
+        cursor.execute(query, (start_date,))
+        rows = cursor.fetchall()
+        for row in rows:
+            # unknown values are stored as 0 / '' in the rollup key
+            if "year" in row and not row["year"]:
+                row["year"] = None
+            if "major" in row and not row["major"]:
+                row["major"] = None
+        return jsonify(rows), 200
+    except Exception as e:
+        current_app.logger.error(f"Error fetching activity: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
 # GET /demographics/by-year
 @analytics_routes.route("/demographics/by-year", methods=["GET"])
+@cache.cached("analytics.demographics.by-year", ttl=300, tags=("attendance", "students"))
 def get_engagement_by_year():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
         
         start_date = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
+        if attendance_cube.ensure_fresh(cursor):
+            return jsonify(attendance_cube.by_year(datetime.strptime(start_date, '%Y-%m-%d'))), 200
         
         query = """
             SELECT 
@@ -341,12 +391,15 @@ def get_engagement_by_year():
 
 # GET /demographics/by-major
 @analytics_routes.route("/demographics/by-major", methods=["GET"])
+@cache.cached("analytics.demographics.by-major", ttl=300, tags=("attendance", "students"))
 def get_engagement_by_major():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
         
         start_date = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
+        if attendance_cube.ensure_fresh(cursor):
+            return jsonify(attendance_cube.by_major(datetime.strptime(start_date, '%Y-%m-%d'))), 200
         
         query = """
             SELECT 
@@ -387,12 +440,15 @@ def get_engagement_by_major():
 
 # GET /demographics/event-preferences
 @analytics_routes.route("/demographics/event-preferences", methods=["GET"])
+@cache.cached("analytics.demographics.event-preferences", ttl=300, tags=("attendance", "students", "events"))
 def get_event_preferences_by_demographic():
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
         
         start_date = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
+        if attendance_cube.ensure_fresh(cursor):
+            return jsonify(attendance_cube.event_preferences(datetime.strptime(start_date, '%Y-%m-%d'))), 200
         
         query = """
             SELECT 
@@ -425,48 +481,34 @@ def get_event_preferences_by_demographic():
 
 # GET /demographics/underserved
 @analytics_routes.route("/demographics/underserved", methods=["GET"])
+@cache.cached("analytics.demographics.underserved", ttl=300, tags=("attendance", "students"))
 def get_underserved_populations():
-    """Identify demographics with low engagement"""
+    """
+    Identify (major, year) cohorts with below-average participation.
+
+    Query params:
+        days        window length ending now (default 90), ignored with from
+        from, to    explicit window (ISO dates, to exclusive)
+        min_cohort  leave out cohorts with fewer students (default 1)
+        confidence  level of the ci_low / ci_high interval (default 0.95)
+    """
+    try:
+        start = _parse_date(request.args.get("from"))
+        end = _parse_date(request.args.get("to"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if start is None:
+        start = datetime.combine((datetime.now() - timedelta(days=request.args.get("days", 90, type=int))).date(),
+                                 datetime.min.time())
+    min_cohort = request.args.get("min_cohort", 1, type=int)
+    confidence = request.args.get("confidence", 0.95, type=float)
+    if min_cohort < 1 or not 0 < confidence < 1:
+        return jsonify({"error": "min_cohort must be at least 1 and confidence between 0 and 1"}), 400
+
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-        
-        start_date = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
-        
-        query = """
-            SELECT 
-                s.major,
-                s.year,
-                COUNT(DISTINCT s.studentID) as total_students,
-                COUNT(DISTINCT sea.studentID) as active_students,
-                ROUND(
-                    COUNT(DISTINCT sea.studentID) * 100.0 / COUNT(DISTINCT s.studentID),
-                    1
-                ) as participation_rate,
-                (SELECT AVG(participation_rate)
-                 FROM (
-                     SELECT 
-                         COUNT(DISTINCT sea2.studentID) * 100.0 / COUNT(DISTINCT s2.studentID) as participation_rate
-                     FROM Students s2
-                     LEFT JOIN Students_Event_Attendees sea2 
-                         ON s2.studentID = sea2.studentID
-                         AND sea2.timestamp >= %s
-                     GROUP BY s2.major, s2.year
-                 ) as avg_calc
-                ) as overall_avg_rate
-            FROM Students s
-            LEFT JOIN Students_Event_Attendees sea 
-                ON s.studentID = sea.studentID
-                AND sea.timestamp >= %s
-            GROUP BY s.major, s.year
-            HAVING participation_rate < overall_avg_rate
-            ORDER BY participation_rate ASC
-        """
-        
-        cursor.execute(query, (start_date, start_date))
-        rows = cursor.fetchall()
-        return jsonify(rows), 200
-        
+        return jsonify(underserved.underserved(cursor, start, end, min_cohort, confidence)), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching underserved populations: {e}")
         return jsonify({"error": str(e)}), 500
@@ -475,9 +517,18 @@ def get_underserved_populations():
             cursor.close()
 
 
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
 
 # GET /reports
 @analytics_routes.route("/reports", methods=["GET"])
+@cache.cached("analytics.reports", ttl=600, tags=("reports",))
 def get_engagement_reports():
     """
     Return generated engagement reports.
@@ -512,8 +563,8 @@ def get_engagement_reports():
             LIMIT 50;
         """
         cursor.execute(query)
-        reports = cursor.fetchall()
-        return jsonify(reports), 200
+        rows = cursor.fetchall()
+        return jsonify(rows), 200
     except Error as e:
         current_app.logger.error(f"Error fetching engagement reports: {e}")
         return jsonify({"error": "Error fetching engagement reports"}), 500
@@ -529,76 +580,21 @@ def generate_weekly_engagement_report():
     """
     Generate and save a weekly engagement report.
 
-    It summarizes the last 7 days of activity in audit_logs
-    into a single row in engagement_reports.
+    Summarizes the last 7 days of activity in Audit_Logs into one row
+    of Engagement_Reports; re-running it for the same week updates that
+    row. Older weeks are backfilled with `python -m backend.analytics.reports`.
     """
     cursor = None
     try:
         cursor = db.get_db().cursor(DictCursor)
-
-        # Calculate dates in Python
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        
-        end_date_str = end_date.strftime('%Y-%m-%d')
-        start_date_str = start_date.strftime('%Y-%m-%d')
-
-        insert_query = """
-            INSERT INTO Engagement_Reports 
-                (reportPeriodStart,
-                 reportPeriodEnd,
-                 totalActiveUsers,
-                 totalEventsCreated,
-                 totalRSVPs,
-                 totalAttendance,
-                 totalSearches,
-                 generatedAt)
-            VALUES (
-                %s,
-                %s,
-                (SELECT COUNT(DISTINCT userID) 
-                 FROM Audit_Logs 
-                 WHERE actionType IN ('login', 'event_view', 'search')
-                   AND timestamp >= %s
-                   AND timestamp < %s),
-                (SELECT COUNT(DISTINCT entityID) 
-                 FROM Audit_Logs 
-                 WHERE actionType = 'event_created'
-                   AND timestamp >= %s
-                   AND timestamp < %s),
-                (SELECT COUNT(DISTINCT logID) 
-                 FROM Audit_Logs 
-                 WHERE actionType = 'rsvp_created'
-                   AND timestamp >= %s
-                   AND timestamp < %s),
-                (SELECT COUNT(DISTINCT logID) 
-                 FROM Audit_Logs 
-                 WHERE actionType = 'check_in'
-                   AND timestamp >= %s
-                   AND timestamp < %s),
-                (SELECT COUNT(DISTINCT logID) 
-                 FROM Audit_Logs 
-                 WHERE actionType = 'search'
-                   AND timestamp >= %s
-                   AND timestamp < %s),
-                NOW()
-            )
-        """
-
-        cursor.execute(insert_query, (
-            start_date_str, end_date_str,  # reportPeriodStart, reportPeriodEnd
-            start_date_str, end_date_str,  # totalActiveUsers
-            start_date_str, end_date_str,  # totalEventsCreated
-            start_date_str, end_date_str,  # totalRSVPs
-            start_date_str, end_date_str,  # totalAttendance
-            start_date_str, end_date_str   # totalSearches
-        ))
+        report = reports.generate(cursor, reports.periods_ending(date.today(), 1))[0]
         db.commit()
+        cache.invalidate("reports")
 
-        return jsonify({"message": "Weekly engagement report generated"}), 201
+        return jsonify({"message": "Weekly engagement report generated", "report": report}), 201
     except Error as e:
         current_app.logger.error(f"Error generating engagement report: {e}")
         return jsonify({"error": "Error generating engagement report"}), 500
     finally:
         if cursor:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
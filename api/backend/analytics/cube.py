@@ -0,0 +1,347 @@
+#------------------------------------------------------------
+# In-process columnar store of event check-ins for the demographics
+# endpoints.
+#
+# Every Students_Event_Attendees row is one position in a set of NumPy
+# columns: student number, eventID, clubID and category code (int32)
+# and the check-in time in seconds (int64). Students get dense numbers
+# with their year and major codes in two more columns, so a row's year
+# or major is a gather through its student number, and a change to a
+# student does not touch the attendance columns. A report selects its
+# window with one vectorized time comparison and then groups with
+# np.bincount, counting distinct students with np.unique over
+# (group, student) keys, instead of re-joining Students x attendance x
+# Events x Clubs x Categories with COUNT(DISTINCT) in MySQL.
+#
+# Refresh is incremental: every check_seconds the rows past the last
+# attendanceID are appended (and any new students added). A full
+# reload runs every rebuild_seconds, which also picks up changed
+# students and clubs, or when rows disappeared behind the cube's back.
+# The columns never grow past ATTENDANCE_CUBE_MAX_MB; a cube that would
+# is switched off and the endpoints answer from SQL again.
+#------------------------------------------------------------
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+LOAD_BATCH = 50000
+NO_TIME = np.iinfo(np.int64).min
+# int32 student/event/club/category columns plus the int64 time column
+ROW_BYTES = 4 * 4 + 8
+# distinct counts use a (group x student) bitmap up to this many cells, np.unique beyond
+BITMAP_LIMIT = 1 << 24
+
+
+def _seconds(moment):
+    """Naive datetime -> seconds since 1970, in the same wall-clock time as the DB."""
+    return int((moment - EPOCH).total_seconds())
+
+
+def _sort_key(value):
+    return (value is not None, value if value is not None else 0)
+
+
+class AttendanceCube:
+    """Check-in columns for vectorized group-bys, appended to every check_seconds."""
+
+    ATTENDANCE = """
+        SELECT sea.attendanceID, sea.studentID, sea.eventID,
+               COALESCE(e.clubID, -1) AS clubID, COALESCE(c.categoryID, -1) AS categoryID,
+               TIMESTAMPDIFF(SECOND, '1970-01-01', sea.timestamp) AS seconds
+        FROM Students_Event_Attendees sea
+        JOIN Events e ON e.eventID = sea.eventID
+        LEFT JOIN Clubs c ON c.clubID = e.clubID
+        WHERE sea.attendanceID > %s
+        ORDER BY sea.attendanceID
+        LIMIT %s
+    """
+
+    def __init__(self, rebuild_seconds=3600, check_seconds=30, max_bytes=256 << 20):
+        self.enabled = True
+        self.rebuild_seconds = rebuild_seconds
+        self.check_seconds = check_seconds
+        self.max_bytes = max_bytes
+        self.logger = None
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._checked_at = None
+        self._over_budget = False
+        self._clear()
+
+    def init_app(self, app):
+        app.config.setdefault("ATTENDANCE_CUBE_ENABLED", True)
+        app.config.setdefault("ATTENDANCE_CUBE_MAX_MB", 256)
+        self.enabled = bool(app.config["ATTENDANCE_CUBE_ENABLED"])
+        self.max_bytes = int(app.config["ATTENDANCE_CUBE_MAX_MB"]) << 20
+        self.logger = app.logger
+
+    def _clear(self):
+        self._rows = 0
+        self._last_id = 0
+        self._columns = {
+            "student": np.zeros(0, dtype=np.int32),
+            "event": np.zeros(0, dtype=np.int32),
+            "club": np.zeros(0, dtype=np.int32),
+            "category": np.zeros(0, dtype=np.int32),
+            "seconds": np.zeros(0, dtype=np.int64),
+        }
+        # students, by dense number
+        self._student_ids = np.zeros(0, dtype=np.int64)
+        self._student_year = np.zeros(0, dtype=np.int32)
+        self._student_major = np.zeros(0, dtype=np.int32)
+        self._student_sorted = np.zeros(0, dtype=np.int64)   # studentIDs, ascending
+        self._student_order = np.zeros(0, dtype=np.int64)    # their dense numbers
+        self._years, self._year_codes = [], {}
+        self._majors, self._major_codes = [], {}
+        self._categories, self._category_codes = [], {}
+
+    def __len__(self):
+        return self._rows
+
+    # building --------------------------------------------------------------
+
+    def ensure_fresh(self, cursor):
+        """Bring the cube up to date. False when it is disabled or over its memory budget."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at >= self.rebuild_seconds:
+                self.load(cursor)
+            elif now - self._checked_at >= self.check_seconds:
+                self._append(cursor)
+            return not self._over_budget
+
+    def load(self, cursor):
+        """Full build from every check-in."""
+        with self._lock:
+            self._clear()
+            self._over_budget = False
+            cursor.execute("SELECT categoryID, name FROM Categories")
+            for row in cursor.fetchall():
+                self._category_codes[row["categoryID"]] = len(self._categories)
+                self._categories.append(row["name"])
+            self._add_students(cursor, None)
+            self._read_rows(cursor)
+            self._loaded_at = self._checked_at = time.monotonic()
+
+    def _append(self, cursor):
+        cursor.execute("SELECT COUNT(*) AS n, COALESCE(MAX(attendanceID), 0) AS last FROM Students_Event_Attendees")
+        row = cursor.fetchone()
+        self._checked_at = time.monotonic()
+        if row["last"] < self._last_id or row["n"] < self._rows:
+            self.load(cursor)  # rows were deleted
+            return
+        self._read_rows(cursor)
+
+    def _read_rows(self, cursor):
+        while not self._over_budget:
+            cursor.execute(self.ATTENDANCE, (self._last_id, LOAD_BATCH))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            self._put(cursor, rows)
+            if self._over_budget:
+                break
+            self._last_id = rows[-1]["attendanceID"]
+            if len(rows) < LOAD_BATCH:
+                break
+
+    def _put(self, cursor, rows):
+        student_ids = np.fromiter((r["studentID"] for r in rows), dtype=np.int64, count=len(rows))
+        numbers = self._student_numbers(student_ids)
+        if (numbers < 0).any():
+            self._add_students(cursor, np.unique(student_ids[numbers < 0]).tolist())
+            numbers = self._student_numbers(student_ids)
+        keep = numbers >= 0  # a student deleted since the rows were read
+        n = int(keep.sum())
+        if not self._grow(self._rows + n):
+            return
+
+        def column(values, dtype):
+            return np.fromiter(values, dtype=dtype, count=len(rows))[keep]
+
+        end = self._rows + n
+        columns = self._columns
+        columns["student"][self._rows:end] = numbers[keep]
+        columns["event"][self._rows:end] = column((r["eventID"] for r in rows), np.int32)
+        columns["club"][self._rows:end] = column((r["clubID"] for r in rows), np.int32)
+        columns["category"][self._rows:end] = column(
+            (self._category_codes.get(r["categoryID"], -1) for r in rows), np.int32)
+        columns["seconds"][self._rows:end] = column(
+            (NO_TIME if r["seconds"] is None else r["seconds"] for r in rows), np.int64)
+        self._rows = end
+
+    def _grow(self, size):
+        """Make room for `size` rows within the memory budget. False (and switched off) if it can't."""
+        capacity = len(self._columns["seconds"])
+        if size <= capacity:
+            return True
+        if size * ROW_BYTES > self.max_bytes:
+            self._over_budget = True
+            self._clear()
+            if self.logger:
+                self.logger.warning(
+                    f"AttendanceCube: {size} check-ins exceed {self.max_bytes >> 20} MB; "
+                    "demographics are served from SQL"
+                )
+            return False
+        capacity = min(max(size, 2 * capacity, 1024), self.max_bytes // ROW_BYTES)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._rows] = column[:self._rows]
+            self._columns[name] = grown
+        return True
+
+    def _add_students(self, cursor, student_ids):
+        """Give dense numbers to every student, or only to student_ids."""
+        if student_ids is None:
+            cursor.execute("SELECT studentID, year, major FROM Students")
+        else:
+            cursor.execute(f"SELECT studentID, year, major FROM Students WHERE studentID IN "
+                           f"({', '.join(['%s'] * len(student_ids))})", student_ids)
+        rows = cursor.fetchall()
+        ids = np.fromiter((r["studentID"] for r in rows), dtype=np.int64, count=len(rows))
+        years = np.fromiter((self._code(self._years, self._year_codes, r["year"]) for r in rows),
+                            dtype=np.int32, count=len(rows))
+        majors = np.fromiter((self._code(self._majors, self._major_codes, r["major"]) for r in rows),
+                             dtype=np.int32, count=len(rows))
+        self._student_ids = np.concatenate((self._student_ids, ids))
+        self._student_year = np.concatenate((self._student_year, years))
+        self._student_major = np.concatenate((self._student_major, majors))
+        self._student_order = np.argsort(self._student_ids, kind="stable")
+        self._student_sorted = self._student_ids[self._student_order]
+
+    @staticmethod
+    def _code(values, codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _student_numbers(self, student_ids):
+        """Dense numbers for studentIDs, -1 for students the cube does not know yet."""
+        if not len(self._student_sorted):
+            return np.full(len(student_ids), -1, dtype=np.int64)
+        positions = np.searchsorted(self._student_sorted, student_ids)
+        positions[positions >= len(self._student_sorted)] = 0
+        found = self._student_sorted[positions] == student_ids
+        return np.where(found, self._student_order[positions], -1)
+
+    # querying ---------------------------------------------------------------
+
+    def _window(self, start, end, names):
+        """The `names` columns of the check-ins in [start, end), plus the student columns."""
+        with self._lock:
+            rows = self._rows
+            columns = {name: self._columns[name][:rows] for name in names + ("seconds",)}
+            students = (self._student_year, self._student_major)
+            labels = (list(self._years), list(self._majors), list(self._categories))
+        mask = np.ones(rows, dtype=bool)
+        if start is not None:
+            mask &= columns["seconds"] >= _seconds(start)
+        if end is not None:
+            mask &= columns["seconds"] < _seconds(end)
+        positions = np.flatnonzero(mask)
+        selected = {name: columns[name].take(positions) for name in names}
+        return selected, students, labels
+
+    @staticmethod
+    def _distinct(groups, student, size, students):
+        """Distinct students per group code (student numbers are < students)."""
+        keys = groups.astype(np.int64) * students + student
+        if size * students <= BITMAP_LIMIT:
+            seen = np.zeros(size * students, dtype=bool)
+            seen[keys] = True
+            return seen.reshape(size, students).sum(axis=1)
+        return np.bincount(np.unique(keys) // students, minlength=size)
+
+    def _participation(self, selected, student_codes, size):
+        """(total students, active students, check-ins) per code of one student column."""
+        groups = student_codes[selected["student"]]
+        return (np.bincount(student_codes, minlength=size),
+                self._distinct(groups, selected["student"], size, len(student_codes)),
+                np.bincount(groups, minlength=size))
+
+    def by_year(self, start=None, end=None):
+        selected, (years, _), (year_labels, _, _) = self._window(start, end, ("student",))
+        total, active, attendance = (a.tolist() for a in self._participation(selected, years, len(year_labels)))
+        rows = [{
+            "year": year_labels[code],
+            "total_students": total[code],
+            "active_students": active[code],
+            "total_attendance": attendance[code],
+            "participation_rate": round(active[code] * 100.0 / total[code], 1),
+        } for code in range(len(year_labels)) if total[code]]
+        return sorted(rows, key=lambda r: _sort_key(r["year"]))
+
+    def by_major(self, start=None, end=None):
+        selected, (_, majors), (_, major_labels, _) = self._window(start, end, ("student",))
+        total, active, attendance = (a.tolist() for a in self._participation(selected, majors, len(major_labels)))
+        rows = [{
+            "major": major_labels[code],
+            "total_students": total[code],
+            "active_students": active[code],
+            "total_attendance": attendance[code],
+            "avg_attendance_per_student": round(attendance[code] / active[code], 1) if active[code] else None,
+            "participation_rate": round(active[code] * 100.0 / total[code], 1),
+        } for code in range(len(major_labels)) if total[code]]
+        return sorted(rows, key=lambda r: -r["participation_rate"])
+
+    def event_preferences(self, start=None, end=None):
+        selected, (years, majors), (year_labels, major_labels, category_labels) = \
+            self._window(start, end, ("student", "category"))
+        known = selected["category"] >= 0
+        student = selected["student"][known]
+        n_years, n_categories = len(year_labels), len(category_labels)
+        groups = ((majors[student].astype(np.int64) * n_years + years[student]) * n_categories
+                  + selected["category"][known])
+        size = len(major_labels) * n_years * n_categories
+        codes, attendance = np.unique(groups, return_counts=True)
+        unique = self._distinct(groups, student, size, len(years))[codes]
+
+        rows = []
+        for code, count, students in zip(codes.tolist(), attendance.tolist(), unique.tolist()):
+            major_year, category = divmod(code, n_categories)
+            major, year = divmod(major_year, n_years)
+            rows.append({
+                "major": major_labels[major],
+                "year": year_labels[year],
+                "category_name": category_labels[category],
+                "attendance_count": count,
+                "unique_students": students,
+            })
+        return sorted(rows, key=lambda r: (_sort_key(r["major"]), -r["attendance_count"]))
+
+    def participation(self, start=None, end=None):
+        """Total and active students per (major, year) cohort."""
+        selected, (years, majors), (year_labels, major_labels, _) = self._window(start, end, ("student",))
+        n_years = len(year_labels)
+        cohorts = majors.astype(np.int64) * n_years + years
+        size = len(major_labels) * n_years
+        total, active, _ = self._participation(selected, cohorts, size)
+        return [{
+            "major": major_labels[code // n_years],
+            "year": year_labels[code % n_years],
+            "total_students": int(total[code]),
+            "active_students": int(active[code]),
+        } for code in np.flatnonzero(total).tolist()]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "over_budget": self._over_budget,
+                "rows": self._rows,
+                "students": len(self._student_ids),
+                "bytes": sum(column.nbytes for column in self._columns.values()),
+                "max_bytes": self.max_bytes,
+                "last_attendance_id": self._last_id,
+            }
+
+
+attendance_cube = AttendanceCube()
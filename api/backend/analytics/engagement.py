@@ -0,0 +1,242 @@
+#------------------------------------------------------------
+# Engagement dashboard queries.
+#
+# Each section takes a cursor and returns a JSON-ready payload, so the
+# single-purpose /engagement/* routes and the combined
+# /engagement/overview route share the same SQL.
+#------------------------------------------------------------
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from pymysql.cursors import DictCursor
+
+from backend.analytics import rollups, sketches
+from backend.db_connection import db
+
+# Sections run concurrently, each on its own pooled connection.
+OVERVIEW_WORKERS = 4
+_executor = ThreadPoolExecutor(max_workers=OVERVIEW_WORKERS,
+                               thread_name_prefix="engagement-overview")
+
+
+# exact active users: students who checked in to an event of the period
+EXACT_ACTIVE_USERS = """,
+                COUNT(DISTINCT CASE WHEN e.startDateTime >= %(cur)s AND sea.timestamp >= %(cur)s
+                    THEN sea.studentID END) AS current_active_users,
+                COUNT(DISTINCT CASE WHEN e.startDateTime < %(cur)s AND sea.timestamp < %(cur)s
+                    THEN sea.studentID END) AS previous_active_users"""
+
+
+def period_comparison(cursor, now=None, exact=False):
+    """
+    Metrics for the last 30 days and the 30 days before that, from one
+    conditional-aggregation pass over the 60-day window. Active users
+    are estimated from the day sketches (students who checked in during
+    the period's days) unless `exact`.
+    """
+    now = now or datetime.now()
+    current_start = now - timedelta(days=30)
+    previous_start = now - timedelta(days=60)
+
+    query = """
+        SELECT
+            activity.*,
+            invites.current_rsvps,
+            invites.previous_rsvps
+        FROM (
+            SELECT
+                COUNT(DISTINCT CASE WHEN e.startDateTime >= %(cur)s
+                    THEN e.eventID END) AS current_events,
+                COUNT(DISTINCT CASE WHEN e.startDateTime < %(cur)s
+                    THEN e.eventID END) AS previous_events,
+                COUNT(DISTINCT CASE WHEN e.startDateTime >= %(cur)s AND sea.timestamp >= %(cur)s
+                    THEN sea.attendanceID END) AS current_checkins,
+                COUNT(DISTINCT CASE WHEN e.startDateTime < %(cur)s AND sea.timestamp < %(cur)s
+                    THEN sea.attendanceID END) AS previous_checkins{active_users}
+            FROM Events e
+            LEFT JOIN Students_Event_Attendees sea
+                ON e.eventID = sea.eventID
+                AND sea.timestamp >= %(prev)s
+            WHERE e.startDateTime >= %(prev)s
+        ) AS activity
+        CROSS JOIN (
+            SELECT
+                COALESCE(SUM(sentAt >= %(cur)s), 0) AS current_rsvps,
+                COALESCE(SUM(sentAt < %(cur)s), 0) AS previous_rsvps
+            FROM Event_Invitations
+            WHERE status = 'accepted'
+              AND sentAt >= %(prev)s
+        ) AS invites
+    """
+    cursor.execute(query.format(active_users=EXACT_ACTIVE_USERS if exact else ""),
+                   {"cur": current_start, "prev": previous_start})
+    row = cursor.fetchone() or {}
+    if not exact:
+        row["current_active_users"] = sketches.distinct_students(cursor, current_start).get("", 0)
+        row["previous_active_users"] = sketches.distinct_students(cursor, previous_start, current_start).get("", 0)
+
+    def period(prefix):
+        return {
+            "total_events": row.get(f"{prefix}_events", 0),
+            "total_rsvps": int(row.get(f"{prefix}_rsvps") or 0),
+            "total_checkins": row.get(f"{prefix}_checkins", 0),
+            "active_users": row.get(f"{prefix}_active_users", 0),
+        }
+
+    return {"current": period("current"), "previous": period("previous")}
+
+
+def events_by_month(cursor, now=None):
+    """Events per month over the last 6 months."""
+    now = now or datetime.now()
+    start_date_str = (now - timedelta(days=180)).strftime('%Y-%m-%d')
+
+    query = """
+        SELECT
+            DATE_FORMAT(startDateTime, '%%Y-%%m') AS month,
+            DATE_FORMAT(startDateTime, '%%M %%Y') AS month_name,
+            COUNT(DISTINCT eventID) AS event_count
+        FROM Events
+        WHERE startDateTime >= %s
+        GROUP BY
+            DATE_FORMAT(startDateTime, '%%Y-%%m'),
+            DATE_FORMAT(startDateTime, '%%M %%Y')
+        ORDER BY month ASC;
+    """
+    cursor.execute(query, (start_date_str,))
+    return cursor.fetchall()
+
+
+def top_clubs(cursor, now=None, exact=False):
+    """
+    Top 10 clubs by check-ins over the last 30 days. Check-ins come from
+    the hourly rollups; unique attendees are estimated from the club day
+    sketches, or counted for those 10 clubs if `exact`.
+    """
+    now = now or datetime.now()
+    start_date = now - timedelta(days=30)
+
+    query = """
+        SELECT
+            c.clubID,
+            c.name AS club_name,
+            CAST(COALESCE(SUM(h.attendance), 0) AS SIGNED) AS total_checkins,
+            COUNT(*) AS events_hosted
+        FROM Clubs c
+        JOIN Events e ON c.clubID = e.clubID
+        LEFT JOIN (
+            SELECT eventID, SUM(attendance) AS attendance
+            FROM Rollup_Event_Hourly
+            WHERE hour >= %s
+            GROUP BY eventID
+        ) h ON e.eventID = h.eventID
+        WHERE e.startDateTime >= %s
+        GROUP BY c.clubID, c.name
+        ORDER BY total_checkins DESC
+        LIMIT 10
+    """
+    cursor.execute(query, (rollups.hour_of(start_date), start_date))
+    clubs = cursor.fetchall()
+    if not clubs:
+        return clubs
+
+    club_ids = [club["clubID"] for club in clubs]
+    if not exact:
+        unique = sketches.distinct_students(cursor, start_date, scope=sketches.CLUB, keys=club_ids)
+        for club in clubs:
+            club["unique_attendees"] = unique.get(str(club["clubID"]), 0)
+        return clubs
+
+    cursor.execute(f"""
+        SELECT e.clubID, COUNT(DISTINCT sea.studentID) AS unique_attendees
+        FROM Events e
+        JOIN Students_Event_Attendees sea ON e.eventID = sea.eventID
+        WHERE e.clubID IN ({', '.join(['%s'] * len(club_ids))})
+          AND e.startDateTime >= %s
+          AND sea.timestamp >= %s
+        GROUP BY e.clubID
+    """, club_ids + [start_date, start_date])
+    unique = {row["clubID"]: row["unique_attendees"] for row in cursor.fetchall()}
+    for club in clubs:
+        club["unique_attendees"] = unique.get(club["clubID"], 0)
+    return clubs
+
+
+def engagement_rate(cursor, now=None, exact=False):
+    """
+    Share of all students who checked in to something in the last 30
+    days, estimated from the day sketches unless `exact`.
+    """
+    now = now or datetime.now()
+    start_date = now - timedelta(days=30)
+
+    if not exact:
+        cursor.execute("SELECT COUNT(*) AS total_students FROM Students")
+        total = cursor.fetchone()["total_students"]
+        active = sketches.distinct_students(cursor, start_date).get("", 0)
+        return {
+            "active_students": active,
+            "total_students": total,
+            "engagement_rate": round(active * 100 / total, 2) if total else None,
+        }
+
+    query = """
+        SELECT
+            COUNT(DISTINCT sea.studentID) AS active_students,
+            (SELECT COUNT(*) FROM Students) AS total_students,
+            ROUND(
+                (COUNT(DISTINCT sea.studentID) / (SELECT COUNT(*) FROM Students)) * 100,
+                2
+            ) AS engagement_rate
+        FROM Students_Event_Attendees sea
+        WHERE sea.timestamp >= %s
+    """
+    cursor.execute(query, (start_date,))
+    return cursor.fetchone()
+
+
+OVERVIEW_SECTIONS = {
+    "periods": period_comparison,
+    "events_by_month": events_by_month,
+    "top_clubs": top_clubs,
+    "engagement_rate": engagement_rate,
+}
+
+
+# sections that estimate distinct students unless asked for exact counts
+SKETCHED_SECTIONS = (period_comparison, top_clubs, engagement_rate)
+
+
+def _run_section(section, now, exact):
+    started = time.perf_counter()
+    with db.connection() as conn:
+        with conn.cursor(DictCursor) as cursor:
+            if section in SKETCHED_SECTIONS:
+                result = section(cursor, now, exact)
+            else:
+                result = section(cursor, now)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def overview(now=None, exact=False):
+    """Run every dashboard section concurrently and combine the results."""
+    now = now or datetime.now()
+    started = time.perf_counter()
+    futures = {name: _executor.submit(_run_section, section, now, exact)
+               for name, section in OVERVIEW_SECTIONS.items()}
+
+    results, timings = {}, {}
+    for name, future in futures.items():
+        results[name], elapsed = future.result()
+        timings[name] = round(elapsed, 2)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+
+    return {
+        "current_metrics": results["periods"]["current"],
+        "previous_metrics": results["periods"]["previous"],
+        "events_by_month": results["events_by_month"],
+        "top_clubs": results["top_clubs"],
+        "engagement_rate": results["engagement_rate"],
+        "timings_ms": timings,
+    }
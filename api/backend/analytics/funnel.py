@@ -0,0 +1,355 @@
+#------------------------------------------------------------
+# Discovery funnel: search -> result click -> RSVP -> check-in.
+#
+# The four stages live in four tables (Searches with the events each
+# search showed, Search_Clicks, RSVPs and Students_Event_Attendees).
+# Each is read in time order, PAGE_SIZE rows at a time, and the four
+# streams are combined with heapq.merge, so only one page per source
+# is in memory. Walking the merged stream, a student's journey to an
+# event starts when a search shows it to them and only moves on one
+# stage at a time: a click counts if it follows an impression, an RSVP
+# if it follows a click, a check-in if it follows an RSVP. Each step
+# is credited to the search query that started the journey. Journeys
+# idle for ATTRIBUTION_DAYS are dropped, and at most MAX_JOURNEYS are
+# kept, oldest dropped first.
+#
+# Counts are stored per day, event and query in Funnel_Daily (see
+# migration 011) by the day each step happened, so any window is a sum
+# of day rows. Days are materialized once they are over; to rebuild
+# day D the stream starts ATTRIBUTION_DAYS earlier so journeys already
+# underway are known. Only finished days are served. A read catches up
+# at most CATCH_UP_DAYS day itself; longer gaps are filled by the CLI.
+#
+#     python -m backend.analytics.funnel                  # catch up to yesterday
+#     python -m backend.analytics.funnel --from 2025-09-01 [--to 2025-10-01]
+#------------------------------------------------------------
+import argparse
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from pymysql.cursors import DictCursor
+from pymysql.err import OperationalError
+
+from backend.db_connection import db
+
+PAGE_SIZE = 5000
+ATTRIBUTION_DAYS = 14
+MAX_JOURNEYS = 200000
+CATCH_UP_INTERVAL = 300
+# a catch-up inside a request materializes at most this many days;
+# the CLI fills in the rest
+CATCH_UP_DAYS = 1
+# with no watermark yet, the CLI starts this many days back
+START_DAYS = 7
+WATERMARK = "funnel_days"
+
+IMPRESSION, CLICK, RSVP, CHECKIN = range(4)
+STAGES = ("impressions", "clicks", "rsvps", "checkins")
+
+# MySQL's error for a FOR UPDATE NOWAIT that hit a locked row
+_LOCK_NOWAIT = 3572
+
+_catch_up_lock = threading.Lock()
+_last_catch_up = None
+
+SOURCES = {
+    CLICK: """
+        SELECT clickID AS id, timestamp, studentID, eventID
+        FROM Search_Clicks
+        WHERE (timestamp > %s OR (timestamp = %s AND clickID > %s)) AND timestamp < %s
+        ORDER BY timestamp, clickID
+        LIMIT %s
+    """,
+    RSVP: """
+        SELECT rsvpID AS id, timestamp, studentID, eventID
+        FROM RSVPs
+        WHERE (timestamp > %s OR (timestamp = %s AND rsvpID > %s)) AND timestamp < %s
+          AND status <> 'cancelled'
+        ORDER BY timestamp, rsvpID
+        LIMIT %s
+    """,
+    CHECKIN: """
+        SELECT attendanceID AS id, timestamp, studentID, eventID
+        FROM Students_Event_Attendees
+        WHERE (timestamp > %s OR (timestamp = %s AND attendanceID > %s)) AND timestamp < %s
+        ORDER BY timestamp, attendanceID
+        LIMIT %s
+    """,
+}
+
+SEARCHES = """
+    SELECT searchID AS id, timestamp, studentID, searchQuery
+    FROM Searches
+    WHERE (timestamp > %s OR (timestamp = %s AND searchID > %s)) AND timestamp < %s
+    ORDER BY timestamp, searchID
+    LIMIT %s
+"""
+
+
+def to_days(day):
+    """MySQL TO_DAYS() of a date, as stored in the watermark."""
+    return day.toordinal() + 365
+
+
+def from_days(days):
+    return date.fromordinal(days - 365)
+
+
+def keyword_of(query):
+    return " ".join((query or "").lower().split())[:255]
+
+
+def _pages(cursor, query, start, end):
+    """Rows of a keyset-paginated, (timestamp, id)-ordered query, a page at a time."""
+    last_time, last_id = start, 0
+    while True:
+        cursor.execute(query, (last_time, last_time, last_id, end, PAGE_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        last_time, last_id = rows[-1]["timestamp"], rows[-1]["id"]
+        if len(rows) < PAGE_SIZE:
+            return
+
+
+def _stage(cursor, stage, start, end):
+    for rows in _pages(cursor, SOURCES[stage], start, end):
+        for row in rows:
+            yield row["timestamp"], stage, row["id"], row["studentID"], row["eventID"], None
+
+
+def _impressions(cursor, start, end):
+    for rows in _pages(cursor, SEARCHES, start, end):
+        cursor.execute(f"""
+            SELECT ssr.searchID, sr.eventID
+            FROM Searches_Search_Results ssr
+            JOIN Search_Result sr ON sr.resultID = ssr.resultID
+            WHERE ssr.searchID IN ({", ".join(["%s"] * len(rows))})
+            ORDER BY ssr.searchID, sr.eventID
+        """, [row["id"] for row in rows])
+        shown = {}
+        for result in cursor.fetchall():
+            shown.setdefault(result["searchID"], []).append(result["eventID"])
+        for row in rows:
+            keyword = keyword_of(row["searchQuery"])
+            for event_id in shown.get(row["id"], ()):
+                yield row["timestamp"], IMPRESSION, row["id"], row["studentID"], event_id, keyword
+
+
+def stream(cursor, start, end):
+    """Every funnel step in [start, end) in time order, as (timestamp, stage, id, studentID, eventID, keyword)."""
+    sources = [_impressions(cursor, start, end)] + [_stage(cursor, stage, start, end) for stage in SOURCES]
+    return heapq.merge(*sources, key=lambda step: (step[0], step[1]))
+
+
+class Journeys:
+    """Open (student, event) journeys, least recently advanced first."""
+
+    def __init__(self, window=timedelta(days=ATTRIBUTION_DAYS), limit=MAX_JOURNEYS):
+        self.window = window
+        self.limit = limit
+        self._open = OrderedDict()  # (studentID, eventID) -> [keyword, stage, last step time]
+
+    def step(self, moment, stage, student_id, event_id, keyword=None):
+        """The keyword to credit this step to, or None if it does not count."""
+        while self._open:
+            oldest = next(iter(self._open.values()))
+            if oldest[2] >= moment - self.window:
+                break
+            self._open.popitem(last=False)
+
+        if student_id is None:
+            # anonymous searches still count as impressions; nothing else can be followed
+            return keyword if stage == IMPRESSION else None
+        key = (student_id, event_id)
+        journey = self._open.get(key)
+        if stage == IMPRESSION:
+            if journey is None or journey[1] == IMPRESSION:
+                # the last search before the click gets the credit
+                journey = [keyword, IMPRESSION, moment]
+            credited = keyword
+        elif journey is not None and journey[1] == stage - 1:
+            journey[1] = stage
+            credited = journey[0]
+        else:
+            return None
+
+        journey[2] = moment
+        self._open[key] = journey
+        self._open.move_to_end(key)
+        if len(self._open) > self.limit:
+            self._open.popitem(last=False)
+        return credited
+
+    def __len__(self):
+        return len(self._open)
+
+
+def _write_day(cursor, day, counts):
+    if not counts:
+        return 0
+    event_ids = sorted({event_id for event_id, _ in counts})
+    cursor.execute(
+        f"SELECT eventID, clubID FROM Events WHERE eventID IN ({', '.join(['%s'] * len(event_ids))})",
+        event_ids,
+    )
+    clubs = {row["eventID"]: row["clubID"] for row in cursor.fetchall()}
+    cursor.executemany("""
+        INSERT INTO Funnel_Daily (day, eventID, keyword, clubID, impressions, clicks, rsvps, checkins)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, [(day, event_id, keyword, clubs.get(event_id)) + tuple(stages)
+          for (event_id, keyword), stages in counts.items()])
+    return len(counts)
+
+
+def materialize(cursor, first_day, last_day):
+    """
+    Recount Funnel_Daily for first_day..last_day inclusive. Needs a dict
+    cursor; returns the rows written. The caller commits.
+    """
+    end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+    cursor.execute("DELETE FROM Funnel_Daily WHERE day >= %s AND day <= %s", (first_day, last_day))
+
+    journeys = Journeys()
+    start = datetime.combine(first_day, datetime.min.time()) - journeys.window
+    day, counts, written = None, {}, 0
+    for moment, stage, _, student_id, event_id, keyword in stream(cursor, start, end):
+        credited = journeys.step(moment, stage, student_id, event_id, keyword)
+        if credited is None or moment.date() < first_day:
+            continue
+        if moment.date() != day:
+            written += _write_day(cursor, day, counts)
+            day, counts = moment.date(), {}
+        counts.setdefault((event_id, credited), [0, 0, 0, 0])[stage] += 1
+    return written + _write_day(cursor, day, counts)
+
+
+def _lock_watermark(cursor, nowait=False):
+    cursor.execute(
+        f"SELECT lastID FROM Ingest_Watermarks WHERE name = %s FOR UPDATE{' NOWAIT' if nowait else ''}",
+        (WATERMARK,),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute("INSERT INTO Ingest_Watermarks (name, lastID) VALUES (%s, 0)", (WATERMARK,))
+        return 0
+    return row["lastID"]
+
+
+def ingest(cursor, max_days=None, today=None, nowait=False):
+    """
+    Materialize the finished days after the watermark, oldest first.
+    Without a watermark, starts max_days (or START_DAYS) ago. With
+    nowait, a locked watermark raises OperationalError 3572 instead of
+    waiting. Returns (first day, last day) or None. The caller commits.
+    """
+    yesterday = (today or date.today()) - timedelta(days=1)
+    watermark = _lock_watermark(cursor, nowait)
+    first = from_days(watermark) + timedelta(days=1) if watermark else \
+        yesterday - timedelta(days=(max_days or START_DAYS) - 1)
+    if first > yesterday:
+        return None
+    last = yesterday if max_days is None else min(yesterday, first + timedelta(days=max_days - 1))
+    materialize(cursor, first, last)
+    cursor.execute("UPDATE Ingest_Watermarks SET lastID = %s WHERE name = %s", (to_days(last), WATERMARK))
+    return first, last
+
+
+def catch_up():
+    """Materialize finished days before a read, at most once every CATCH_UP_INTERVAL seconds."""
+    global _last_catch_up
+    now = time.monotonic()
+    if _last_catch_up is not None and now - _last_catch_up < CATCH_UP_INTERVAL:
+        return
+    if not _catch_up_lock.acquire(blocking=False):
+        return  # another request is catching up
+    try:
+        _last_catch_up = now
+        with db.connection() as conn:
+            try:
+                with conn.cursor(DictCursor) as cursor:
+                    ingest(cursor, CATCH_UP_DAYS, nowait=True)
+                conn.commit()
+            except OperationalError as e:
+                if e.args[0] != _LOCK_NOWAIT:
+                    raise
+                # the CLI or another worker is materializing; the pool rolls this back
+    finally:
+        _catch_up_lock.release()
+
+
+GROUPS = {
+    "event": ("f.eventID, e.name AS event_name", "f.eventID, e.name"),
+    "club": ("f.clubID, c.name AS club_name", "f.clubID, c.name"),
+    "keyword": ("f.keyword", "f.keyword"),
+}
+
+
+def _rates(row):
+    def rate(numerator, denominator):
+        return round(numerator / denominator, 4) if denominator else None
+
+    row["click_rate"] = rate(row["clicks"], row["impressions"])
+    row["rsvp_rate"] = rate(row["rsvps"], row["clicks"])
+    row["checkin_rate"] = rate(row["checkins"], row["rsvps"])
+    row["conversion"] = rate(row["checkins"], row["impressions"])
+    return row
+
+
+def report(cursor, first_day, last_day, by="event", limit=50):
+    """Stage totals and conversion rates per event, club or keyword over first_day..last_day."""
+    columns, group = GROUPS[by]
+    sums = ", ".join(f"CAST(SUM(f.{stage}) AS SIGNED) AS {stage}" for stage in STAGES)
+    cursor.execute(f"""
+        SELECT {columns}, {sums}
+        FROM Funnel_Daily f
+        LEFT JOIN Events e ON e.eventID = f.eventID
+        LEFT JOIN Clubs c ON c.clubID = f.clubID
+        WHERE f.day >= %s AND f.day <= %s
+        GROUP BY {group}
+        ORDER BY impressions DESC, checkins DESC
+        LIMIT %s
+    """, (first_day, last_day, limit))
+    rows = [_rates(row) for row in cursor.fetchall()]
+
+    cursor.execute(f"""
+        SELECT {sums} FROM Funnel_Daily f WHERE f.day >= %s AND f.day <= %s
+    """, (first_day, last_day))
+    totals = {stage: value or 0 for stage, value in cursor.fetchone().items()}
+    return {"rows": rows, "totals": _rates(totals)}
+
+
+def main(argv=None):
+    from backend.rest_entry import create_app
+
+    parser = argparse.ArgumentParser(description="Materialize the daily discovery funnel")
+    parser.add_argument("--from", dest="first", type=date.fromisoformat,
+                        help="recount from this day (default: the day after the watermark)")
+    parser.add_argument("--to", dest="last", type=date.fromisoformat,
+                        help="last day to recount (default: yesterday)")
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        cursor = db.cursor(dictionary=True)
+        if args.first:
+            last = args.last or date.today() - timedelta(days=1)
+            watermark = _lock_watermark(cursor)
+            rows = materialize(cursor, args.first, last)
+            if to_days(last) > watermark:
+                cursor.execute("UPDATE Ingest_Watermarks SET lastID = %s WHERE name = %s",
+                               (to_days(last), WATERMARK))
+            print(f"{args.first} to {last}: {rows} rows")
+        else:
+            days = ingest(cursor)
+            print(f"{days[0]} to {days[1]}" if days else "up to date")
+        db.commit()
+        cursor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#------------------------------------------------------------
+# Weekly engagement report engine.
+#
+# All five report totals come from one grouped pass over Audit_Logs:
+# each log row is bucketed into its 7-day period and the totals are
+# conditional aggregates per bucket. Reports are upserted on
+# (reportPeriodStart, reportPeriodEnd), so re-running a period
+# replaces its row instead of adding another one.
+#
+# Backfill a range of past weeks (chunks run in a process pool):
+#
+#     python -m backend.analytics.reports --weeks 52 [--end 2025-12-07]
+#                                         [--workers 4] [--chunk-weeks 8]
+#------------------------------------------------------------
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+REPORT_DAYS = 7
+ACTIVE_USER_ACTIONS = ("login", "event_view", "search")
+REPORT_ACTIONS = ACTIVE_USER_ACTIONS + ("event_created", "rsvp_created", "check_in")
+
+_worker_app = None
+
+
+def periods_ending(end, weeks):
+    """The `weeks` consecutive 7-day periods ending at `end`, oldest first."""
+    return [
+        (end - timedelta(days=REPORT_DAYS * (k + 1)), end - timedelta(days=REPORT_DAYS * k))
+        for k in reversed(range(weeks))
+    ]
+
+
+def compute(cursor, periods):
+    """
+    Totals for consecutive 7-day periods from one grouped scan of
+    Audit_Logs. Returns one dict per period, including empty ones.
+    """
+    if not periods:
+        return []
+    first_start, last_end = periods[0][0], periods[-1][1]
+    placeholders = ", ".join(["%s"] * len(REPORT_ACTIONS))
+    active = ", ".join(["%s"] * len(ACTIVE_USER_ACTIONS))
+
+    cursor.execute(f"""
+        SELECT
+            DATEDIFF(timestamp, %s) DIV {REPORT_DAYS} AS period,
+            COUNT(DISTINCT CASE WHEN actionType IN ({active})
+                THEN userID END) AS totalActiveUsers,
+            COUNT(DISTINCT CASE WHEN actionType = 'event_created'
+                THEN entityID END) AS totalEventsCreated,
+            SUM(actionType = 'rsvp_created') AS totalRSVPs,
+            SUM(actionType = 'check_in') AS totalAttendance,
+            SUM(actionType = 'search') AS totalSearches
+        FROM Audit_Logs
+        WHERE actionType IN ({placeholders})
+          AND timestamp >= %s
+          AND timestamp < %s
+        GROUP BY period
+    """, (first_start, *ACTIVE_USER_ACTIONS, *REPORT_ACTIONS, first_start, last_end))
+    by_period = {int(row["period"]): row for row in cursor.fetchall()}
+
+    reports = []
+    for start, end in periods:
+        row = by_period.get((start - first_start).days // REPORT_DAYS, {})
+        reports.append({
+            "reportPeriodStart": start,
+            "reportPeriodEnd": end,
+            "totalActiveUsers": int(row.get("totalActiveUsers") or 0),
+            "totalEventsCreated": int(row.get("totalEventsCreated") or 0),
+            "totalRSVPs": int(row.get("totalRSVPs") or 0),
+            "totalAttendance": int(row.get("totalAttendance") or 0),
+            "totalSearches": int(row.get("totalSearches") or 0),
+        })
+    return reports
+
+
+def generate(cursor, periods):
+    """Compute and upsert the reports for `periods`. The caller commits."""
+    reports = compute(cursor, periods)
+    generated_at = datetime.now()
+    cursor.executemany("""
+        INSERT INTO Engagement_Reports
+            (reportPeriodStart, reportPeriodEnd, totalActiveUsers, totalEventsCreated,
+             totalRSVPs, totalAttendance, totalSearches, generatedAt)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            totalActiveUsers = VALUES(totalActiveUsers),
+            totalEventsCreated = VALUES(totalEventsCreated),
+            totalRSVPs = VALUES(totalRSVPs),
+            totalAttendance = VALUES(totalAttendance),
+            totalSearches = VALUES(totalSearches),
+            generatedAt = VALUES(generatedAt)
+    """, [
+        (r["reportPeriodStart"], r["reportPeriodEnd"], r["totalActiveUsers"],
+         r["totalEventsCreated"], r["totalRSVPs"], r["totalAttendance"],
+         r["totalSearches"], generated_at)
+        for r in reports
+    ])
+    return reports
+
+
+def backfill(end, weeks, workers=4, chunk_weeks=8):
+    """Generate `weeks` reports ending at `end`, chunks spread over a process pool."""
+    periods = periods_ending(end, weeks)
+    chunks = [periods[i:i + chunk_weeks] for i in range(0, len(periods), chunk_weeks)]
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker()
+        return sum(_generate_chunk(chunk) for chunk in chunks)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             initializer=_init_worker) as pool:
+        return sum(pool.map(_generate_chunk, chunks))
+
+
+def _init_worker():
+    global _worker_app
+    from backend.rest_entry import create_app
+
+    # one connection per worker is enough; nothing here is cached
+    os.environ.setdefault("DB_POOL_MIN_SIZE", "1")
+    os.environ["CACHE_BACKEND"] = "none"
+    _worker_app = create_app()
+
+
+def _generate_chunk(periods):
+    from pymysql.cursors import DictCursor
+    from backend.db_connection import db
+
+    with _worker_app.app_context(), db.connection() as conn:
+        with conn.cursor(DictCursor) as cursor:
+            generate(cursor, periods)
+        conn.commit()
+    return len(periods)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate weekly Engagement_Reports rows for a range of past weeks"
+    )
+    parser.add_argument("--weeks", type=int, default=1,
+                        help="number of 7-day periods to generate (default 1)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(),
+                        help="exclusive end date of the newest period (default today)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-weeks", type=int, default=8,
+                        help="periods computed per worker task")
+    args = parser.parse_args(argv)
+
+    generated = backfill(args.end, args.weeks, args.workers, args.chunk_weeks)
+    print(f"Generated {generated} weekly engagement reports ending {args.end}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#------------------------------------------------------------
+# Activity rollups for the windowed analytics endpoints.
+#
+# Check-ins, RSVPs and searches are summed into per-day (and, for
+# events, per-hour) rows keyed by event, by student year / major /
+# club category, and by search query (see migration 009). A windowed
+# report then adds up days x groups rollup rows instead of joining and
+# counting every raw row in the window.
+#
+# Rollups are kept current by the transactions that change the source
+# rows: a check-in, an RSVP being admitted or cancelled, and a search
+# telemetry flush each add their +1 / -1 deltas with one multi-row
+# INSERT ... ON DUPLICATE KEY UPDATE before they commit. A row is
+# counted on the day of its timestamp, so a change that moves the
+# timestamp (a check-in replayed with an earlier scan, a cancelled RSVP
+# admitted again) subtracts from the old day and adds to the new one.
+# Cancelled RSVPs and rows without a timestamp are not counted.
+# Distinct counts (unique students) cannot be added up across days, so
+# they are not rolled up.
+#
+#     python -m backend.analytics.rollups --rebuild   # recount everything
+#------------------------------------------------------------
+import argparse
+from collections import Counter
+
+from backend.db_connection import db
+
+BATCH_SIZE = 5000
+
+ROLLUP_TABLES = ("Rollup_Event_Daily", "Rollup_Event_Hourly",
+                 "Rollup_Demographic_Daily", "Rollup_Search_Daily")
+
+# source rows for rebuild(), read in attendanceID / rsvpID / searchID order
+SOURCES = {
+    "attendance": """
+        SELECT sea.attendanceID AS id, sea.timestamp, sea.eventID, e.clubID,
+               c.categoryID, s.year, s.major
+        FROM Students_Event_Attendees sea
+        JOIN Events e ON e.eventID = sea.eventID
+        LEFT JOIN Clubs c ON c.clubID = e.clubID
+        LEFT JOIN Students s ON s.studentID = sea.studentID
+        WHERE sea.attendanceID > %s
+        ORDER BY sea.attendanceID
+        LIMIT %s
+    """,
+    "rsvps": """
+        SELECT r.rsvpID AS id, r.timestamp, r.eventID, e.clubID
+        FROM RSVPs r
+        JOIN Events e ON e.eventID = r.eventID
+        WHERE r.rsvpID > %s AND r.status <> 'cancelled'
+        ORDER BY r.rsvpID
+        LIMIT %s
+    """,
+    "searches": """
+        SELECT s.searchID AS id, s.timestamp, s.searchQuery,
+               NOT EXISTS (SELECT 1 FROM Searches_Search_Results ssr
+                           WHERE ssr.searchID = s.searchID) AS noResults
+        FROM Searches s
+        WHERE s.searchID > %s
+        ORDER BY s.searchID
+        LIMIT %s
+    """,
+}
+
+UPSERTS = {
+    "event_daily": """
+        INSERT INTO Rollup_Event_Daily (day, eventID, clubID, attendance, rsvps)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE attendance = attendance + VALUES(attendance),
+                                rsvps = rsvps + VALUES(rsvps)
+    """,
+    "event_hourly": """
+        INSERT INTO Rollup_Event_Hourly (hour, eventID, clubID, attendance, rsvps)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE attendance = attendance + VALUES(attendance),
+                                rsvps = rsvps + VALUES(rsvps)
+    """,
+    "demographic_daily": """
+        INSERT INTO Rollup_Demographic_Daily (day, year, major, categoryID, attendance)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE attendance = attendance + VALUES(attendance)
+    """,
+    "search_daily": """
+        INSERT INTO Rollup_Search_Daily (day, searchQuery, searches, noResults)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE searches = searches + VALUES(searches),
+                                noResults = noResults + VALUES(noResults)
+    """,
+}
+
+
+def hour_of(timestamp):
+    """The Rollup_Event_Hourly bucket a timestamp falls in."""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class Deltas:
+    """Rollup changes collected in memory, then written with one upsert per table."""
+
+    def __init__(self):
+        self.daily = Counter()         # (day, eventID, clubID, column) -> delta
+        self.hourly = Counter()        # (hour, eventID, clubID, column) -> delta
+        self.demographics = Counter()  # (day, year, major, categoryID) -> delta
+        self.searches = Counter()      # (day, query) -> delta
+        self.no_results = Counter()    # (day, query) -> delta
+
+    def checkin(self, timestamp, event_id, club_id, category_id, year, major, delta=1):
+        if timestamp is None:
+            return
+        day = timestamp.date()
+        self.daily[(day, event_id, club_id, "attendance")] += delta
+        self.hourly[(hour_of(timestamp), event_id, club_id, "attendance")] += delta
+        # unknown values are stored as 0 / '' (they are part of the key)
+        self.demographics[(day, year or 0, major or "", category_id or 0)] += delta
+
+    def rsvp(self, timestamp, event_id, club_id, delta=1):
+        if timestamp is None:
+            return
+        self.daily[(timestamp.date(), event_id, club_id, "rsvps")] += delta
+        self.hourly[(hour_of(timestamp), event_id, club_id, "rsvps")] += delta
+
+    def search(self, timestamp, query, no_results):
+        if timestamp is None:
+            return
+        key = (timestamp.date(), (query or "")[:255])
+        self.searches[key] += 1
+        self.no_results[key] += int(bool(no_results))
+
+    def rows(self):
+        """{upsert name: [rows]}, each list in key order so concurrent writers lock rows alike."""
+        def events(counter):
+            merged = {}
+            for (bucket, event_id, club_id, column), delta in counter.items():
+                counts = merged.setdefault((bucket, event_id, club_id), [0, 0])
+                counts[column == "rsvps"] += delta
+            return [key + tuple(counts) for key, counts in sorted(merged.items(), key=lambda kv: kv[0][:2])
+                    if any(counts)]
+
+        return {
+            "event_daily": events(self.daily),
+            "event_hourly": events(self.hourly),
+            "demographic_daily": sorted(key + (n,) for key, n in self.demographics.items() if n),
+            "search_daily": sorted(key + (n, self.no_results[key]) for key, n in self.searches.items()),
+        }
+
+    def write(self, cursor):
+        for upsert, values in self.rows().items():
+            if values:
+                cursor.executemany(UPSERTS[upsert], values)
+
+
+def rebuild(cursor):
+    """Drop every rollup row and recount all source rows. Returns {source: rows}. The caller commits."""
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    processed = {}
+    for name, query in SOURCES.items():
+        processed[name], last_id = 0, 0
+        while True:
+            cursor.execute(query, (last_id, BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            deltas = Deltas()
+            for row in rows:
+                if name == "attendance":
+                    deltas.checkin(row["timestamp"], row["eventID"], row["clubID"],
+                                   row["categoryID"], row["year"], row["major"])
+                elif name == "rsvps":
+                    deltas.rsvp(row["timestamp"], row["eventID"], row["clubID"])
+                else:
+                    deltas.search(row["timestamp"], row["searchQuery"], row["noResults"])
+            deltas.write(cursor)
+            last_id = rows[-1]["id"]
+            processed[name] += len(rows)
+    return processed
+
+
+def main(argv=None):
+    from backend.rest_entry import create_app
+
+    parser = argparse.ArgumentParser(description="Recount the check-in, RSVP and search rollups")
+    parser.add_argument("--rebuild", action="store_true", required=True,
+                        help="drop the rollups and recount every source row")
+    parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        cursor = db.cursor(dictionary=True)
+        processed = rebuild(cursor)
+        db.commit()
+        cursor.close()
+    for name, count in processed.items():
+        print(f"{name}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#------------------------------------------------------------
+# HyperLogLog sketches of active students, per day.
+#
+# Every day has a sketch of the students who checked in that day:
+# one overall, one per club and one per major (see migration 010).
+# A sketch is 2^PRECISION one-byte registers; a student sets the
+# register picked by the top bits of their hash to the position of the
+# first 1 bit in the rest, if that is higher. Sketches merge by taking
+# the register-wise maximum, so the distinct students of any window of
+# days is the estimate of the merged day sketches, read from a few
+# small rows instead of COUNT(DISTINCT) over raw attendance.
+#
+# Error bound: the estimate's relative standard error is
+# 1.04 / sqrt(2^PRECISION), 1.6% at PRECISION 12, so about 95% of
+# estimates are within 3.3% of the true count. Below 2.5 x 2^PRECISION
+# students linear counting is used, which is close to exact for small
+# counts. Windows are whole days.
+#
+# Sketches are updated by check_in_batch() in the check-in transaction.
+# The overall sketch is split into ALL_SHARDS rows by register, so
+# concurrent check-ins do not all wait on one row; merging the shards
+# gives the same sketch. Majors are keyed in lowercase, and scopeKey
+# compares bytes (migration 012), so the keys read back match the keys
+# looked up. Sketches cannot forget a student, so deleted check-ins stay
+# counted until
+#
+#     python -m backend.analytics.sketches --rebuild
+#------------------------------------------------------------
+import argparse
+import hashlib
+import math
+import zlib
+
+import numpy as np
+
+from backend.db_connection import db, in_list
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+RELATIVE_ERROR = 1.04 / math.sqrt(REGISTERS)
+BATCH_SIZE = 5000
+ALL_SHARDS = 16
+
+ALL = "all"
+CLUB = "club"
+MAJOR = "major"
+SCOPES = (ALL, CLUB, MAJOR)
+
+# creates the missing rows and locks the existing ones without the gap
+# locks a FOR UPDATE read of a missing row takes
+CLAIM = """
+    INSERT INTO Activity_Sketches (day, scope, scopeKey, sketch)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE sketch = sketch
+"""
+
+UPSERT = """
+    INSERT INTO Activity_Sketches (day, scope, scopeKey, sketch)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE sketch = VALUES(sketch)
+"""
+
+
+def register_of(student_id):
+    """(register index, rank) a student sets."""
+    h = int.from_bytes(hashlib.blake2b(str(student_id).encode(), digest_size=8).digest(), "big")
+    rest = h & ((1 << (64 - PRECISION)) - 1)
+    return h >> (64 - PRECISION), 64 - PRECISION - rest.bit_length() + 1
+
+
+def encode(registers):
+    return zlib.compress(registers.tobytes())
+
+
+def decode(blob):
+    return np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+
+
+def estimate(registers):
+    """Estimated number of distinct students in a sketch."""
+    zeros = int(np.count_nonzero(registers == 0))
+    if zeros == REGISTERS:
+        return 0
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    raw = alpha * REGISTERS * REGISTERS / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+    if raw <= 2.5 * REGISTERS and zeros:
+        return int(round(REGISTERS * math.log(REGISTERS / zeros)))
+    return int(round(raw))
+
+
+def scope_key(scope, key):
+    """The scopeKey a club ID or major is stored under."""
+    if scope == MAJOR:
+        return " ".join(str(key).split()).lower()[:100]
+    return str(key)
+
+
+def _keys(timestamp, index, club_id, major):
+    day = timestamp.date()
+    keys = [(day, ALL, str(index % ALL_SHARDS))]
+    if club_id is not None:
+        keys.append((day, CLUB, scope_key(CLUB, club_id)))
+    if major and major.strip():
+        keys.append((day, MAJOR, scope_key(MAJOR, major)))
+    return keys
+
+
+def _select(cursor, keys, lock=False):
+    rows = ", ".join(["(%s, %s, %s)"] * len(keys))
+    cursor.execute(f"""
+        SELECT day, scope, scopeKey, sketch FROM Activity_Sketches
+        WHERE (day, scope, scopeKey) IN ({rows})
+        {"FOR UPDATE" if lock else ""}
+    """, [v for key in keys for v in key])
+    return {(row["day"], row["scope"], row["scopeKey"]): decode(row["sketch"]) for row in cursor.fetchall()}
+
+
+def add_checkins(cursor, checkins):
+    """
+    Add [(timestamp, studentID, clubID, major)] check-ins to the day
+    sketches. Sketches that would not change are not locked or
+    written. Rows are locked in key order, but a deadlock with another
+    writer is still possible, so call this from a transaction that is
+    retried on one (check_in_batch() is). Needs a dict cursor; the
+    caller commits.
+    """
+    updates = {}
+    for timestamp, student_id, club_id, major in checkins:
+        if timestamp is None:
+            continue
+        index, rank = register_of(student_id)
+        for key in _keys(timestamp, index, club_id, major):
+            registers = updates.setdefault(key, {})
+            registers[index] = max(registers.get(index, 0), rank)
+    if not updates:
+        return
+
+    def changed(current):
+        return [key for key, registers in updates.items()
+                if key not in current or any(current[key][i] < r for i, r in registers.items())]
+
+    keys = changed(_select(cursor, list(updates)))
+    if not keys:
+        return
+    keys.sort()
+    empty = encode(np.zeros(REGISTERS, dtype=np.uint8))
+    cursor.executemany(CLAIM, [key + (empty,) for key in keys])
+    current = _select(cursor, keys, lock=True)
+    rows = []
+    for key in keys:
+        registers = current[key].copy()
+        for index, rank in updates[key].items():
+            registers[index] = max(registers[index], rank)
+        rows.append(key + (encode(registers),))
+    cursor.executemany(UPSERT, rows)
+
+
+def distinct_students(cursor, start, end=None, scope=ALL, keys=None):
+    """
+    {scopeKey: estimated distinct students} over the days from
+    start's day up to end's day (exclusive; default through today).
+    The overall scope's key is ''; majors are lowercase.
+    """
+    conditions, params = ["scope = %s", "day >= %s"], [scope, start.date()]
+    if end is not None:
+        conditions.append("day < %s")
+        params.append(end.date())
+    if keys is not None:
+        if not keys:
+            return {}
+        conditions.append(f"scopeKey IN ({in_list(keys)})")
+        params.extend(scope_key(scope, key) for key in keys)
+    cursor.execute(f"SELECT scopeKey, sketch FROM Activity_Sketches WHERE {' AND '.join(conditions)}", params)
+
+    merged = {}
+    for row in cursor.fetchall():
+        registers = decode(row["sketch"])
+        key = "" if scope == ALL else row["scopeKey"]
+        merged[key] = np.maximum(merged[key], registers) if key in merged else registers
+    return {key: estimate(registers) for key, registers in merged.items()}
+
+
+def exact_distinct_students(cursor, start, end=None, scope=ALL, keys=None):
+    """distinct_students() counted from raw check-ins over the same whole days."""
+    group = {ALL: "''", CLUB: "CAST(e.clubID AS CHAR)", MAJOR: "LOWER(TRIM(s.major))"}[scope]
+    conditions, params = ["sea.timestamp >= %s"], [start.date()]
+    if end is not None:
+        conditions.append("sea.timestamp < %s")
+        params.append(end.date())
+    if scope != ALL:
+        conditions.append(f"{group} IS NOT NULL")
+    if keys is not None:
+        if not keys:
+            return {}
+        conditions.append(f"{group} IN ({in_list(keys)})")
+        params.extend(scope_key(scope, key) for key in keys)
+    cursor.execute(f"""
+        SELECT {group} AS scopeKey, COUNT(DISTINCT sea.studentID) AS students
+        FROM Students_Event_Attendees sea
+        JOIN Events e ON e.eventID = sea.eventID
+        LEFT JOIN Students s ON s.studentID = sea.studentID
+        WHERE {' AND '.join(conditions)}
+        GROUP BY {group}
+    """, params)
+    return {row["scopeKey"]: row["students"] for row in cursor.fetchall()}
+
+
+def rebuild(cursor):
+    """Recompute every sketch from Students_Event_Attendees. The caller commits."""
+    cursor.execute("DELETE FROM Activity_Sketches")
+    last_id, total = 0, 0
+    while True:
+        cursor.execute("""
+            SELECT sea.attendanceID, sea.timestamp, sea.studentID, e.clubID, s.major
+            FROM Students_Event_Attendees sea
+            JOIN Events e ON e.eventID = sea.eventID
+            LEFT JOIN Students s ON s.studentID = sea.studentID
+            WHERE sea.attendanceID > %s
+            ORDER BY sea.attendanceID
+            LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        add_checkins(cursor, [(r["timestamp"], r["studentID"], r["clubID"], r["major"]) for r in rows])
+        last_id = rows[-1]["attendanceID"]
+        total += len(rows)
+    return total
+
+
+def main(argv=None):
+    from backend.rest_entry import create_app
+
+    parser = argparse.ArgumentParser(description="Rebuild the per-day active-student sketches")
+    parser.add_argument("--rebuild", action="store_true", required=True,
+                        help="drop the sketches and re-add every check-in")
+    parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        cursor = db.cursor(dictionary=True)
+        total = rebuild(cursor)
+        db.commit()
+        cursor.close()
+    print(f"sketched {total} check-ins")
+
+
+if __name__ == "__main__":
+    main()
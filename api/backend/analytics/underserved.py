@@ -0,0 +1,100 @@
+#------------------------------------------------------------
+# Underserved-population analysis for /demographics/underserved.
+#
+# Participation is counted per (major, year) cohort in one pass: every
+# student once, and whether they checked in during the window. The
+# mean cohort rate comes from the same aggregation (a window function
+# in SQL, or the cube's cohort counts), instead of a scalar subquery
+# that re-joined Students x attendance for every group.
+#
+# Each cohort below the mean is scored against it as a binomial
+# sample: a z-score, and a Wilson score interval for its own rate.
+# A cohort is `significant` when even the top of its interval is below
+# the mean, so small cohorts are not flagged on noise alone.
+#------------------------------------------------------------
+import math
+from statistics import NormalDist
+
+from backend.analytics.cube import attendance_cube
+
+COHORTS = """
+    SELECT major, year, total_students, active_students,
+           AVG(active_students * 100.0 / total_students) OVER () AS overall_avg_rate
+    FROM (
+        SELECT s.major, s.year,
+               COUNT(*) AS total_students,
+               COUNT(active.studentID) AS active_students
+        FROM Students s
+        LEFT JOIN (
+            SELECT DISTINCT studentID
+            FROM Students_Event_Attendees
+            WHERE timestamp >= %s {end}
+        ) active ON active.studentID = s.studentID
+        GROUP BY s.major, s.year
+    ) cohorts
+    WHERE total_students >= %s
+"""
+
+
+def cohorts(cursor, start, end=None, min_cohort=1):
+    """
+    (rows, mean participation rate in percent) for every cohort of at
+    least `min_cohort` students, with check-ins in [start, end).
+    """
+    if attendance_cube.ensure_fresh(cursor):
+        rows = [c for c in attendance_cube.participation(start, end) if c["total_students"] >= min_cohort]
+        if not rows:
+            return [], None
+        rates = [c["active_students"] * 100.0 / c["total_students"] for c in rows]
+        return rows, sum(rates) / len(rates)
+
+    params = [start]
+    if end is not None:
+        params.append(end)
+    params.append(min_cohort)
+    cursor.execute(COHORTS.format(end="AND timestamp < %s" if end is not None else ""), params)
+    rows = cursor.fetchall()
+    if not rows:
+        return [], None
+    return rows, float(rows[0]["overall_avg_rate"])
+
+
+def wilson_interval(active, total, z):
+    """Wilson score interval for active / total, as fractions."""
+    p = active / total
+    denominator = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def underserved(cursor, start, end=None, min_cohort=1, confidence=0.95):
+    """Cohorts participating below the mean cohort rate, lowest first, with their z-scores and intervals."""
+    rows, overall = cohorts(cursor, start, end, min_cohort)
+    if not rows:
+        return []
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    baseline = overall / 100
+
+    result = []
+    for row in rows:
+        total, active = row["total_students"], row["active_students"]
+        rate = active * 100.0 / total
+        if rate >= overall:
+            continue
+        standard_error = math.sqrt(baseline * (1 - baseline) / total)
+        low, high = wilson_interval(active, total, z)
+        result.append({
+            "major": row["major"],
+            "year": row["year"],
+            "total_students": total,
+            "active_students": active,
+            "participation_rate": round(rate, 1),
+            "overall_avg_rate": overall,
+            "z_score": round((rate / 100 - baseline) / standard_error, 2) if standard_error else 0.0,
+            "ci_low": round(low * 100, 1),
+            "ci_high": round(high * 100, 1),
+            "significant": high * 100 < overall,
+        })
+    result.sort(key=lambda r: r["participation_rate"])
+    return result
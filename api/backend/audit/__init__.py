@@ -0,0 +1,238 @@
+#------------------------------------------------------------
+# Buffered, asynchronous Audit_Logs writer.
+#
+# Routes call audit.record(...) for the actions the weekly report
+# counts (login, search, event_view, rsvp_created, check_in,
+# event_created). Inside a request the row is held on `g` and handed
+# over in after_request, stamped with the client address and whether
+# the request succeeded. Rows go onto a bounded in-process queue; a
+# background thread group-commits them with one multi-row INSERT
+# every AUDIT_FLUSH_MS milliseconds or AUDIT_BATCH_ROWS rows,
+# whichever comes first. If a batch insert fails, the batch is written
+# again row by row, so one bad row only drops itself.
+#
+# When the queue is full, record() waits up to AUDIT_ENQUEUE_TIMEOUT
+# seconds and then drops the row (counted in stats()), so a slow
+# database never holds requests hostage. Whatever is still queued is
+# written on interpreter shutdown.
+#------------------------------------------------------------
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import g, has_request_context, request
+
+from backend.db_connection import db
+
+COLUMNS = ("userID", "actionType", "entityType", "entityID", "timestamp",
+           "details", "ipAddress", "userAgent", "status")
+INSERT = (f"INSERT INTO Audit_Logs ({', '.join(COLUMNS)}) "
+          f"VALUES ({', '.join(['%s'] * len(COLUMNS))})")
+USER_AGENT_CHARS = 500
+SHUTDOWN_TIMEOUT = 5.0
+
+
+class AuditPipeline:
+    def __init__(self):
+        self.enabled = False
+        self.queue_size = 10000
+        self.flush_seconds = 0.25
+        self.batch_rows = 500
+        self.enqueue_timeout = 0.05
+        self.logger = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0, "written": 0, "batches": 0,
+            "dropped_queue_full": 0, "dropped_write_error": 0, "write_errors": 0,
+            "last_batch_rows": 0, "last_flush_ms": 0.0,
+        }
+
+    def init_app(self, app):
+        app.config.setdefault("AUDIT_ENABLED", True)
+        app.config.setdefault("AUDIT_QUEUE_SIZE", 10000)
+        app.config.setdefault("AUDIT_FLUSH_MS", 250)
+        app.config.setdefault("AUDIT_BATCH_ROWS", 500)
+        app.config.setdefault("AUDIT_ENQUEUE_TIMEOUT", 0.05)
+
+        self.enabled = bool(app.config["AUDIT_ENABLED"])
+        self.queue_size = app.config["AUDIT_QUEUE_SIZE"]
+        self.flush_seconds = app.config["AUDIT_FLUSH_MS"] / 1000.0
+        self.batch_rows = app.config["AUDIT_BATCH_ROWS"]
+        self.enqueue_timeout = app.config["AUDIT_ENQUEUE_TIMEOUT"]
+        self.logger = app.logger
+        if not self.enabled:
+            return
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        app.after_request(self._after_request)
+        atexit.register(self.shutdown)
+        app.logger.info(
+            f"AuditPipeline: flushing every {app.config['AUDIT_FLUSH_MS']} ms "
+            f"or {self.batch_rows} rows"
+        )
+
+    def record(self, action_type, entity_type=None, entity_id=None,
+               user_id=None, details=None):
+        """Queue one Audit_Logs row. Never blocks for longer than enqueue_timeout."""
+        if not self.enabled:
+            return
+        row = [user_id, action_type, entity_type, entity_id, datetime.now(),
+               details, None, None, "success"]
+        if has_request_context():
+            g.setdefault("_audit_rows", []).append(row)
+        else:
+            self._enqueue(row)
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        while self._queue is not None:
+            batch = self._drain(self.batch_rows)
+            if not batch:
+                break
+            self._write(batch)
+
+    def shutdown(self):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(SHUTDOWN_TIMEOUT)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        stats["capacity"] = self.queue_size
+        stats["enabled"] = self.enabled
+        return stats
+
+    # request hook ----------------------------------------------------
+
+    def _after_request(self, response):
+        rows = g.pop("_audit_rows", None)
+        if rows:
+            ip = request.remote_addr
+            agent = request.user_agent.string[:USER_AGENT_CHARS] or None
+            status = "success" if response.status_code < 400 else "failed"
+            for row in rows:
+                row[6], row[7], row[8] = ip, agent, status
+                self._enqueue(row)
+        return response
+
+    # writer ----------------------------------------------------------
+
+    def _enqueue(self, row):
+        self._ensure_writer()
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._count("dropped_queue_full")
+            return False
+        self._count("enqueued")
+        return True
+
+    def _ensure_writer(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # forked worker: the parent's queue and thread did not come along
+                self._queue = queue.Queue(maxsize=self.queue_size)
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _collect(self):
+        """Block for the first row, then gather more until the batch fills or the interval ends."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            with db.connection() as conn:
+                with conn.cursor() as cursor:
+                    # executemany turns this into one multi-row INSERT
+                    cursor.executemany(INSERT, batch)
+                conn.commit()
+            written = len(batch)
+        except Exception as e:
+            self._count("write_errors")
+            if self.logger:
+                self.logger.warning(f"AuditPipeline: batch of {len(batch)} rows failed, "
+                                    f"writing them one by one: {e}")
+            time.sleep(self.flush_seconds)
+            written = self._write_rows(batch)
+            if written < len(batch):
+                self._count("dropped_write_error", len(batch) - written)
+
+        with self._lock:
+            self._stats["written"] += written
+            self._stats["batches"] += 1
+            self._stats["last_batch_rows"] = len(batch)
+            self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _write_rows(self, batch):
+        """Insert the rows one at a time, skipping the ones that fail. Returns the number written."""
+        written = 0
+        try:
+            with db.connection() as conn:
+                with conn.cursor() as cursor:
+                    for row in batch:
+                        try:
+                            cursor.execute(INSERT, row)
+                            written += 1
+                        except Exception as e:
+                            self._count("write_errors")
+                            if self.logger:
+                                self.logger.error(f"AuditPipeline: dropped row {row}: {e}")
+                conn.commit()
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"AuditPipeline: dropped {len(batch) - written} rows: {e}")
+            return 0
+        return written
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+
+audit = AuditPipeline()
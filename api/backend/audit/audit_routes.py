@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify, request
+from backend.audit import audit
+
+audit_routes = Blueprint("audit_routes", __name__)
+
+# Actions that happen in the front end rather than in an API route
+CLIENT_ACTIONS = {"login"}
+MAX_DETAILS_CHARS = 1000
+
+
+# POST /audit/events
+@audit_routes.route("/events", methods=["POST"])
+def record_client_event():
+    """
+    Record an action reported by the front end (e.g. a persona login).
+
+    Body: {"action_type": "login", "user_id": optional int,
+           "details": optional str of up to MAX_DETAILS_CHARS characters}
+    The row is queued for the background writer, so this returns immediately.
+    """
+    data = request.get_json(silent=True) or {}
+    action_type = data.get("action_type")
+    if action_type not in CLIENT_ACTIONS:
+        return jsonify({"error": f"action_type must be one of: {', '.join(sorted(CLIENT_ACTIONS))}"}), 400
+
+    user_id = data.get("user_id")
+    if user_id is not None and (not isinstance(user_id, int) or isinstance(user_id, bool)):
+        return jsonify({"error": "user_id must be an integer"}), 400
+    details = data.get("details")
+    if details is not None and (not isinstance(details, str) or len(details) > MAX_DETAILS_CHARS):
+        return jsonify({"error": f"details must be a string of at most {MAX_DETAILS_CHARS} characters"}), 400
+
+    audit.record(action_type, "user", user_id, user_id=user_id, details=details)
+    return jsonify({"message": "Audit event queued"}), 202
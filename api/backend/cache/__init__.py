@@ -0,0 +1,140 @@
+#------------------------------------------------------------
+# Server-side result cache for read-heavy JSON endpoints.
+#
+# Cached endpoints declare which data they depend on ("tags").
+# Write paths call cache.invalidate(<tag>) after committing, which
+# bumps that tag's generation number. Generations are part of the
+# cache key, so every entry built on the old data stops matching.
+#------------------------------------------------------------
+import threading
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from backend.cache.backends import LRUBackend, RedisBackend
+
+
+class ResultCache:
+    def __init__(self):
+        self.backend = None
+        self.prefix = "clubhub:"
+        self.default_ttl = 60
+        self.ttls = {}
+        self.logger = None
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def init_app(self, app):
+        app.config.setdefault("CACHE_BACKEND", "lru")
+        app.config.setdefault("CACHE_LRU_SIZE", 512)
+        app.config.setdefault("CACHE_REDIS_URL", "redis://localhost:6379/0")
+        app.config.setdefault("CACHE_KEY_PREFIX", "clubhub:")
+        app.config.setdefault("CACHE_DEFAULT_TTL", 60)
+        # per-endpoint TTL overrides, e.g. {"analytics.top-clubs": 30}
+        app.config.setdefault("CACHE_TTLS", {})
+
+        kind = app.config["CACHE_BACKEND"]
+        if kind == "redis":
+            self.backend = RedisBackend(app.config["CACHE_REDIS_URL"])
+        elif kind == "lru":
+            self.backend = LRUBackend(app.config["CACHE_LRU_SIZE"])
+        elif kind in ("none", "off", ""):
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+
+        self.prefix = app.config["CACHE_KEY_PREFIX"]
+        self.default_ttl = app.config["CACHE_DEFAULT_TTL"]
+        self.ttls = dict(app.config["CACHE_TTLS"])
+        self.logger = app.logger
+        app.logger.info(f"ResultCache: using {kind or 'no'} backend")
+
+    def cached(self, name, ttl=None, tags=()):
+        """
+        Cache a view's 200 responses under `name` for `ttl` seconds.
+        The key includes the view arguments and the query string.
+        """
+        self._stats.setdefault(name, {"hits": 0, "misses": 0, "errors": 0})
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+
+                key = None
+                try:
+                    key = self._key(name, tags, kwargs)
+                    body = self.backend.get(key)
+                except Exception as e:
+                    current_app.logger.warning(f"ResultCache: lookup for {name} failed: {e}")
+                    self._count(name, "errors")
+                    body = None
+
+                if body is not None:
+                    self._count(name, "hits")
+                    response = current_app.response_class(
+                        body, status=200, mimetype="application/json"
+                    )
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                self._count(name, "misses")
+                response = make_response(view(*args, **kwargs))
+                if key is not None and response.status_code == 200 \
+                        and not response.is_streamed:
+                    try:
+                        self.backend.set(key, response.get_data(),
+                                         self.ttls.get(name, ttl or self.default_ttl))
+                    except Exception as e:
+                        current_app.logger.warning(f"ResultCache: store for {name} failed: {e}")
+                        self._count(name, "errors")
+                response.headers["X-Cache"] = "MISS"
+                return response
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *tags):
+        """
+        Drop every cached entry that depends on any of `tags`. Safe to
+        call outside a request (e.g. from a background writer).
+        """
+        if self.backend is None:
+            return
+        for tag in tags:
+            try:
+                self.backend.incr(f"{self.prefix}gen:{tag}")
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"ResultCache: invalidating {tag} failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            endpoints = {name: dict(counts) for name, counts in self._stats.items()}
+        hits = sum(c["hits"] for c in endpoints.values())
+        misses = sum(c["misses"] for c in endpoints.values())
+        return {
+            "backend": self.backend.info() if self.backend else None,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "endpoints": endpoints,
+        }
+
+    def _key(self, name, tags, kwargs):
+        generations = self.backend.get_counters(
+            [f"{self.prefix}gen:{tag}" for tag in tags]
+        )
+        gen_part = ".".join(str(g) for g in generations)
+        arg_part = ",".join(f"{k}={kwargs[k]}" for k in sorted(kwargs))
+        query = request.query_string.decode("utf-8", "replace")
+        return f"{self.prefix}{name}:{gen_part}:{arg_part}?{query}"
+
+    def _count(self, name, field):
+        with self._lock:
+            self._stats[name][field] += 1
+
+
+cache = ResultCache()
@@ -0,0 +1,92 @@
+#------------------------------------------------------------
+# Storage backends for the result cache.
+#
+# A backend stores opaque bytes under string keys with a TTL and
+# keeps integer counters (used for the invalidation generations).
+#------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+
+class LRUBackend:
+    """In-process LRU cache. Each API worker process has its own copy."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # generation counters live outside the LRU so they are never evicted
+        self._counters = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counters(self, keys):
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def info(self):
+        with self._lock:
+            return {"backend": "lru", "entries": len(self._entries),
+                    "max_entries": self.max_entries}
+
+
+class RedisBackend:
+    """
+    Backend for anything that speaks the Redis protocol (Redis, Valkey,
+    KeyDB, ...). Shared by every API worker, so an invalidation in one
+    worker is seen by all of them.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", socket_timeout=0.5):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout
+        )
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+    def get_counters(self, keys):
+        if not keys:
+            return []
+        return [int(v) if v is not None else 0 for v in self._client.mget(keys)]
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def info(self):
+        # the URL may carry a password; report only where it points
+        parts = urlsplit(self.url)
+        host = parts.hostname or ""
+        if parts.port:
+            host = f"{host}:{parts.port}"
+        return {"backend": "redis", "url": urlunsplit((parts.scheme, host, parts.path, "", ""))}
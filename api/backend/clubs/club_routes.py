@@ -1,7 +1,9 @@
 import datetime
 from flask import Blueprint, jsonify, request
 from backend.db_connection import cursor, db
-from mysql.connector import Error
+from backend.clubs import rankings
+from backend.clubs.similarity import club_similarity
+from pymysql import Error
 from flask import current_app
 from datetime import datetime, timedelta
 
@@ -201,37 +203,110 @@ def compare_clubs():
 # [NewStudent-1.6] Get club rankings
 @club_routes.route('/rankings', methods=['GET'])
 def get_club_rankings():
+    """
+    Precomputed rankings for one quarter, best first (see
+    backend/clubs/rankings.py). Query params: period (e.g. 2025-Q4,
+    default the latest ranked quarter) and type (default Overall).
+    """
+    cursor = None
+    ranking_type = request.args.get('type', rankings.RANKING_TYPE)
     try:
-        period = request.args.get('period', '2025-Q4')
-        
-        # Parse period (e.g., "2025-Q4" -> year=2025, quarter=4)
-        year, quarter = period.split('-Q')
-        year = int(year)
-        quarter = int(quarter)
-        
         cursor = db.cursor(dictionary=True)
+        if request.args.get('period'):
+            try:
+                year, quarter = rankings.parse_period(request.args['period'])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        else:
+            cursor.execute("""
+                SELECT rankingYear, rankingQuarter
+                FROM Rankings
+                WHERE rankingType = %s
+                ORDER BY rankingYear DESC, rankingQuarter DESC
+                LIMIT 1
+            """, (ranking_type,))
+            latest = cursor.fetchone()
+            if latest is None:
+                return jsonify([]), 200
+            year, quarter = latest['rankingYear'], latest['rankingQuarter']
+
         query = """
             SELECT 
                 c.clubID as club_id,
                 c.name as club_name,
                 c.budget,
                 c.competitiveness_level,
+                r.rankPosition as `rank`,
                 r.rankingValue as ranking_score,
-                r.rankingType as ranking_type
-            FROM Clubs c
-            LEFT JOIN Rankings r ON c.clubID = r.clubID 
+                r.rankingType as ranking_type,
+                r.attendanceCount as attendance,
+                r.rsvpCount as rsvps,
+                r.newMembers as new_members,
+                r.avgRating as avg_rating,
+                r.computedAt as computed_at,
+                %s as period
+            FROM Rankings r
+            JOIN Clubs c ON c.clubID = r.clubID
+            WHERE r.rankingType = %s
                 AND r.rankingYear = %s 
                 AND r.rankingQuarter = %s
-            ORDER BY r.rankingValue DESC
+            ORDER BY r.rankingValue DESC, c.name
         """
-        cursor.execute(query, (year, quarter))
-        rankings = cursor.fetchall()
-        return jsonify(rankings), 200
+        cursor.execute(query, (rankings.format_period(year, quarter), ranking_type, year, quarter))
+        return jsonify(cursor.fetchall()), 200
     except Error as e:
         current_app.logger.error(f"Error fetching club rankings: {e}")
         return jsonify({"error": "Error fetching club rankings"}), 500
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
+
+# Quarters that have rankings, newest first
+@club_routes.route('/rankings/periods', methods=['GET'])
+def get_ranking_periods():
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT DISTINCT rankingYear AS year, rankingQuarter AS quarter
+            FROM Rankings
+            WHERE rankingType = %s
+            ORDER BY year DESC, quarter DESC
+        """, (request.args.get('type', rankings.RANKING_TYPE),))
+        periods = [dict(row, period=rankings.format_period(row['year'], row['quarter']))
+                   for row in cursor.fetchall()]
+        return jsonify(periods), 200
+    except Error as e:
+        current_app.logger.error(f"Error fetching ranking periods: {e}")
+        return jsonify({"error": "Error fetching ranking periods"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
+# Recompute one quarter's rankings (default the current quarter)
+@club_routes.route('/rankings', methods=['POST'])
+def compute_club_rankings():
+    cursor = None
+    try:
+        period = request.args.get('period')
+        year, quarter = rankings.parse_period(period) if period else rankings.current_quarter()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        cursor = db.cursor(dictionary=True)
+        rows = rankings.generate(cursor, [(year, quarter)], current_app.config["RANKING_WEIGHTS"])
+        db.commit()
+        return jsonify({
+            "message": "Rankings computed",
+            "period": rankings.format_period(year, quarter),
+            "clubs": len(rows),
+        }), 201
+    except Error as e:
+        current_app.logger.error(f"Error computing club rankings: {e}")
+        return jsonify({"error": "Error computing club rankings"}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
 # [EventsCoord-2.2] Get club events with RSVP stats
 @club_routes.route('/clubs/<club_id>/events', methods=['GET'])
@@ -307,88 +382,79 @@ def get_club_analytics(club_id):
 # [EventsCoord-2.6] Find similar clubs
 @club_routes.route('/clubs/<club_id>/similar', methods=['GET'])
 def get_similar_clubs(club_id):
+    """
+    Clubs most similar to this one by category, event keywords, shared
+    members, attendance profile and event-type mix, best first. Reads
+    the precomputed neighbour list (see backend/clubs/similarity.py).
+
+    Query params: limit (default 10), minEvents (default 0)
+    """
+    cursor = None
+    try:
+        club_id = int(club_id)
+    except ValueError:
+        return jsonify({"error": "club_id must be an integer"}), 400
+    limit = min(request.args.get('limit', 10, type=int), club_similarity.k)
+    min_events = request.args.get('minEvents', 0, type=int)
+
     try:
-        min_events = request.args.get('minEvents', 5, type=int)
-        limit = request.args.get('limit', 10, type=int)
-        
         cursor = db.cursor(dictionary=True)
-        query = """
-            SELECT 
-                c.club_id,
-                c.club_name,
-                c.category,
-                COUNT(DISTINCT e.event_id) AS total_events,
-                AVG(ea.attendance_count) AS avg_attendance,
-                c.contact_email
-            FROM Clubs c
-            JOIN Events e ON c.club_id = e.club_id
-            LEFT JOIN (
-                SELECT event_id, COUNT(*) AS attendance_count
-                FROM Attendance
-                GROUP BY event_id
-            ) ea ON e.event_id = ea.event_id
-            WHERE c.club_id != %s
-                AND c.category IN (
-                    SELECT category 
-                    FROM Clubs 
-                    WHERE club_id = %s
-                )
-            GROUP BY c.club_id, c.club_name, c.category, c.contact_email
-            HAVING COUNT(DISTINCT e.event_id) >= %s
-            ORDER BY avg_attendance DESC
-            LIMIT %s
-        """
-        cursor.execute(query, (club_id, club_id, min_events, limit))
-        similar_clubs = cursor.fetchall()
+        club_similarity.ensure_fresh(cursor)
+        similar_clubs = club_similarity.similar(club_id, limit, min_events)
+        if similar_clubs is None:
+            return jsonify({"error": "Club not found"}), 404
         return jsonify(similar_clubs), 200
     except Error as e:
         current_app.logger.error(f"Error fetching similar clubs: {e}")
         return jsonify({"error": "Error fetching similar clubs"}), 500
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
 
 # [DataAnalyst-4.5] Get club performance metrics
 @club_routes.route('/performance', methods=['GET'])
 def get_club_performance():
+    """
+    Events, RSVPs and check-ins per club over the last `days` days
+    (default 90), summed from the daily rollups.
+    """
+    cursor = None
     try:
         days = request.args.get('days', 90, type=int)
-        start_date_str = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
-        min_events = 1 
-        
+        start_date = (datetime.now() - timedelta(days=days)).date()
+        min_events = 1
+
         cursor = db.cursor(dictionary=True)
         query = """
-            SELECT 
+            SELECT
                 c.clubID as club_id,
                 c.name as club_name,
-                COUNT(DISTINCT e.eventID) AS total_events,
-                COUNT(DISTINCT r.rsvpID) AS total_rsvps,
-                COUNT(DISTINCT sea.attendanceID) AS total_attendance,
-                ROUND(AVG(event_attendance.attendance_count), 2) AS avg_attendance_per_event,
-                ROUND(AVG(event_attendance.attendance_count) * 100.0 / 
+                COUNT(*) AS total_events,
+                CAST(COALESCE(SUM(r.rsvps), 0) AS SIGNED) AS total_rsvps,
+                CAST(COALESCE(SUM(r.attendance), 0) AS SIGNED) AS total_attendance,
+                ROUND(AVG(r.attendance), 2) AS avg_attendance_per_event,
+                ROUND(AVG(r.attendance) * 100.0 /
                     NULLIF(AVG(e.capacity), 0), 2) AS avg_capacity_utilization
             FROM Clubs c
             JOIN Events e ON c.clubID = e.clubID
-            LEFT JOIN RSVPs r ON e.eventID = r.eventID
-                AND r.timestamp >= %s
-            LEFT JOIN Students_Event_Attendees sea ON e.eventID = sea.eventID
-                AND sea.timestamp >= %s
             LEFT JOIN (
-                SELECT eventID, COUNT(*) AS attendance_count
-                FROM Students_Event_Attendees
-                WHERE timestamp >= %s
+                SELECT eventID, SUM(rsvps) AS rsvps, NULLIF(SUM(attendance), 0) AS attendance
+                FROM Rollup_Event_Daily
+                WHERE day >= %s
                 GROUP BY eventID
-            ) event_attendance ON e.eventID = event_attendance.eventID
+            ) r ON e.eventID = r.eventID
             WHERE e.startDateTime >= %s
             GROUP BY c.clubID, c.name
-            HAVING COUNT(DISTINCT e.eventID) >= %s
+            HAVING COUNT(*) >= %s
             ORDER BY avg_attendance_per_event DESC
         """
 
-        cursor.execute(query, (start_date_str, start_date_str, start_date_str, start_date_str, min_events))
+        cursor.execute(query, (start_date, start_date, min_events))
         performance = cursor.fetchall()
         return jsonify(performance), 200
     except Error as e:
         current_app.logger.error(f"Error fetching club performance: {e}")
         return jsonify({"error": "Error fetching club performance"}), 500
     finally:
-        cursor.close()
\ No newline at end of file
+        if cursor:
+            cursor.close()
\ No newline at end of file
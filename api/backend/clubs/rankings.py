@@ -0,0 +1,283 @@
+#------------------------------------------------------------
+# Quarterly club ranking job.
+#
+# One UNION ALL query reads, for a run of consecutive quarters, each
+# club's attendance, confirmed RSVPs and feedback ratings (attributed
+# to the quarter of the event) and its membership joins. The numbers
+# become (quarter, club, metric) NumPy arrays. Each metric is min-max
+# scaled within its quarter, and the score is the weighted mean on a
+# 0-100 scale. Rankings rows are upserted in bulk on
+# (rankingType, rankingYear, rankingQuarter, clubID), so re-running a
+# quarter replaces its rows.
+#
+# Recompute past quarters (chunks run in a process pool):
+#
+#     python -m backend.clubs.rankings --quarters 8 [--end 2025-Q4]
+#                                      [--weights attendance=0.5,rating=0.5]
+#                                      [--workers 4] [--chunk-quarters 2]
+#------------------------------------------------------------
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+
+RANKING_TYPE = "Overall"
+METRICS = ("attendance", "rsvps", "member_growth", "rating")
+DEFAULT_WEIGHTS = {"attendance": 0.35, "rsvps": 0.2, "member_growth": 0.2, "rating": 0.25}
+# ratings are shrunk toward the quarter's mean as if every club had
+# this many extra average ratings, so one 5-star review doesn't top the list
+RATING_PRIOR = 5
+
+_worker_app = None
+
+
+def parse_weights(text):
+    """'attendance=0.5,rating=0.3' -> weights dict; unnamed metrics keep their default."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"unknown ranking metric {name!r}; expected one of {', '.join(METRICS)}")
+        weights[name] = float(value)
+        if weights[name] < 0:
+            raise ValueError(f"ranking weight for {name} must not be negative")
+    if not sum(weights.values()):
+        raise ValueError("at least one ranking weight must be positive")
+    return weights
+
+
+def parse_period(text):
+    """'2025-Q4' -> (2025, 4). Raises ValueError."""
+    year, sep, quarter = (text or "").partition("-Q")
+    year, quarter = int(year), int(quarter)
+    if not sep or not 1 <= quarter <= 4:
+        raise ValueError(f"period must look like 2025-Q4, got {text!r}")
+    return year, quarter
+
+
+def format_period(year, quarter):
+    return f"{year}-Q{quarter}"
+
+
+def current_quarter(today=None):
+    today = today or date.today()
+    return today.year, (today.month - 1) // 3 + 1
+
+
+def quarters_ending(year, quarter, count):
+    """The `count` consecutive quarters ending with (year, quarter), oldest first."""
+    last = year * 4 + quarter - 1
+    return [(index // 4, index % 4 + 1) for index in range(last - count + 1, last + 1)]
+
+
+def _bounds(quarters):
+    (first_year, first_q), (last_year, last_q) = quarters[0], quarters[-1]
+    start = date(first_year, 3 * first_q - 2, 1)
+    end = date(last_year + (last_q == 4), 1 if last_q == 4 else 3 * last_q + 1, 1)
+    return start, end
+
+
+def _read(cursor, quarters):
+    """{(clubID, period index, metric): (total, count)} for consecutive quarters."""
+    start, end = _bounds(quarters)
+    period = "(YEAR({col}) - %(year)s) * 4 + QUARTER({col}) - %(quarter)s"
+    event_period = period.format(col="e.startDateTime")
+    params = {"year": quarters[0][0], "quarter": quarters[0][1], "start": start, "end": end}
+
+    # club_memberships has no lower bound: joins before the first
+    # quarter (period -1) give the member count the growth is relative to
+    cursor.execute(f"""
+        SELECT e.clubID AS clubID, {event_period} AS period, 'attendance' AS metric,
+               COUNT(*) AS total, COUNT(*) AS n
+        FROM Students_Event_Attendees a
+        JOIN Events e ON e.eventID = a.eventID
+        WHERE e.startDateTime >= %(start)s AND e.startDateTime < %(end)s
+        GROUP BY e.clubID, period
+        UNION ALL
+        SELECT e.clubID, {event_period} AS period, 'rsvps', COUNT(*), COUNT(*)
+        FROM RSVPs r
+        JOIN Events e ON e.eventID = r.eventID
+        WHERE r.status = 'confirmed'
+          AND e.startDateTime >= %(start)s AND e.startDateTime < %(end)s
+        GROUP BY e.clubID, period
+        UNION ALL
+        SELECT e.clubID, {event_period} AS period, 'rating', SUM(f.rating), COUNT(f.rating)
+        FROM Feedback f
+        JOIN Events e ON e.eventID = f.eventID
+        WHERE e.startDateTime >= %(start)s AND e.startDateTime < %(end)s
+        GROUP BY e.clubID, period
+        UNION ALL
+        SELECT club_id, GREATEST({period.format(col="join_date")}, -1) AS period,
+               'members', COUNT(*), COUNT(*)
+        FROM club_memberships
+        WHERE join_date < %(end)s
+        GROUP BY club_id, period
+    """, params)
+    return {(row["clubID"], int(row["period"]), row["metric"]): (float(row["total"] or 0), int(row["n"]))
+            for row in cursor.fetchall()}
+
+
+def _scale(values):
+    """Min-max scale each quarter's row to [0, 1]; a quarter where all clubs tie scales to 0."""
+    low = values.min(axis=1, keepdims=True)
+    span = values.max(axis=1, keepdims=True) - low
+    span[span == 0] = 1.0
+    return (values - low) / span
+
+
+def compute(cursor, quarters, weights=None):
+    """
+    Score and rank every club for each of the consecutive `quarters`.
+    Returns one dict per (quarter, club).
+    """
+    if not quarters:
+        return []
+    weights = weights or DEFAULT_WEIGHTS
+    cursor.execute("SELECT clubID FROM Clubs ORDER BY clubID")
+    club_ids = [row["clubID"] for row in cursor.fetchall()]
+    if not club_ids:
+        return []
+    column = {club_id: c for c, club_id in enumerate(club_ids)}
+    shape = (len(quarters), len(club_ids))
+
+    attendance, rsvps = np.zeros(shape), np.zeros(shape)
+    joins, rating_sum, rating_n = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    members_before = np.zeros(len(club_ids))
+    for (club_id, period, metric), (total, n) in _read(cursor, quarters).items():
+        c = column.get(club_id)
+        if c is None or period >= len(quarters):
+            continue
+        if metric == "members":
+            if period < 0:
+                members_before[c] += total
+            else:
+                joins[period, c] += total
+        elif metric == "attendance":
+            attendance[period, c] = total
+        elif metric == "rsvps":
+            rsvps[period, c] = total
+        elif metric == "rating":
+            rating_sum[period, c], rating_n[period, c] = total, n
+
+    members_at_start = members_before + np.cumsum(joins, axis=0) - joins
+    growth = joins / (members_at_start + 1)
+
+    rated = rating_n.sum(axis=1, keepdims=True)
+    quarter_mean = np.divide(rating_sum.sum(axis=1, keepdims=True), rated,
+                             out=np.full_like(rated, 3.0), where=rated > 0)
+    smoothed_rating = (rating_sum + RATING_PRIOR * quarter_mean) / (rating_n + RATING_PRIOR)
+
+    features = {
+        "attendance": np.log1p(attendance),
+        "rsvps": np.log1p(rsvps),
+        "member_growth": np.log1p(growth),
+        "rating": smoothed_rating,
+    }
+    total_weight = sum(weights[m] for m in METRICS)
+    scores = sum(_scale(features[m]) * weights[m] for m in METRICS) * (100.0 / total_weight)
+    scores = np.round(scores, 2)
+
+    # competition ranking: ties share a position, the next one skips
+    positions = np.empty(shape, dtype=np.int64)
+    for q in range(len(quarters)):
+        ascending = np.sort(scores[q])
+        positions[q] = len(club_ids) - np.searchsorted(ascending, scores[q], side="right") + 1
+
+    avg_rating = np.divide(rating_sum, rating_n, out=np.full(shape, np.nan), where=rating_n > 0)
+    rows = []
+    for q, (year, quarter) in enumerate(quarters):
+        for c, club_id in enumerate(club_ids):
+            rows.append({
+                "clubID": club_id,
+                "rankingYear": year,
+                "rankingQuarter": quarter,
+                "rankingValue": float(scores[q, c]),
+                "rankPosition": int(positions[q, c]),
+                "attendanceCount": int(attendance[q, c]),
+                "rsvpCount": int(rsvps[q, c]),
+                "newMembers": int(joins[q, c]),
+                "avgRating": None if np.isnan(avg_rating[q, c]) else round(float(avg_rating[q, c]), 2),
+            })
+    return rows
+
+
+def generate(cursor, quarters, weights=None):
+    """Compute and upsert the rankings for `quarters`. The caller commits."""
+    rows = compute(cursor, quarters, weights)
+    computed_at = datetime.now()
+    cursor.executemany("""
+        INSERT INTO Rankings
+            (clubID, rankingValue, rankingType, rankingYear, rankingQuarter, rankPosition,
+             attendanceCount, rsvpCount, newMembers, avgRating, computedAt)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            rankingValue = VALUES(rankingValue),
+            rankPosition = VALUES(rankPosition),
+            attendanceCount = VALUES(attendanceCount),
+            rsvpCount = VALUES(rsvpCount),
+            newMembers = VALUES(newMembers),
+            avgRating = VALUES(avgRating),
+            computedAt = VALUES(computedAt)
+    """, [
+        (r["clubID"], r["rankingValue"], RANKING_TYPE, r["rankingYear"], r["rankingQuarter"],
+         r["rankPosition"], r["attendanceCount"], r["rsvpCount"], r["newMembers"],
+         r["avgRating"], computed_at)
+        for r in rows
+    ])
+    return rows
+
+
+def backfill(end, quarters, weights=None, workers=4, chunk_quarters=2):
+    """Rank `quarters` quarters ending with `end` (year, quarter), chunks spread over a process pool."""
+    periods = quarters_ending(*end, quarters)
+    chunks = [periods[i:i + chunk_quarters] for i in range(0, len(periods), chunk_quarters)]
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker()
+        return sum(_generate_chunk(chunk, weights) for chunk in chunks)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             initializer=_init_worker) as pool:
+        return sum(pool.map(_generate_chunk, chunks, [weights] * len(chunks)))
+
+
+def _init_worker():
+    global _worker_app
+    from backend.rest_entry import create_app
+
+    os.environ.setdefault("DB_POOL_MIN_SIZE", "1")
+    os.environ["CACHE_BACKEND"] = "none"
+    _worker_app = create_app()
+
+
+def _generate_chunk(quarters, weights):
+    from pymysql.cursors import DictCursor
+    from backend.db_connection import db
+
+    with _worker_app.app_context(), db.connection() as conn:
+        with conn.cursor(DictCursor) as cursor:
+            generate(cursor, quarters, weights)
+        conn.commit()
+    return len(quarters)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute quarterly club Rankings rows")
+    parser.add_argument("--quarters", type=int, default=1,
+                        help="number of quarters to compute (default 1)")
+    parser.add_argument("--end", type=parse_period, default=current_quarter(),
+                        help="newest quarter, e.g. 2025-Q4 (default the current quarter)")
+    parser.add_argument("--weights", type=parse_weights, default=os.getenv("RANKING_WEIGHTS", ""),
+                        help="metric=weight pairs, e.g. attendance=0.5,rating=0.5")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-quarters", type=int, default=2,
+                        help="quarters computed per worker task")
+    args = parser.parse_args(argv)
+
+    generated = backfill(args.end, args.quarters, args.weights, args.workers, args.chunk_quarters)
+    print(f"Ranked {generated} quarters ending {format_period(*args.end)}")
+
+
+if __name__ == "__main__":
+    main()
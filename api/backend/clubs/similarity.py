@@ -0,0 +1,402 @@
+#------------------------------------------------------------
+# In-process club similarity engine.
+#
+# Every club becomes one row of a NumPy feature matrix made of five
+# blocks: category (Clubs.categoryID plus Club_Categories), keyword
+# bag (TF-IDF weighted tags of the club's events), members (hashed
+# one-hot of club_memberships, so the dot product of two clubs counts
+# shared members), attendance profile (z-scored activity numbers) and
+# event-type mix. Each block is L2-normalized and weighted, and the
+# whole row is normalized again, so a matrix product gives cosine
+# similarity. The top-k neighbours of every club are precomputed in
+# batched matrix products; /clubs/<id>/similar only reads that list.
+#
+# Changes are applied incrementally: routes mark the clubs or events
+# they touch as dirty, and a periodic fingerprint check (member and
+# event counts per club) catches changes made any other way. Only the
+# dirty rows are re-read and re-encoded, and only neighbour lists that
+# can have changed are recomputed. Vocabularies and normalization
+# statistics are frozen at the last full build, which is redone every
+# rebuild_seconds or when an update brings something the frozen
+# vocabularies have not seen (a new club, category, keyword or type).
+#------------------------------------------------------------
+import threading
+import time
+
+import numpy as np
+
+from backend.db_connection import in_list
+
+WEIGHTS = {
+    "category": 1.0,
+    "keywords": 1.0,
+    "members": 1.5,
+    "attendance": 0.5,
+    "event_types": 1.0,
+}
+MEMBER_BUCKETS = 4096
+BATCH_ROWS = 1024
+OTHER_TYPE = "other"
+
+
+class _NeedsRebuild(Exception):
+    """An incremental update hit something only a full build can encode."""
+
+
+def _where(column, club_ids, prefix="WHERE"):
+    if club_ids is None:
+        return "", []
+    return f"{prefix} {column} IN ({in_list(club_ids)})", list(club_ids)
+
+
+def _normalize_rows(block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return block / norms
+
+
+def _member_buckets(student_ids, buckets):
+    # multiplicative hash so consecutive IDs spread over the buckets
+    ids = np.asarray(student_ids, dtype=np.uint64)
+    return ((ids * np.uint64(2654435761)) % np.uint64(2 ** 32) % np.uint64(buckets)).astype(np.intp)
+
+
+def _read_features(cursor, club_ids=None):
+    """Raw per-club data for every club, or only for club_ids."""
+    where, args = _where("c.clubID", club_ids)
+    cursor.execute(f"""
+        SELECT c.clubID, c.name, c.email, c.categoryID, cat.name AS category
+        FROM Clubs c
+        LEFT JOIN Categories cat ON cat.categoryID = c.categoryID
+        {where}
+    """, args)
+    clubs = {row["clubID"]: dict(row, categories={row["categoryID"]} - {None},
+                                 keywords={}, members=[], events=[])
+             for row in cursor.fetchall()}
+    if not clubs:
+        return clubs
+
+    where, args = _where("clubID", club_ids)
+    cursor.execute(f"SELECT clubID, categoryID FROM Club_Categories {where}", args)
+    for row in cursor.fetchall():
+        if row["clubID"] in clubs:
+            clubs[row["clubID"]]["categories"].add(row["categoryID"])
+
+    where, args = _where("e.clubID", club_ids)
+    cursor.execute(f"""
+        SELECT e.clubID, eek.keywordID, COUNT(*) AS n
+        FROM Events e
+        JOIN Events_Event_Keywords eek ON eek.eventID = e.eventID
+        {where}
+        GROUP BY e.clubID, eek.keywordID
+    """, args)
+    for row in cursor.fetchall():
+        if row["clubID"] in clubs:
+            clubs[row["clubID"]]["keywords"][row["keywordID"]] = row["n"]
+
+    where, args = _where("club_id", club_ids)
+    cursor.execute(f"SELECT club_id, student_id FROM club_memberships {where}", args)
+    for row in cursor.fetchall():
+        if row["club_id"] in clubs:
+            clubs[row["club_id"]]["members"].append(row["student_id"])
+
+    where, args = _where("e.clubID", club_ids)
+    cursor.execute(f"""
+        SELECT e.clubID, e.eventType, e.capacity, COUNT(a.attendanceID) AS attended
+        FROM Events e
+        LEFT JOIN Students_Event_Attendees a ON a.eventID = e.eventID
+        {where}
+        GROUP BY e.eventID, e.clubID, e.eventType, e.capacity
+    """, args)
+    for row in cursor.fetchall():
+        if row["clubID"] in clubs:
+            clubs[row["clubID"]]["events"].append(row)
+    return clubs
+
+
+def _fingerprints(cursor):
+    """{clubID: (members, last join, events, last event update)} for change detection."""
+    cursor.execute("""
+        SELECT c.clubID, m.members, m.last_join, e.events, e.last_update
+        FROM Clubs c
+        LEFT JOIN (
+            SELECT club_id, COUNT(*) AS members, MAX(join_date) AS last_join
+            FROM club_memberships
+            GROUP BY club_id
+        ) m ON m.club_id = c.clubID
+        LEFT JOIN (
+            SELECT clubID, COUNT(*) AS events, MAX(lastUpdated) AS last_update
+            FROM Events
+            GROUP BY clubID
+        ) e ON e.clubID = c.clubID
+    """)
+    return {row["clubID"]: (row["members"], row["last_join"], row["events"], row["last_update"])
+            for row in cursor.fetchall()}
+
+
+def _summary(club):
+    events = club["events"]
+    attended = [e["attended"] for e in events]
+    return {
+        "club_id": club["clubID"],
+        "club_name": club["name"],
+        "category": club["category"],
+        "contact_email": club["email"],
+        "member_count": len(club["members"]),
+        "total_events": len(events),
+        "avg_attendance": round(float(np.mean(attended)), 1) if attended else 0.0,
+    }
+
+
+def _activity(club):
+    events = club["events"]
+    attended = np.array([e["attended"] for e in events], dtype=np.float64)
+    fill = [e["attended"] / e["capacity"] for e in events if e["capacity"]]
+    return [
+        np.log1p(len(events)),
+        np.log1p(attended.mean()) if len(attended) else 0.0,
+        float(np.mean(fill)) if fill else 0.0,
+        np.log1p(len(club["members"])),
+    ]
+
+
+class _Encoder:
+    """Vocabularies and normalization statistics frozen at a full build."""
+
+    def __init__(self, clubs, member_buckets):
+        self.member_buckets = member_buckets
+        self.categories = {c: i for i, c in enumerate(
+            sorted({c for club in clubs.values() for c in club["categories"]}))}
+        self.keywords = {k: i for i, k in enumerate(
+            sorted({k for club in clubs.values() for k in club["keywords"]}))}
+        self.event_types = {t: i for i, t in enumerate(
+            sorted({e["eventType"] or OTHER_TYPE for club in clubs.values() for e in club["events"]}))}
+
+        # inverse document frequency of each keyword across clubs
+        df = np.zeros(len(self.keywords))
+        for club in clubs.values():
+            for keyword_id in club["keywords"]:
+                df[self.keywords[keyword_id]] += 1
+        self.idf = np.log((1 + len(clubs)) / (1 + df)) + 1
+
+        activity = np.array([_activity(club) for club in clubs.values()]).reshape(-1, 4)
+        self.activity_mean = activity.mean(axis=0) if len(activity) else np.zeros(4)
+        std = activity.std(axis=0) if len(activity) else np.ones(4)
+        std[std == 0] = 1.0
+        self.activity_std = std
+
+    def _index(self, vocab, key):
+        try:
+            return vocab[key]
+        except KeyError:
+            raise _NeedsRebuild(key)
+
+    def encode(self, rows):
+        """Feature matrix (float32, unit rows) for a list of raw clubs."""
+        n = len(rows)
+        category = np.zeros((n, len(self.categories)))
+        keywords = np.zeros((n, len(self.keywords)))
+        members = np.zeros((n, self.member_buckets))
+        event_types = np.zeros((n, len(self.event_types)))
+        activity = np.zeros((n, 4))
+
+        for r, club in enumerate(rows):
+            for category_id in club["categories"]:
+                category[r, self._index(self.categories, category_id)] = 1.0
+            for keyword_id, count in club["keywords"].items():
+                keywords[r, self._index(self.keywords, keyword_id)] = count
+            if club["members"]:
+                np.add.at(members[r], _member_buckets(club["members"], self.member_buckets), 1.0)
+            for event in club["events"]:
+                event_types[r, self._index(self.event_types, event["eventType"] or OTHER_TYPE)] += 1
+            activity[r] = _activity(club)
+
+        keywords *= self.idf
+        activity = (activity - self.activity_mean) / self.activity_std
+        blocks = {
+            "category": category,
+            "keywords": keywords,
+            "members": members,
+            "attendance": activity,
+            "event_types": event_types,
+        }
+        features = np.hstack([_normalize_rows(blocks[name]) * np.sqrt(weight)
+                              for name, weight in WEIGHTS.items()])
+        return _normalize_rows(features).astype(np.float32)
+
+
+def _top_k(queries, matrix, query_rows, k):
+    """Indices and similarities of the k (< len(matrix)) nearest rows to each query, best first."""
+    indices = np.empty((len(query_rows), k), dtype=np.int32)
+    scores = np.empty((len(query_rows), k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    for start in range(0, len(query_rows), BATCH_ROWS):
+        stop = start + BATCH_ROWS
+        sims = queries[start:stop] @ matrix.T
+        batch_rows = np.asarray(query_rows[start:stop])
+        sims[np.arange(len(batch_rows)), batch_rows] = -np.inf  # not your own neighbour
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_sims = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_sims, axis=1, kind="stable")
+        indices[start:stop] = np.take_along_axis(part, order, axis=1)
+        scores[start:stop] = np.take_along_axis(part_sims, order, axis=1)
+    return indices, scores
+
+
+class ClubSimilarity:
+    """Top-k similar clubs, rebuilt every rebuild_seconds and updated incrementally in between."""
+
+    def __init__(self, k=25, rebuild_seconds=3600, check_seconds=60, member_buckets=MEMBER_BUCKETS):
+        self.k = k
+        self.rebuild_seconds = rebuild_seconds
+        self.check_seconds = check_seconds
+        self.member_buckets = member_buckets
+        self._lock = threading.RLock()
+        self._dirty_clubs = set()
+        self._dirty_events = set()
+        self._loaded_at = None
+        self._checked_at = None
+        self._clear()
+
+    def _clear(self):
+        self._club_ids = np.empty(0, dtype=np.int64)
+        self._rows = {}
+        self._summaries = []
+        self._features = np.empty((0, 0), dtype=np.float32)
+        self._neighbours = np.empty((0, 0), dtype=np.int32)
+        self._scores = np.empty((0, 0), dtype=np.float32)
+        self._encoder = None
+        self._fingerprints = {}
+
+    # change tracking ---------------------------------------------------
+
+    def mark_clubs_dirty(self, club_ids):
+        with self._lock:
+            self._dirty_clubs.update(int(c) for c in club_ids if c is not None)
+
+    def mark_events_dirty(self, event_ids):
+        """Mark the clubs hosting these events; resolved to clubs on the next refresh."""
+        with self._lock:
+            self._dirty_events.update(int(e) for e in event_ids if e is not None)
+
+    # building ------------------------------------------------------------
+
+    def ensure_fresh(self, cursor):
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at >= self.rebuild_seconds:
+                self.load(cursor)
+                return
+            if now - self._checked_at >= self.check_seconds:
+                self._check_fingerprints(cursor)
+            if self._dirty_clubs or self._dirty_events:
+                self._apply_dirty(cursor)
+
+    def load(self, cursor):
+        """Full build: read every club, freeze the encoder, compute all neighbour lists."""
+        with self._lock:
+            fingerprints = _fingerprints(cursor)
+            clubs = _read_features(cursor)
+            self._clear()
+            self._dirty_clubs.clear()
+            self._dirty_events.clear()
+            rows = [clubs[club_id] for club_id in sorted(clubs)]
+            self._club_ids = np.array([club["clubID"] for club in rows], dtype=np.int64)
+            self._rows = {club["clubID"]: r for r, club in enumerate(rows)}
+            self._summaries = [_summary(club) for club in rows]
+            self._encoder = _Encoder(clubs, self.member_buckets)
+            self._features = self._encoder.encode(rows)
+            self._neighbours, self._scores = _top_k(
+                self._features, self._features, list(range(len(rows))), self._width())
+            self._fingerprints = fingerprints
+            self._loaded_at = self._checked_at = time.monotonic()
+
+    def _width(self):
+        return max(min(self.k, len(self._club_ids) - 1), 0)
+
+    def _check_fingerprints(self, cursor):
+        fingerprints = _fingerprints(cursor)
+        self._checked_at = time.monotonic()
+        if fingerprints.keys() != self._fingerprints.keys():
+            self._dirty_clubs.update(fingerprints.keys() ^ self._fingerprints.keys())
+        self._dirty_clubs.update(club_id for club_id, fp in fingerprints.items()
+                                 if self._fingerprints.get(club_id) not in (None, fp))
+        self._fingerprints = fingerprints
+
+    def _apply_dirty(self, cursor):
+        dirty = set(self._dirty_clubs)
+        if self._dirty_events:
+            events = sorted(self._dirty_events)
+            cursor.execute(
+                f"SELECT DISTINCT clubID FROM Events WHERE eventID IN ({in_list(events)})", events
+            )
+            dirty.update(row["clubID"] for row in cursor.fetchall() if row["clubID"] is not None)
+        self._dirty_clubs.clear()
+        self._dirty_events.clear()
+        if not dirty:
+            return
+
+        clubs = _read_features(cursor, sorted(dirty))
+        if clubs.keys() != dirty or not dirty <= self._rows.keys():
+            self.load(cursor)  # clubs were added or removed
+            return
+        try:
+            changed = [clubs[club_id] for club_id in sorted(dirty)]
+            features = self._encoder.encode(changed)
+        except _NeedsRebuild:
+            self.load(cursor)
+            return
+
+        dirty_rows = np.array([self._rows[club["clubID"]] for club in changed], dtype=np.intp)
+        self._features[dirty_rows] = features
+        for row, club in zip(dirty_rows, changed):
+            self._summaries[row] = _summary(club)
+        self._refresh_neighbours(dirty_rows)
+
+    def _refresh_neighbours(self, dirty_rows):
+        """Recompute the neighbour lists that can have changed after rows in dirty_rows moved."""
+        k = self._width()
+        if k == 0:
+            return
+        is_dirty = np.zeros(len(self._club_ids), dtype=bool)
+        is_dirty[dirty_rows] = True
+
+        # a list that held a dirty club may need a replacement from anywhere: recompute it
+        recompute = is_dirty | np.isin(self._neighbours, dirty_rows).any(axis=1)
+        rows = np.flatnonzero(recompute)
+        self._neighbours[rows], self._scores[rows] = _top_k(
+            self._features[rows], self._features, rows, k)
+
+        # every other list is still the top k among unchanged clubs: merge in the dirty ones
+        rest = np.flatnonzero(~recompute)
+        if len(rest) == 0:
+            return
+        dirty_sims = self._features[rest] @ self._features[dirty_rows].T
+        candidates = np.hstack([self._neighbours[rest],
+                                np.broadcast_to(dirty_rows, (len(rest), len(dirty_rows)))])
+        sims = np.hstack([self._scores[rest], dirty_sims])
+        order = np.argsort(-sims, axis=1, kind="stable")[:, :k]
+        self._neighbours[rest] = np.take_along_axis(candidates, order, axis=1)
+        self._scores[rest] = np.take_along_axis(sims, order, axis=1)
+
+    # lookups ---------------------------------------------------------------
+
+    def similar(self, club_id, limit=10, min_events=0):
+        """The club's nearest clubs, best first, or None if the club is unknown."""
+        with self._lock:
+            row = self._rows.get(club_id)
+            if row is None:
+                return None
+            results = []
+            for neighbour, score in zip(self._neighbours[row], self._scores[row]):
+                summary = self._summaries[neighbour]
+                if summary["total_events"] < min_events:
+                    continue
+                results.append(dict(summary, similarity=round(float(score), 4)))
+                if len(results) == limit:
+                    break
+            return results
+
+
+club_similarity = ClubSimilarity()
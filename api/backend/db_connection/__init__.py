@@ -1,13 +1,77 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
+from flask import g
 from flaskext.mysql import MySQL
 from pymysql import cursors
 
+from backend.db_connection.pool import ConnectionPool, PoolTimeout
+from backend.db_connection.sql import in_list, retry_on_deadlock
 
-# the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
+
+class PooledMySQL(MySQL):
+    """
+    Flask-MySQL, but every request borrows its connection from a
+    ConnectionPool instead of opening (and closing) a brand new one.
+    """
+
+    def __init__(self, app=None, prefix="mysql", **connect_args):
+        self.pool = None
+        super().__init__(app, prefix, **connect_args)
+
+    def init_app(self, app):
+        super().init_app(app)
+        app.config.setdefault("MYSQL_POOL_MIN_SIZE", 2)
+        app.config.setdefault("MYSQL_POOL_MAX_SIZE", 10)
+        app.config.setdefault("MYSQL_POOL_MAX_LIFETIME", 1800)
+        app.config.setdefault("MYSQL_POOL_TIMEOUT", 10.0)
+        app.config.setdefault("MYSQL_POOL_PING_AFTER", 0.0)
+
+        self.pool = ConnectionPool(
+            self.connect,
+            min_size=app.config["MYSQL_POOL_MIN_SIZE"],
+            max_size=app.config["MYSQL_POOL_MAX_SIZE"],
+            max_lifetime=app.config["MYSQL_POOL_MAX_LIFETIME"],
+            timeout=app.config["MYSQL_POOL_TIMEOUT"],
+            ping_after=app.config["MYSQL_POOL_PING_AFTER"],
+            logger=app.logger,
+        )
+        # Release on app context teardown too, so code running inside
+        # app.app_context() (scripts, jobs) hands its connection back.
+        app.teardown_appcontext(self.teardown_request)
+
+        # Pre-warm the pool so the first requests don't pay for the
+        # connect handshake. The db container may still be starting,
+        # in which case connections are simply opened on demand.
+        try:
+            opened = self.pool.warm()
+            app.logger.info(f"PooledMySQL: warmed {opened} database connections")
+        except Exception as e:
+            app.logger.warning(f"PooledMySQL: could not pre-warm connection pool: {e}")
+
+    def get_db(self):
+        entry = g.get("_mysql_pool_entry")
+        if entry is None:
+            entry = self.pool.checkout()
+            g._mysql_pool_entry = entry
+        return entry.conn
+
+    def teardown_request(self, exception):
+        entry = g.pop("_mysql_pool_entry", None)
+        if entry is not None:
+            self.pool.checkin(entry, discard=not entry.conn.open)
+
+    def connection(self):
+        """Borrow a pooled connection outside of the request's own one."""
+        return self.pool.connection()
+
+    def pool_stats(self):
+        return self.pool.stats() if self.pool else {}
+
+
+# the parameter instructs the connection to return data
+# as a dictionary object.
+db = PooledMySQL(cursorclass=cursors.DictCursor)
 
 # Custom cursor method to make db.cursor() work with Flask-MySQL
 def cursor(dictionary=True):
@@ -19,4 +83,4 @@ def commit():
 
 # Attach methods to db object
 db.cursor = cursor
-db.commit = commit
\ No newline at end of file
+db.commit = commit
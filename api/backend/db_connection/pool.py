@@ -0,0 +1,223 @@
+#------------------------------------------------------------
+# A small thread-safe pool of PyMySQL connections.
+#
+# Connections are handed out LIFO so the warmest ones get reused,
+# pinged before they are handed out, and closed once they have
+# been open longer than max_lifetime seconds.
+#------------------------------------------------------------
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from pymysql.err import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    """Raised when no connection became free within the checkout timeout."""
+
+
+class _Entry:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    def __init__(self, connect, min_size=2, max_size=10, max_lifetime=1800,
+                 timeout=10.0, ping_after=0.0, logger=None):
+        if min_size > max_size:
+            raise ValueError("min_size cannot be larger than max_size")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.logger = logger
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+
+        # counters reported by stats()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._peak_in_use = 0
+
+    def warm(self):
+        """Open connections until the pool holds at least min_size."""
+        opened = 0
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    break
+                self._size += 1
+            try:
+                entry = self._new_entry()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.appendleft(entry)
+                self._cond.notify()
+            opened += 1
+        return opened
+
+    def checkout(self):
+        """Borrow a live connection, waiting up to `timeout` seconds for one."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        entry = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            waited = time.monotonic() - started
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if entry is None:
+                entry = self._new_entry()
+            else:
+                entry = self._validate(entry)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return entry
+
+    def checkin(self, entry, discard=False):
+        """Return a borrowed connection; uncommitted work is rolled back."""
+        if not discard:
+            try:
+                entry.conn.rollback()
+            except Exception:
+                discard = True
+        if not discard and self._expired(entry):
+            discard = True
+            with self._cond:
+                self._recycled += 1
+
+        if discard:
+            self._close(entry)
+        else:
+            entry.last_used = time.monotonic()
+
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out for the duration of a `with` block."""
+        entry = self.checkout()
+        try:
+            yield entry.conn
+        except BaseException:
+            self.checkin(entry, discard=not entry.conn.open)
+            raise
+        else:
+            self.checkin(entry)
+
+    def close(self):
+        """Close every idle connection; borrowed ones close when returned."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "peak_in_use": self._peak_in_use,
+                "utilization": round(self._in_use / self.max_size, 4),
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_recycled": self._recycled,
+                "ping_failures": self._ping_failures,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_avg": round(self._wait_total / checkouts, 6) if checkouts else 0.0,
+                "wait_seconds_max": round(self._wait_max, 6),
+            }
+
+    def _new_entry(self):
+        entry = _Entry(self._connect())
+        with self._cond:
+            self._created += 1
+        return entry
+
+    def _expired(self, entry):
+        return bool(self.max_lifetime) and \
+            time.monotonic() - entry.created_at >= self.max_lifetime
+
+    def _validate(self, entry):
+        # Recycle connections that have lived too long, then make sure
+        # the one we hand out is still alive on the server side.
+        if self._expired(entry):
+            self._close(entry)
+            with self._cond:
+                self._recycled += 1
+            return self._new_entry()
+
+        if time.monotonic() - entry.last_used >= self.ping_after:
+            try:
+                entry.conn.ping(reconnect=False)
+            except Exception as e:
+                with self._cond:
+                    self._ping_failures += 1
+                if self.logger:
+                    self.logger.warning(f"Pooled connection failed ping, replacing it: {e}")
+                self._close(entry)
+                return self._new_entry()
+        return entry
+
+    @staticmethod
+    def _close(entry):
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,34 @@
+#------------------------------------------------------------
+# Small helpers for building and running parameterized SQL.
+#------------------------------------------------------------
+import time
+from functools import wraps
+
+from pymysql.err import OperationalError
+
+DEADLOCK_RETRIES = 3
+_DEADLOCK_ERRORS = (1205, 1213)  # lock wait timeout, deadlock
+
+
+def in_list(values):
+    """Placeholders for an IN (...) list of len(values) parameters."""
+    return ", ".join(["%s"] * len(values))
+
+
+def retry_on_deadlock(fn):
+    """
+    Re-run fn(cursor, ...) after a deadlock or lock wait timeout. InnoDB
+    has rolled the transaction back by then, so fn must be the only work
+    in its transaction.
+    """
+    @wraps(fn)
+    def wrapper(cursor, *args, **kwargs):
+        for attempt in range(DEADLOCK_RETRIES + 1):
+            try:
+                return fn(cursor, *args, **kwargs)
+            except OperationalError as e:
+                if e.args[0] not in _DEADLOCK_ERRORS or attempt == DEADLOCK_RETRIES:
+                    raise
+                cursor.connection.rollback()
+                time.sleep(0.01 * (attempt + 1))
+    return wrapper
@@ -0,0 +1,100 @@
+#------------------------------------------------------------
+# Streaming exports for the large list endpoints.
+#
+# With ?format=ndjson or ?format=csv a route hands its query to
+# stream_response() instead of fetchall() + jsonify. Rows are read
+# through an unbuffered server-side cursor (SSDictCursor) on a pooled
+# connection of their own and written out in small chunks, so memory
+# stays flat however many rows the query returns.
+#------------------------------------------------------------
+import csv
+import io
+
+from flask import Response, current_app, request
+from pymysql.cursors import SSDictCursor
+
+from backend.db_connection import db
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CHUNK_ROWS = 500
+
+
+def requested_format():
+    """
+    The streaming format asked for with ?format=, or None for the normal
+    JSON response. Raises ValueError for an unknown format.
+    """
+    fmt = request.args.get("format", "").strip().lower()
+    if fmt in ("", "json"):
+        return None
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"format must be one of json, {', '.join(STREAM_FORMATS)}")
+    return fmt
+
+
+def stream_response(query, args=None, fmt="ndjson", filename="export"):
+    """
+    Run `query` on an unbuffered cursor and stream the rows as NDJSON or
+    CSV. The query is executed before the response is returned, so SQL
+    errors still reach the route's error handling.
+    """
+    rows = _rows(query, args)
+    columns = next(rows)
+    if fmt == "csv":
+        body = _csv_chunks(columns, rows)
+    else:
+        body = _ndjson_chunks(rows, current_app.json)
+
+    response = Response(body, mimetype=STREAM_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _rows(query, args):
+    """Yield the column names, then every row, from a server-side cursor."""
+    with db.connection() as conn:
+        cursor = conn.cursor(SSDictCursor)
+        finished = False
+        try:
+            cursor.execute(query, args)
+            yield [column[0] for column in cursor.description or ()]
+            for row in cursor:
+                yield row
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # The client went away mid-stream: drop the connection
+                # rather than drain the rest of the unread result set.
+                conn.close()
+
+
+def _ndjson_chunks(rows, json_provider):
+    lines = []
+    for row in rows:
+        lines.append(json_provider.dumps(row))
+        if len(lines) >= CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,167 @@
+#------------------------------------------------------------
+# Bulk, idempotent event check-in.
+#
+# A batch of door scans becomes one multi-row INSERT ... ON DUPLICATE
+# KEY UPDATE on Students_Event_Attendees' (studentID, eventID) key, so
+# a whole batch costs one round trip and one commit, and re-scanning a
+# student is not an error. A duplicate keeps the earliest timestamp
+# seen, which lets offline scanners replay their queues in any order.
+# A scan is new if the student had no row for the event before the
+# batch; the event row is locked first, so concurrent batches for one
+# event take turns. New check-ins are added to the day's active-student
+# sketches and, like moved timestamps, to the activity rollups in the
+# same transaction.
+#------------------------------------------------------------
+from datetime import datetime
+
+from backend.analytics import rollups, sketches
+from backend.db_connection.sql import in_list, retry_on_deadlock
+
+MAX_BATCH = 1000
+
+NEW = "new"
+DUPLICATE = "duplicate"
+UNKNOWN_STUDENT = "unknown_student"
+INVALID = "invalid"
+
+
+def parse_scans(items):
+    """
+    Normalize a batch of scans into [(student_id or None, timestamp or None)].
+    Items are student IDs or {"student_id", "timestamp"} objects; a
+    missing timestamp means now. Unparseable entries come back as None.
+    """
+    now = datetime.now()
+    scans = []
+    for item in items:
+        if not isinstance(item, dict):
+            item = {"student_id": item}
+        try:
+            student_id = int(item.get("student_id"))
+        except (TypeError, ValueError):
+            scans.append((None, None))
+            continue
+        timestamp = item.get("timestamp")
+        if timestamp:
+            try:
+                timestamp = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+            except ValueError:
+                scans.append((student_id, None))
+                continue
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+        scans.append((student_id, timestamp or now))
+    return scans
+
+
+@retry_on_deadlock
+def check_in_batch(cursor, event_id, scans):
+    """
+    Check in every (student_id, timestamp) scan for one event. Returns
+    one {"student_id", "result", "attendance_id"} per scan, in order,
+    or None if the event does not exist. Must be the only work in its
+    transaction (it is retried after a deadlock); the caller commits.
+    """
+    # the event row lock serializes check-ins to one event, so the
+    # existing check-ins read below cannot change until commit
+    cursor.execute("""
+        SELECT e.eventID, e.clubID, c.categoryID
+        FROM Events e
+        LEFT JOIN Clubs c ON c.clubID = e.clubID
+        WHERE e.eventID = %s
+        FOR UPDATE OF e
+    """, (event_id,))
+    event = cursor.fetchone()
+    if event is None:
+        return None
+
+    results = [{"student_id": sid, "result": INVALID, "attendance_id": None} for sid, _ in scans]
+
+    # first scan of each student in the batch wins; later ones are duplicates
+    earliest = {}
+    for index, (student_id, timestamp) in enumerate(scans):
+        if student_id is None or timestamp is None:
+            continue
+        if student_id in earliest:
+            first = earliest[student_id]
+            if timestamp < scans[first][1]:
+                earliest[student_id] = index
+        else:
+            earliest[student_id] = index
+    if not earliest:
+        return results
+
+    cursor.execute(
+        f"SELECT studentID, year, major FROM Students WHERE studentID IN ({in_list(earliest)})",
+        list(earliest),
+    )
+    known = {row["studentID"]: row for row in cursor.fetchall()}
+
+    rows = [(sid, event_id, scans[i][1], "present") for sid, i in earliest.items() if sid in known]
+    existing, attendance_ids = {}, {}
+    if rows:
+        student_ids = [row[0] for row in rows]
+        cursor.execute(f"""
+            SELECT studentID, timestamp
+            FROM Students_Event_Attendees
+            WHERE eventID = %s AND studentID IN ({in_list(student_ids)})
+            FOR UPDATE
+        """, [event_id] + student_ids)
+        existing = {row["studentID"]: row["timestamp"] for row in cursor.fetchall()}
+
+        cursor.executemany("""
+            INSERT INTO Students_Event_Attendees (studentID, eventID, timestamp, status)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                timestamp = LEAST(COALESCE(timestamp, VALUES(timestamp)), VALUES(timestamp))
+        """, rows)
+
+        cursor.execute(f"""
+            SELECT studentID, attendanceID
+            FROM Students_Event_Attendees
+            WHERE eventID = %s AND studentID IN ({in_list(student_ids)})
+        """, [event_id] + student_ids)
+        attendance_ids = {row["studentID"]: row["attendanceID"] for row in cursor.fetchall()}
+
+    for index, (student_id, timestamp) in enumerate(scans):
+        if student_id is None or timestamp is None:
+            continue
+        result = results[index]
+        if student_id not in known:
+            result["result"] = UNKNOWN_STUDENT
+            continue
+        result["attendance_id"] = attendance_ids.get(student_id)
+        is_new = earliest[student_id] == index and student_id not in existing
+        result["result"] = NEW if is_new else DUPLICATE
+
+    _record(cursor, event, [(sid, existing.get(sid), scans[i][1], known[sid]) for sid, i in earliest.items()
+                            if sid in known])
+    return results
+
+
+def _record(cursor, event, checkins):
+    """
+    Rollup and sketch updates for [(studentID, stored timestamp before
+    the batch or None, scanned timestamp, student row)]. The upsert
+    keeps the earlier of the two, so a check-in whose timestamp moved
+    comes off its old day and onto the new one.
+    """
+    deltas, counted = rollups.Deltas(), []
+    for student_id, before, scanned, student in checkins:
+        after = scanned if before is None else min(before, scanned)
+        if before is not None and after == before:
+            continue
+        deltas.checkin(before, event["eventID"], event["clubID"], event["categoryID"],
+                       student["year"], student["major"], -1)
+        deltas.checkin(after, event["eventID"], event["clubID"], event["categoryID"],
+                       student["year"], student["major"])
+        counted.append((after, student_id, event["clubID"], student["major"]))
+    deltas.write(cursor)
+    sketches.add_checkins(cursor, counted)
+
+
+def summarize(results):
+    counts = {NEW: 0, DUPLICATE: 0, UNKNOWN_STUDENT: 0, INVALID: 0}
+    for result in results:
+        counts[result["result"]] += 1
+    return counts
@@ -0,0 +1,232 @@
+#------------------------------------------------------------
+# In-process scheduling conflict engine for upcoming events.
+#
+# Upcoming events are kept in an interval tree (a treap ordered by
+# start time, where every node also knows the latest end time in its
+# subtree). "What overlaps [start, end)?" only walks the subtrees that
+# can contain an overlap, and events are inserted or replaced one at a
+# time as they are created or edited. The full pairwise report is a
+# sweep over the events in start order instead of a self-join.
+#------------------------------------------------------------
+import heapq
+import random
+import threading
+import time
+from datetime import datetime
+
+
+class _Node:
+    __slots__ = ("start", "end", "key", "priority", "max_end", "left", "right")
+
+    def __init__(self, start, end, key):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.priority = random.random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+    def update(self):
+        self.max_end = self.end
+        if self.left and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+class IntervalTree:
+    """Half-open [start, end) intervals, each identified by a unique key."""
+
+    def __init__(self):
+        self._root = None
+        self._spans = {}
+
+    def __len__(self):
+        return len(self._spans)
+
+    def insert(self, key, start, end):
+        if key in self._spans:
+            self.remove(key)
+        self._spans[key] = (start, end)
+        left, right = self._split(self._root, (start, key))
+        self._root = self._merge(self._merge(left, _Node(start, end, key)), right)
+
+    def remove(self, key):
+        span = self._spans.pop(key, None)
+        if span is None:
+            return False
+        start, _ = span
+        left, rest = self._split(self._root, (start, key))
+        node, right = self._split(rest, (start, key), inclusive=True)
+        self._root = self._merge(left, right)
+        return node is not None
+
+    def overlapping(self, start, end):
+        """Yield keys of intervals that overlap [start, end)."""
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            if node.max_end <= start:
+                continue  # nothing in this subtree ends after `start`
+            if node.left:
+                stack.append(node.left)
+            if node.start < end:
+                if node.end > start:
+                    yield node.key
+                if node.right:
+                    stack.append(node.right)
+
+    # treap helpers ---------------------------------------------------
+
+    def _split(self, node, pivot, inclusive=False):
+        """Split into (< pivot, >= pivot), or (<= pivot, > pivot) if inclusive."""
+        if node is None:
+            return None, None
+        goes_left = (node.start, node.key) <= pivot if inclusive else (node.start, node.key) < pivot
+        if goes_left:
+            left, right = self._split(node.right, pivot, inclusive)
+            node.right = left
+            node.update()
+            return node, right
+        left, right = self._split(node.left, pivot, inclusive)
+        node.left = right
+        node.update()
+        return left, node
+
+    def _merge(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            left.update()
+            return left
+        right.left = self._merge(left, right.left)
+        right.update()
+        return right
+
+
+class ConflictIndex:
+    """Upcoming events indexed by time, rebuilt from the DB every refresh_seconds."""
+
+    COLUMNS = """
+        e.eventID,
+        e.name,
+        e.startDateTime,
+        e.endDateTime,
+        e.location,
+        e.buildingName,
+        e.roomNumber,
+        e.capacity,
+        e.clubID,
+        c.name AS club_name
+    """
+
+    def __init__(self, refresh_seconds=300):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._tree = IntervalTree()
+        self._events = {}
+        self._loaded_at = None
+
+    def ensure_loaded(self, cursor):
+        with self._lock:
+            if self._loaded_at is None or \
+                    time.monotonic() - self._loaded_at >= self.refresh_seconds:
+                self.load(cursor)
+
+    def load(self, cursor):
+        """(Re)build the index from every event that has not ended yet."""
+        cursor.execute(f"""
+            SELECT {self.COLUMNS}
+            FROM Events e
+            LEFT JOIN Clubs c ON e.clubID = c.clubID
+            WHERE e.endDateTime > CURRENT_TIMESTAMP
+              AND e.endDateTime > e.startDateTime
+        """)
+        rows = cursor.fetchall()
+        with self._lock:
+            self._tree = IntervalTree()
+            self._events = {}
+            for row in rows:
+                self._put(row)
+            self._loaded_at = time.monotonic()
+
+    def refresh_event(self, cursor, event_id):
+        """Re-read one event after it was created or edited."""
+        cursor.execute(f"""
+            SELECT {self.COLUMNS}
+            FROM Events e
+            LEFT JOIN Clubs c ON e.clubID = c.clubID
+            WHERE e.eventID = %s
+        """, (event_id,))
+        row = cursor.fetchone()
+        with self._lock:
+            if self._loaded_at is None:
+                return  # built on first use, which will include this event
+            if row is None:
+                self.remove(event_id)
+            else:
+                self._put(row)
+
+    def remove(self, event_id):
+        with self._lock:
+            self._events.pop(event_id, None)
+            self._tree.remove(event_id)
+
+    def overlapping(self, start, end, exclude_club_id=None, building=None, room=None):
+        """Events overlapping [start, end), ordered by start time."""
+        with self._lock:
+            matches = [self._events[key] for key in self._tree.overlapping(start, end)]
+        if exclude_club_id is not None:
+            matches = [e for e in matches if e["clubID"] != exclude_club_id]
+        if building is not None:
+            matches = [e for e in matches if e["buildingName"] == building]
+        if room is not None:
+            matches = [e for e in matches if e["roomNumber"] == room]
+        return sorted(matches, key=lambda e: (e["startDateTime"], e["eventID"]))
+
+    def pairwise(self):
+        """Every pair of upcoming events that overlap, via a start-ordered sweep."""
+        now = datetime.now()
+        with self._lock:
+            upcoming = sorted(
+                (e for e in self._events.values() if e["endDateTime"] > now),
+                key=lambda e: (e["startDateTime"], e["eventID"]),
+            )
+
+        pairs = []
+        active = []  # min-heap of (end, eventID, event) still running at the sweep point
+        for event in upcoming:
+            while active and active[0][0] <= event["startDateTime"]:
+                heapq.heappop(active)
+            for _, _, other in active:
+                first, second = sorted((other, event), key=lambda e: e["eventID"])
+                pairs.append({
+                    "event1_id": first["eventID"],
+                    "event1_name": first["name"],
+                    "event1_start": first["startDateTime"],
+                    "event1_end": first["endDateTime"],
+                    "event2_id": second["eventID"],
+                    "event2_name": second["name"],
+                    "event2_start": second["startDateTime"],
+                    "event2_end": second["endDateTime"],
+                })
+            heapq.heappush(active, (event["endDateTime"], event["eventID"], event))
+
+        pairs.sort(key=lambda p: (min(p["event1_start"], p["event2_start"]),
+                                  p["event1_id"], p["event2_id"]))
+        return pairs
+
+    def _put(self, row):
+        start, end = row["startDateTime"], row["endDateTime"]
+        if start is None or end is None or end <= start:
+            self.remove(row["eventID"])
+            return
+        self._events[row["eventID"]] = row
+        self._tree.insert(row["eventID"], start, end)
+
+
+conflict_index = ConflictIndex()
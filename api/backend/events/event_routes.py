@@ -1,24 +1,81 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
 from flask import Blueprint, jsonify, request
-from backend.db_connection import db
-from mysql.connector import Error
+from backend.db_connection import db, streaming
+from backend.audit import audit
+from backend.cache import cache
+from backend.clubs.similarity import club_similarity
+from backend.events import attendance, rsvps
+from backend.events.conflicts import conflict_index
+from backend.events.search import event_search
+from backend.events.telemetry import search_telemetry
+from backend.keywords import service as keyword_service
+from pymysql import Error
 from flask import current_app
 from pymysql.cursors import DictCursor
 
 # Create a Blueprint for Events routes
 events = Blueprint("events", __name__)
 
-# GET /events - Return all upcoming events [Ruth-1]
+# Page size for GET /events, and how much of each description the
+# list includes (the full text comes from GET /events/<id>)
+EVENTS_PAGE_SIZE = 20
+EVENTS_PAGE_MAX = 100
+EVENT_PREVIEW_CHARS = 280
+
+# GET /events - Return upcoming events, one page at a time [Ruth-1]
 @events.route("/events", methods=["GET"])
 def get_all_events():
-    """Return all upcoming events with info, ordered by date"""
+    """
+    Return upcoming events ordered by date, filtered in SQL.
+
+    Query params (all optional):
+      q          - substring of the event name
+      from, to   - ISO date/datetime window on startDateTime (to is exclusive);
+                   from defaults to now
+      club_id    - only events hosted by this club
+      club_type  - only events hosted by clubs of this type
+      limit      - page size (default 20, max 100)
+      after      - opaque cursor from a previous page's next_cursor
+    """
+    cursor = None
+    try:
+        limit = min(max(request.args.get("limit", EVENTS_PAGE_SIZE, type=int), 1), EVENTS_PAGE_MAX)
+        start_from = _parse_datetime(request.args.get("from")) or datetime.now()
+        start_to = _parse_datetime(request.args.get("to"))
+        after = _decode_cursor(request.args.get("after"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conditions = ["e.startDateTime >= %s"]
+    params = [start_from]
+    if start_to:
+        conditions.append("e.startDateTime < %s")
+        params.append(start_to)
+    if request.args.get("club_id"):
+        conditions.append("e.clubID = %s")
+        params.append(request.args.get("club_id", type=int))
+    if request.args.get("club_type"):
+        conditions.append("c.type = %s")
+        params.append(request.args["club_type"])
+    if request.args.get("q"):
+        conditions.append("e.name LIKE %s")
+        params.append("%" + _escape_like(request.args["q"].strip()) + "%")
+    if after:
+        # keyset: strictly after the last (startDateTime, eventID) we returned
+        conditions.append("(e.startDateTime > %s OR (e.startDateTime = %s AND e.eventID > %s))")
+        params.extend([after[0], after[0], after[1]])
+
     try:
         cursor = db.cursor(dictionary=True)
 
-        query = """
+        query = f"""
         SELECT
             e.eventID,
             e.name,
-            e.description,
+            LEFT(e.description, {EVENT_PREVIEW_CHARS}) AS description,
             e.startDateTime,
             e.endDateTime,
             e.location,
@@ -30,13 +87,26 @@ def get_all_events():
             c.type AS club_type
         FROM Events e
         JOIN Clubs c ON e.clubID = c.clubID
-        WHERE e.startDateTime >= CURRENT_TIMESTAMP
-        ORDER BY e.startDateTime ASC
+        WHERE {" AND ".join(conditions)}
+        ORDER BY e.startDateTime ASC, e.eventID ASC
+        LIMIT %s
         """
 
-        cursor.execute(query)
+        # fetch one extra row to know whether there is another page
+        cursor.execute(query, (*params, limit + 1))
         events_list = cursor.fetchall()
-        return jsonify(events_list), 200
+
+        next_cursor = None
+        if len(events_list) > limit:
+            events_list = events_list[:limit]
+            last = events_list[-1]
+            next_cursor = _encode_cursor(last["startDateTime"], last["eventID"])
+
+        if request.args.get("q") and not after:
+            audit.record("search", "event", details=json.dumps({
+                "q": request.args["q"].strip(), "results": len(events_list),
+            }))
+        return jsonify({"events": events_list, "next_cursor": next_cursor, "limit": limit}), 200
     except Error as e:
         current_app.logger.error(f'Error in get_all_events: {str(e)}')
         return jsonify({"error": str(e)}), 500
@@ -45,6 +115,114 @@ def get_all_events():
             cursor.close()
 
 
+# GET /events/search - Full-text event search [Ruth-1]
+@events.route("/events/search", methods=["GET"])
+def search_events():
+    """
+    Rank events by BM25 relevance to q over their name, description,
+    search description, keywords and club name (see backend/events/search.py).
+
+    Query params:
+      q                  - search text (required)
+      from, to           - ISO window on startDateTime; from defaults to now,
+                           from=all searches past events too
+      club_id, club_type - host club filters
+      limit              - page size (default 20, max 100)
+      after              - next_cursor from a previous page
+      student_id         - who is searching, for search analytics
+    When q finds very few events, misspelled terms are matched to close
+    indexed terms; `corrections` lists what was searched instead.
+    """
+    cursor = None
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    try:
+        limit = min(max(request.args.get("limit", EVENTS_PAGE_SIZE, type=int), 1), EVENTS_PAGE_MAX)
+        offset = max(int(request.args.get("after") or 0), 0)
+        start_from = None if request.args.get("from") == "all" else \
+            _parse_datetime(request.args.get("from")) or datetime.now()
+        start_to = _parse_datetime(request.args.get("to"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        cursor = db.cursor(dictionary=True)
+        event_search.ensure_fresh(cursor)
+        ranked, total, corrections = event_search.search(
+            q, offset + limit, start_from, start_to,
+            club_id=request.args.get("club_id", type=int),
+            club_type=request.args.get("club_type") or None,
+        )
+        page = [dict(event, score=round(score, 4)) for score, event in ranked[offset:]]
+
+        if not offset:
+            details = {"q": q, "results": total}
+            if corrections:
+                details["corrections"] = corrections
+            audit.record("search", "event", details=json.dumps(details))
+            search_telemetry.record_search(q, [event["eventID"] for event in page], total,
+                                           student_id=request.args.get("student_id", type=int))
+        next_cursor = str(offset + limit) if offset + limit < total else None
+        return jsonify({"events": page, "total": total, "next_cursor": next_cursor, "limit": limit,
+                        "corrections": corrections}), 200
+    except Error as e:
+        current_app.logger.error(f'Error in search_events: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+
+
+# POST /events/search/clicks - Record a click on a search result [Ruth-1]
+@events.route("/events/search/clicks", methods=["POST"])
+def record_search_click():
+    """
+    Count a click on an event shown in search results.
+
+    Body: {"event_id": int, "student_id": int (optional)}
+    Clicks are summed in memory and written in batches, so this returns immediately.
+    """
+    data = request.get_json(silent=True) or {}
+    event_id = data.get("event_id")
+    student_id = data.get("student_id")
+    if not isinstance(event_id, int) or isinstance(event_id, bool):
+        return jsonify({"error": "event_id must be an integer"}), 400
+    if student_id is not None and (not isinstance(student_id, int) or isinstance(student_id, bool)):
+        return jsonify({"error": "student_id must be an integer"}), 400
+    search_telemetry.record_click(event_id, student_id)
+    return jsonify({"message": "Click recorded"}), 202
+
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _encode_cursor(start, event_id):
+    raw = json.dumps([start.isoformat(), event_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token):
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        start, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(start), int(event_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
 # POST /events - Create and publish events [Sofia-1]
 @events.route("/events", methods=["POST"])
 def create_event():
@@ -77,8 +255,14 @@ def create_event():
             data.get("eventType")
         ))
 
-        db.commit()
         event_id = cursor.lastrowid
+        rsvps.create_counters(cursor, event_id)
+        db.commit()
+        cache.invalidate("events")
+        conflict_index.refresh_event(cursor, event_id)
+        club_similarity.mark_clubs_dirty([data["clubID"]])
+        event_search.mark_dirty([event_id])
+        audit.record("event_created", "event", event_id)
 
         return jsonify({"message": "Event created successfully", "event_id": event_id}), 201
     except Error as e:
@@ -114,6 +298,7 @@ def get_event(event_id):
         if not event:
             return jsonify({"error": "Event not found"}), 404
 
+        audit.record("event_view", "event", event_id)
         return jsonify(event), 200
     except Error as e:
         current_app.logger.error(f'Error in get_event: {str(e)}')
@@ -126,25 +311,10 @@ def get_event(event_id):
 # GET /events/{id}/rsvps - Return RSVP summary [Sofia-2]
 @events.route("/events/<int:event_id>/rsvps", methods=["GET"])
 def get_event_rsvps(event_id):
-    """Return the RSVP summary for an event"""
+    """Return the RSVP summary for an event, read from its RSVP counters"""
     try:
         cursor = db.cursor(dictionary=True)
-
-        query = """
-        SELECT
-            COUNT(*) as total_rsvps,
-            SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END) as confirmed,
-            SUM(CASE WHEN status = 'waitlisted' THEN 1 ELSE 0 END) as waitlisted,
-            e.capacity,
-            (e.capacity - COUNT(*)) as remaining_capacity
-        FROM RSVPs r
-        JOIN Events e ON r.eventID = e.eventID
-        WHERE r.eventID = %s
-        GROUP BY e.capacity
-        """
-
-        cursor.execute(query, (event_id,))
-        summary = cursor.fetchone()
+        summary = rsvps.summary(cursor, event_id)
         cursor.close()
 
         if not summary:
@@ -161,8 +331,11 @@ def get_event_rsvps(event_id):
 def get_event_attendance(event_id):
     """Return attendance records for a particular event"""
     try:
-        cursor = db.cursor(dictionary=True)
+        fmt = streaming.requested_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
         query = """
         SELECT
             sea.attendanceID,
@@ -176,7 +349,11 @@ def get_event_attendance(event_id):
         WHERE sea.eventID = %s
         ORDER BY sea.timestamp DESC
         """
+        if fmt:
+            return streaming.stream_response(query, (event_id,), fmt,
+                                             f"event_{event_id}_attendance")
 
+        cursor = db.cursor(dictionary=True)
         cursor.execute(query, (event_id,))
         attendance = cursor.fetchall()
         return jsonify(attendance), 200
@@ -189,116 +366,256 @@ def get_event_attendance(event_id):
 @events.route("/events/<int:event_id>/attendance", methods=["POST"])
 def check_in_student(event_id):
     """Check in a student digitally"""
+    cursor = None
+    data = request.get_json(silent=True) or {}
+    if "student_id" not in data:
+        return jsonify({"error": "student_id is required"}), 400
+
     try:
-        data = request.get_json()
+        cursor = db.cursor(dictionary=True)
 
-        if "student_id" not in data:
-            return jsonify({"error": "student_id is required"}), 400
+        # same idempotent path as the batch endpoint: a re-scan is not an error
+        results = attendance.check_in_batch(
+            cursor, event_id, attendance.parse_scans([data["student_id"]])
+        )
+        if results is None:
+            return jsonify({"error": "Event not found"}), 404
+        db.commit()
+        result = results[0]
+
+        if result["result"] == attendance.INVALID:
+            return jsonify({"error": "student_id must be an integer"}), 400
+        if result["result"] == attendance.UNKNOWN_STUDENT:
+            return jsonify({"error": "Student not found"}), 404
+        if result["result"] == attendance.DUPLICATE:
+            return jsonify({"message": "Already checked in", "attendance_id": result["attendance_id"]}), 200
+
+        cache.invalidate("attendance")
+        club_similarity.mark_events_dirty([event_id])
+        audit.record("check_in", "event", event_id, user_id=result["student_id"])
+        return jsonify({"message": "Check-in successful", "attendance_id": result["attendance_id"]}), 201
+    except Error as e:
+        current_app.logger.error(f'Error in check_in_student: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
-        cursor = db.cursor(dictionary=True)
 
-        query = """
-        INSERT INTO Students_Event_Attendees (studentID, eventID, timestamp, status)
-        VALUES (%s, %s, CURRENT_TIMESTAMP, 'present')
-        """
+# POST /events/{id}/attendance/batch - Check in many students at once [Sofia-3]
+@events.route("/events/<int:event_id>/attendance/batch", methods=["POST"])
+def check_in_students_batch(event_id):
+    """
+    Check in a batch of door scans in one multi-row insert and one commit.
+
+    Body: {"check_ins": [{"student_id": 1, "timestamp": "2025-12-01T18:02:11"}, ...]}
+    ("student_ids": [1, 2, ...] also works; timestamps default to now.)
+    Returns a result per scan: new, duplicate, unknown_student or invalid.
+    """
+    cursor = None
+    data = request.get_json(silent=True) or {}
+    items = data.get("check_ins", data.get("student_ids"))
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "check_ins must be a non-empty list"}), 400
+    if len(items) > attendance.MAX_BATCH:
+        return jsonify({"error": f"at most {attendance.MAX_BATCH} check-ins per batch"}), 400
 
-        cursor.execute(query, (data["student_id"], event_id))
+    try:
+        cursor = db.cursor(dictionary=True)
+        results = attendance.check_in_batch(cursor, event_id, attendance.parse_scans(items))
+        if results is None:
+            return jsonify({"error": "Event not found"}), 404
         db.commit()
-        attendance_id = cursor.lastrowid
-        return jsonify({"message": "Check-in successful", "attendance_id": attendance_id}), 201
+
+        summary = attendance.summarize(results)
+        if summary[attendance.NEW]:
+            cache.invalidate("attendance")
+            club_similarity.mark_events_dirty([event_id])
+            for result in results:
+                if result["result"] == attendance.NEW:
+                    audit.record("check_in", "event", event_id, user_id=result["student_id"])
+
+        return jsonify({"event_id": event_id, "summary": summary, "results": results}), 200
     except Error as e:
-        current_app.logger.error(f'Error in check_in_student: {str(e)}')
+        current_app.logger.error(f'Error in check_in_students_batch: {str(e)}')
         return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
 
 # GET /events/{id}/keywords - Return keywords with search frequency [Marcus-4]
 @events.route("/events/<int:event_id>/keywords", methods=["GET"])
 def get_event_keywords(event_id):
-    """Return keywords associated with an event, along with their search frequency"""
+    """
+    Return keywords associated with an event, along with their search frequency.
+    Counts come from the precomputed keyword counters; pass ?days=N to count
+    only the last N days of searches instead of all time.
+    """
+    cursor = None
     try:
+        days = request.args.get("days", type=int)
         cursor = db.cursor(dictionary=True)
 
-        query = """
-        SELECT
-            k.keywordID,
-            k.keyword,
-            COUNT(sl.searchLogID) as search_count
-        FROM Events_Event_Keywords eek
-        JOIN Keywords k ON eek.keywordID = k.keywordID
-        LEFT JOIN Search_Logs sl ON sl.searchQuery LIKE CONCAT('%%', k.keyword, '%%')
-        WHERE eek.eventID = %s
-        GROUP BY k.keywordID, k.keyword
-        ORDER BY search_count DESC
-        """
+        if days:
+            since = (datetime.now() - timedelta(days=days)).date()
+            query = """
+            SELECT
+                k.keywordID,
+                k.keyword,
+                COALESCE(SUM(ksc.searchCount), 0) AS search_count
+            FROM Events_Event_Keywords eek
+            JOIN Keywords k ON eek.keywordID = k.keywordID
+            LEFT JOIN Keyword_Search_Counts ksc
+                ON ksc.keywordID = k.keywordID
+                AND ksc.day >= %s
+            WHERE eek.eventID = %s
+            GROUP BY k.keywordID, k.keyword
+            ORDER BY search_count DESC
+            """
+            cursor.execute(query, (since, event_id))
+        else:
+            query = """
+            SELECT
+                k.keywordID,
+                k.keyword,
+                COALESCE(kst.searchCount, 0) AS search_count
+            FROM Events_Event_Keywords eek
+            JOIN Keywords k ON eek.keywordID = k.keywordID
+            LEFT JOIN Keyword_Search_Totals kst ON kst.keywordID = k.keywordID
+            WHERE eek.eventID = %s
+            ORDER BY search_count DESC
+            """
+            cursor.execute(query, (event_id,))
 
-        cursor.execute(query, (event_id,))
         keywords = cursor.fetchall()
         return jsonify(keywords), 200
     except Error as e:
         current_app.logger.error(f'Error in get_event_keywords: {str(e)}')
         return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
 
 # POST /events/{id}/keywords - Add new keywords [Marcus-4]
 @events.route("/events/<int:event_id>/keywords", methods=["POST"])
 def add_event_keyword(event_id):
-    """Add new keywords to events"""
-    try:
-        data = request.get_json()
+    """
+    Add keywords to an event, creating any that don't exist yet.
 
-        if "keyword" not in data:
-            return jsonify({"error": "keyword is required"}), 400
+    Body: {"keyword": "robotics"} or {"keywords": ["robotics", "ai"]}
+    """
+    cursor = None
+    try:
+        data = request.get_json(silent=True) or {}
+        keywords = data.get("keywords", [data["keyword"]] if "keyword" in data else None)
+        if not isinstance(keywords, list) or not keywords:
+            return jsonify({"error": "keyword or keywords array is required"}), 400
+        try:
+            keywords = keyword_service.normalize_all(keywords)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         cursor = db.cursor(dictionary=True)
+        if not keyword_service.existing_events(cursor, [event_id]):
+            return jsonify({"error": "Event not found"}), 404
 
-        # First, insert keyword if it doesn't exist
-        cursor.execute("INSERT IGNORE INTO Keywords (keyword) VALUES (%s)", (data["keyword"],))
-        cursor.execute("SELECT keywordID FROM Keywords WHERE keyword = %s", (data["keyword"],))
-        keyword_id = cursor.fetchone()["keywordID"]
-
-        # Then associate it with the event
-        cursor.execute(
-            "INSERT IGNORE INTO Events_Event_Keywords (eventID, keywordID) VALUES (%s, %s)",
-            (event_id, keyword_id)
-        )
-
+        added = keyword_service.tag_events(cursor, [event_id], keywords)
         db.commit()
-        return jsonify({"message": "Keyword added successfully"}), 201
+        club_similarity.mark_events_dirty([event_id])
+        event_search.mark_dirty([event_id])
+        return jsonify({"message": "Keyword added successfully", "added": added}), 201
     except Error as e:
         current_app.logger.error(f'Error in add_event_keyword: {str(e)}')
         return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
 
 # PUT /events/{id}/keywords - Update keywords [Marcus-4]
 @events.route("/events/<int:event_id>/keywords", methods=["PUT"])
 def update_event_keywords(event_id):
-    """Update keywords for events"""
+    """
+    Replace an event's keywords. Only the associations that change are
+    written: new keywords are added and dropped ones removed.
+    """
+    cursor = None
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
 
         if "keywords" not in data or not isinstance(data["keywords"], list):
             return jsonify({"error": "keywords array is required"}), 400
+        try:
+            keywords = keyword_service.normalize_all(data["keywords"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         cursor = db.cursor(dictionary=True)
+        if not keyword_service.existing_events(cursor, [event_id]):
+            return jsonify({"error": "Event not found"}), 404
+
+        diff = keyword_service.set_event_keywords(cursor, event_id, keywords)
+        db.commit()
+        club_similarity.mark_events_dirty([event_id])
+        event_search.mark_dirty([event_id])
+        return jsonify({"message": "Keywords updated successfully", **diff}), 200
+    except Error as e:
+        current_app.logger.error(f'Error in update_event_keywords: {str(e)}')
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
-        # Delete existing keywords for this event
-        cursor.execute("DELETE FROM Events_Event_Keywords WHERE eventID = %s", (event_id,))
 
-        # Add new keywords
-        for keyword in data["keywords"]:
-            cursor.execute("INSERT IGNORE INTO Keywords (keyword) VALUES (%s)", (keyword,))
-            cursor.execute("SELECT keywordID FROM Keywords WHERE keyword = %s", (keyword,))
-            keyword_id = cursor.fetchone()["keywordID"]
-            cursor.execute(
-                "INSERT INTO Events_Event_Keywords (eventID, keywordID) VALUES (%s, %s)",
-                (event_id, keyword_id)
-            )
+# POST /events/keywords/bulk - Tag or untag many events at once [Marcus-4]
+@events.route("/events/keywords/bulk", methods=["POST"])
+def bulk_event_keywords():
+    """
+    Add or remove the same keywords on many events in one request.
+
+    Body: {"event_ids": [...], "add": ["ai", ...], "remove": ["robotics", ...]}
+    Unknown event IDs are skipped and listed in "missing_events".
+    """
+    cursor = None
+    try:
+        data = request.get_json(silent=True) or {}
+        event_ids = data.get("event_ids")
+        if not isinstance(event_ids, list) or not event_ids:
+            return jsonify({"error": "event_ids array is required"}), 400
+        if len(event_ids) > keyword_service.MAX_BULK_EVENTS:
+            return jsonify({"error": f"At most {keyword_service.MAX_BULK_EVENTS} events per request"}), 400
+        try:
+            event_ids = list(dict.fromkeys(int(event_id) for event_id in event_ids))
+            add = keyword_service.normalize_all(data.get("add") or [])
+            remove = keyword_service.normalize_all(data.get("remove") or [])
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        if not add and not remove:
+            return jsonify({"error": "add or remove keywords are required"}), 400
+
+        cursor = db.cursor(dictionary=True)
+        found = keyword_service.existing_events(cursor, event_ids)
+        targets = [event_id for event_id in event_ids if event_id in found]
 
+        added = keyword_service.tag_events(cursor, targets, add)
+        removed = keyword_service.untag_events(cursor, targets, remove)
         db.commit()
-        return jsonify({"message": "Keywords updated successfully"}), 200
+        club_similarity.mark_events_dirty(targets)
+        event_search.mark_dirty(targets)
+        return jsonify({
+            "events": len(targets),
+            "added": added,
+            "removed": removed,
+            "missing_events": [event_id for event_id in event_ids if event_id not in found],
+        }), 200
     except Error as e:
-        current_app.logger.error(f'Error in update_event_keywords: {str(e)}')
+        current_app.logger.error(f'Error in bulk_event_keywords: {str(e)}')
         return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
 
 # DELETE /events/{id}/keywords - Remove keywords [Marcus-4]
@@ -325,6 +642,8 @@ def delete_event_keyword(event_id):
         if rows_affected == 0:
             return jsonify({"error": "Keyword not found for this event"}), 404
 
+        club_similarity.mark_events_dirty([event_id])
+        event_search.mark_dirty([event_id])
         return jsonify({"message": "Keyword removed successfully"}), 200
     except Error as e:
         current_app.logger.error(f'Error in delete_event_keyword: {str(e)}')
@@ -334,34 +653,41 @@ def delete_event_keyword(event_id):
 # GET /events/conflicts - Return events that conflict [Sofia-4]
 @events.route("/events/conflicts", methods=["GET"])
 def get_event_conflicts():
-    """Return events that conflict with each other"""
+    """
+    With start_datetime and end_datetime: return upcoming events that overlap
+    that window (optionally excluding a club, or limited to one building/room).
+    Without them: return every pair of upcoming events that overlap.
+    """
+    cursor = None
+    try:
+        start = _parse_datetime(request.args.get("start_datetime"))
+        end = _parse_datetime(request.args.get("end_datetime"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if (start is None) != (end is None):
+        return jsonify({"error": "start_datetime and end_datetime must be given together"}), 400
+
     try:
         cursor = db.cursor(dictionary=True)
+        conflict_index.ensure_loaded(cursor)
 
-        query = """
-        SELECT
-            e1.eventID as event1_id,
-            e1.name as event1_name,
-            e1.startDateTime as event1_start,
-            e1.endDateTime as event1_end,
-            e2.eventID as event2_id,
-            e2.name as event2_name,
-            e2.startDateTime as event2_start,
-            e2.endDateTime as event2_end
-        FROM Events e1
-        JOIN Events e2 ON e1.eventID < e2.eventID
-        WHERE e1.startDateTime < e2.endDateTime
-        AND e1.endDateTime > e2.startDateTime
-        AND e1.startDateTime >= CURRENT_TIMESTAMP
-        ORDER BY e1.startDateTime
-        """
+        if start is None:
+            return jsonify(conflict_index.pairwise()), 200
 
-        cursor.execute(query)
-        conflicts = cursor.fetchall()
+        conflicts = conflict_index.overlapping(
+            start,
+            end,
+            exclude_club_id=request.args.get("exclude_club_id", type=int),
+            building=request.args.get("building_name"),
+            room=request.args.get("room_number"),
+        )
         return jsonify(conflicts), 200
     except Error as e:
         current_app.logger.error(f'Error in get_event_conflicts: {str(e)}')
         return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
 
 
 # GET /events/validation - Return recent events with validation status [David-4]
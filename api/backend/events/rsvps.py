@@ -0,0 +1,211 @@
+#------------------------------------------------------------
+# Capacity-aware RSVP admission.
+#
+# Every event has a row in Event_RSVP_Counters holding its confirmed
+# and waitlisted totals. Admission and cancellation lock that row
+# (SELECT ... FOR UPDATE) before touching RSVPs, so all changes to one
+# event's RSVPs are serialized: an RSVP is confirmed only while
+# confirmedCount < Events.capacity and waitlisted otherwise, and a
+# cancellation promotes the oldest waitlisted RSVPs into any freed
+# seats in the same transaction. A NULL capacity means unlimited.
+# Both add their change to the RSVP rollups in the same transaction.
+#
+# admit() and cancel() must be the only work in their transaction:
+# after a deadlock InnoDB rolls the transaction back, and they retry
+# from the start. The caller commits.
+#------------------------------------------------------------
+from backend.analytics import rollups
+from backend.db_connection.sql import retry_on_deadlock
+
+
+def create_counters(cursor, event_id):
+    """Give a newly created event its (empty) counter row."""
+    cursor.execute(
+        "INSERT IGNORE INTO Event_RSVP_Counters (eventID) VALUES (%s)", (event_id,)
+    )
+
+
+def _lock_counters(cursor, event_id):
+    """Lock the event's counter row. Returns (event, counters), or None if no such event."""
+    cursor.execute("SELECT capacity, clubID FROM Events WHERE eventID = %s", (event_id,))
+    event = cursor.fetchone()
+    if event is None:
+        return None
+
+    lock = """
+        SELECT confirmedCount, waitlistCount
+        FROM Event_RSVP_Counters
+        WHERE eventID = %s
+        FOR UPDATE
+    """
+    cursor.execute(lock, (event_id,))
+    counters = cursor.fetchone()
+    if counters is None:
+        # event created before the counters existed: seed from its RSVPs
+        cursor.execute("""
+            INSERT IGNORE INTO Event_RSVP_Counters (eventID, confirmedCount, waitlistCount)
+            SELECT %s, COALESCE(SUM(status = 'confirmed'), 0), COALESCE(SUM(status = 'waitlisted'), 0)
+            FROM RSVPs
+            WHERE eventID = %s
+        """, (event_id, event_id))
+        cursor.execute(lock, (event_id,))
+        counters = cursor.fetchone()
+    return event, counters
+
+
+def _has_seat(capacity, confirmed):
+    return capacity is None or confirmed < capacity
+
+
+@retry_on_deadlock
+def admit(cursor, student_id, event_id):
+    """
+    RSVP a student: confirmed if there is a seat, otherwise waitlisted.
+    Returns {"rsvp_id", "status", "created"}, or None if the event does
+    not exist. An existing active RSVP is returned unchanged.
+    """
+    locked = _lock_counters(cursor, event_id)
+    if locked is None:
+        return None
+    event, counters = locked
+    capacity = event["capacity"]
+
+    cursor.execute("""
+        SELECT rsvpID, status
+        FROM RSVPs
+        WHERE studentID = %s AND eventID = %s
+        FOR UPDATE
+    """, (student_id, event_id))
+    existing = cursor.fetchone()
+    if existing and existing["status"] in ("confirmed", "waitlisted"):
+        return {"rsvp_id": existing["rsvpID"], "status": existing["status"], "created": False}
+
+    status = "confirmed" if _has_seat(capacity, counters["confirmedCount"]) else "waitlisted"
+    if existing:
+        cursor.execute("""
+            UPDATE RSVPs SET status = %s, timestamp = CURRENT_TIMESTAMP
+            WHERE rsvpID = %s
+        """, (status, existing["rsvpID"]))
+        rsvp_id = existing["rsvpID"]
+    else:
+        cursor.execute("""
+            INSERT INTO RSVPs (studentID, eventID, status, timestamp)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+        """, (student_id, event_id, status))
+        rsvp_id = cursor.lastrowid
+
+    # a cancelled row being reused was already taken off its old day
+    cursor.execute("SELECT timestamp FROM RSVPs WHERE rsvpID = %s", (rsvp_id,))
+    deltas = rollups.Deltas()
+    deltas.rsvp(cursor.fetchone()["timestamp"], event_id, event["clubID"])
+    deltas.write(cursor)
+
+    confirmed = 1 if status == "confirmed" else 0
+    _adjust(cursor, event_id, confirmed, 1 - confirmed)
+    return {"rsvp_id": rsvp_id, "status": status, "created": True}
+
+
+@retry_on_deadlock
+def cancel(cursor, student_id, rsvp_id):
+    """
+    Delete a student's RSVP and promote waitlisted RSVPs into the freed
+    seats. Returns {"rsvp_id", "event_id", "status", "promoted"}, or None
+    if the RSVP does not exist.
+    """
+    cursor.execute(
+        "SELECT eventID FROM RSVPs WHERE rsvpID = %s AND studentID = %s", (rsvp_id, student_id)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    event_id = row["eventID"]
+
+    # counters first, then the RSVP row: the same lock order as admit()
+    locked = _lock_counters(cursor, event_id)
+    if locked is None:
+        return None
+    event, counters = locked
+    capacity = event["capacity"]
+    cursor.execute(
+        "SELECT status, timestamp FROM RSVPs WHERE rsvpID = %s AND studentID = %s FOR UPDATE",
+        (rsvp_id, student_id),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None  # cancelled concurrently
+    cursor.execute("DELETE FROM RSVPs WHERE rsvpID = %s", (rsvp_id,))
+    if row["status"] != "cancelled":
+        # counted on the day of its (last admission) timestamp
+        deltas = rollups.Deltas()
+        deltas.rsvp(row["timestamp"], event_id, event["clubID"], -1)
+        deltas.write(cursor)
+
+    confirmed = counters["confirmedCount"] - (row["status"] == "confirmed")
+    waitlisted = counters["waitlistCount"] - (row["status"] == "waitlisted")
+    promoted = _fill_seats(cursor, event_id, capacity, confirmed)
+    _adjust(cursor, event_id,
+            confirmed + len(promoted) - counters["confirmedCount"],
+            waitlisted - len(promoted) - counters["waitlistCount"])
+    return {"rsvp_id": rsvp_id, "event_id": event_id, "status": row["status"], "promoted": promoted}
+
+
+def _fill_seats(cursor, event_id, capacity, confirmed):
+    """Confirm the oldest waitlisted RSVPs while seats are free. Returns the promoted rows."""
+    if capacity is None:
+        limit = None
+    else:
+        limit = capacity - confirmed
+        if limit <= 0:
+            return []
+
+    query = """
+        SELECT rsvpID, studentID
+        FROM RSVPs
+        WHERE eventID = %s AND status = 'waitlisted'
+        ORDER BY timestamp, rsvpID
+    """
+    args = (event_id,)
+    if limit is not None:
+        query += " LIMIT %s"
+        args += (limit,)
+    cursor.execute(query + " FOR UPDATE", args)
+    promoted = [{"rsvp_id": r["rsvpID"], "student_id": r["studentID"]} for r in cursor.fetchall()]
+    if promoted:
+        cursor.executemany(
+            "UPDATE RSVPs SET status = 'confirmed' WHERE rsvpID = %s",
+            [(p["rsvp_id"],) for p in promoted],
+        )
+    return promoted
+
+
+def _adjust(cursor, event_id, confirmed_delta, waitlist_delta):
+    cursor.execute("""
+        UPDATE Event_RSVP_Counters
+        SET confirmedCount = confirmedCount + %s,
+            waitlistCount = waitlistCount + %s
+        WHERE eventID = %s
+    """, (confirmed_delta, waitlist_delta, event_id))
+
+
+def summary(cursor, event_id):
+    """RSVP totals for an event from its counters, or None if no such event."""
+    cursor.execute("""
+        SELECT
+            e.capacity,
+            COALESCE(c.confirmedCount, 0) AS confirmed,
+            COALESCE(c.waitlistCount, 0) AS waitlisted
+        FROM Events e
+        LEFT JOIN Event_RSVP_Counters c ON c.eventID = e.eventID
+        WHERE e.eventID = %s
+    """, (event_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    capacity = row["capacity"]
+    return {
+        "total_rsvps": row["confirmed"] + row["waitlisted"],
+        "confirmed": row["confirmed"],
+        "waitlisted": row["waitlisted"],
+        "capacity": capacity,
+        "remaining_capacity": None if capacity is None else max(capacity - row["confirmed"], 0),
+    }
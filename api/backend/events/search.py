@@ -0,0 +1,446 @@
+#------------------------------------------------------------
+# In-process full-text event search.
+#
+# Every event is tokenized once into an inverted index: term ->
+# {document slot: weighted term frequency}, where a term counts more in
+# the name and keywords than in the description (BM25F-style field
+# weights). A query only touches the postings of its own terms: each
+# term's postings are kept as NumPy arrays, so BM25 scoring, the date /
+# club filters and the top-k selection (argpartition, then a sort of
+# just those k) are vectorized, and the cost depends on how many events
+# contain the query terms rather than on the size of the catalog.
+#
+# Changes are applied incrementally: routes mark the events they touch
+# as dirty, a periodic check picks up rows whose Events.lastUpdated
+# moved, and only those events are re-read and re-indexed. A full
+# rebuild runs every rebuild_seconds (which also picks up renamed
+# clubs) or when events were deleted behind the index's back.
+#
+# Typo tolerance: every indexed term is also filed under its character
+# trigrams. When a query finds fewer than FUZZY_MIN_HITS events, each
+# query term that is rare or unknown is looked up by trigram overlap;
+# only terms within MAX_EDITS length and sharing enough trigrams to
+# possibly be that close are kept, at most FUZZY_CANDIDATES of them are
+# checked with a bounded edit distance, and the closest few are searched
+# in place of (and scored below) the original. How often this turns a
+# poor result list into a better one is counted in fuzzy_stats().
+#------------------------------------------------------------
+import heapq
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from backend.keywords.frequency import tokenize
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "keywords": 2.5,
+    "club_name": 1.5,
+    "searchDescription": 1.5,
+    "description": 1.0,
+}
+STOPWORDS = frozenset("a an and are at by for from in is of on or the to with".split())
+PREVIEW_CHARS = 280
+# document-length normalizers are recomputed once the average length drifts this far
+AVGDL_DRIFT = 0.1
+
+# fuzzy fallback
+FUZZY_MIN_HITS = 3          # fall back when exact search finds fewer events than this
+FUZZY_MAX_TERMS = 4         # query terms corrected per search
+FUZZY_CANDIDATES = 64       # vocabulary terms edit-distance checked per query term
+FUZZY_EXPANSIONS = 3        # corrections searched per query term
+FUZZY_PENALTY = 0.7         # score multiplier per edit
+
+
+def _stem(token):
+    """Fold simple English plurals so 'workshops' finds 'workshop'."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def terms(text):
+    return [_stem(t) for t in tokenize(text) if t not in STOPWORDS]
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(term):
+    """Edits tolerated in a term: none for short words, where a typo is often another word."""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Damerau-Levenshtein (optimal string alignment) distance between a and
+    b, or limit + 1 as soon as it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return min(current[-1], limit + 1)
+
+
+class EventSearchIndex:
+    """BM25 search over events, rebuilt every rebuild_seconds and updated incrementally in between."""
+
+    COLUMNS = """
+        e.eventID,
+        e.name,
+        e.description,
+        e.searchDescription,
+        e.startDateTime,
+        e.endDateTime,
+        e.location,
+        e.buildingName,
+        e.roomNumber,
+        e.capacity,
+        c.name AS club_name,
+        c.clubID,
+        c.type AS club_type
+    """
+
+    def __init__(self, rebuild_seconds=3600, check_seconds=30):
+        self.rebuild_seconds = rebuild_seconds
+        self.check_seconds = check_seconds
+        self._lock = threading.RLock()
+        self._dirty = set()
+        self._loaded_at = None
+        self._checked_at = None
+        self._db_checked_at = None
+        self._fuzzy_counts = Counter()
+        self._clear()
+
+    def _clear(self):
+        self._postings = {}       # term -> {slot: weighted tf}
+        self._trigrams = {}       # trigram -> set of terms in the postings
+        self._compiled = {}       # term -> (slots, tfs) arrays, dropped when the postings change
+        self._docs = []           # slot -> event summary, or None once removed
+        self._doc_terms = []      # slot -> {term: weighted tf}, for removal
+        self._slots = {}          # eventID -> slot
+        self._free = []
+        self._total_length = 0.0
+        self._norm_avgdl = 1.0
+        # per-slot columns for scoring and filtering
+        self._lengths = np.zeros(0)
+        self._norms = np.zeros(0)        # K1 * (1 - B + B * length / avgdl)
+        self._starts = np.zeros(0)       # startDateTime as a POSIX timestamp, NaN if unknown
+        self._clubs = np.zeros(0, dtype=np.int64)
+        self._types = np.zeros(0, dtype=np.int64)
+        self._type_codes = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    # change tracking -----------------------------------------------------
+
+    def mark_dirty(self, event_ids):
+        with self._lock:
+            self._dirty.update(int(e) for e in event_ids if e is not None)
+
+    # building --------------------------------------------------------------
+
+    def ensure_fresh(self, cursor):
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at >= self.rebuild_seconds:
+                self.load(cursor)
+                return
+            if now - self._checked_at >= self.check_seconds:
+                if not self._check_changes(cursor):
+                    return
+            if self._dirty:
+                self._apply_dirty(cursor)
+
+    def load(self, cursor):
+        """Full build from every event."""
+        with self._lock:
+            cursor.execute("SELECT NOW() AS now")
+            db_now = cursor.fetchone()["now"]
+            events = self._read(cursor)
+            self._clear()
+            self._dirty.clear()
+            for event in events:
+                self._put(event)
+            self._renormalize()
+            self._db_checked_at = db_now
+            self._loaded_at = self._checked_at = time.monotonic()
+
+    def _read(self, cursor, event_ids=None):
+        where, args = "", []
+        if event_ids is not None:
+            where = f"WHERE e.eventID IN ({', '.join(['%s'] * len(event_ids))})"
+            args = list(event_ids)
+        cursor.execute(f"""
+            SELECT {self.COLUMNS}
+            FROM Events e
+            LEFT JOIN Clubs c ON e.clubID = c.clubID
+            {where}
+        """, args)
+        events = {row["eventID"]: dict(row, keywords=[]) for row in cursor.fetchall()}
+        if events:
+            where = where.replace("e.eventID", "eek.eventID")
+            cursor.execute(f"""
+                SELECT eek.eventID, k.keyword
+                FROM Events_Event_Keywords eek
+                JOIN Keywords k ON k.keywordID = eek.keywordID
+                {where}
+            """, args)
+            for row in cursor.fetchall():
+                if row["eventID"] in events:
+                    events[row["eventID"]]["keywords"].append(row["keyword"])
+        return list(events.values())
+
+    def _check_changes(self, cursor):
+        """Mark events edited since the last check. False if a full reload was needed instead."""
+        cursor.execute("SELECT NOW() AS now, COUNT(*) AS events FROM Events")
+        row = cursor.fetchone()
+        cursor.execute("SELECT eventID FROM Events WHERE lastUpdated >= %s", (self._db_checked_at,))
+        self._dirty.update(r["eventID"] for r in cursor.fetchall())
+        self._db_checked_at = row["now"]
+        self._checked_at = time.monotonic()
+
+        new = sum(1 for event_id in self._dirty if event_id not in self._slots)
+        if row["events"] != len(self._slots) + new:
+            self.load(cursor)  # rows were deleted without going through the API
+            return False
+        return True
+
+    def _apply_dirty(self, cursor):
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        found = {event["eventID"]: event for event in self._read(cursor, dirty)}
+        for event_id in dirty:
+            if event_id in found:
+                self._put(found[event_id])
+            else:
+                self._remove(event_id)
+        avgdl = self._avgdl()
+        if abs(avgdl - self._norm_avgdl) > AVGDL_DRIFT * self._norm_avgdl:
+            self._renormalize()
+
+    def _avgdl(self):
+        return self._total_length / len(self._slots) if self._slots else 1.0
+
+    def _renormalize(self):
+        self._norm_avgdl = self._avgdl() or 1.0
+        self._norms = K1 * (1 - B + B * self._lengths / self._norm_avgdl)
+
+    def _grow(self, size):
+        if size <= len(self._lengths):
+            return
+        capacity = max(size, 2 * len(self._lengths), 1024)
+        for name, fill in (("_lengths", 0.0), ("_norms", K1), ("_starts", np.nan),
+                           ("_clubs", -1), ("_types", -1)):
+            column = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _put(self, event):
+        self._remove(event["eventID"])
+
+        weighted = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = event.get(field)
+            text = " ".join(value) if isinstance(value, list) else value
+            for term in terms(text):
+                weighted[term] = weighted.get(term, 0.0) + weight
+        length = sum(weighted.values())
+
+        summary = {name: event[name] for name in (
+            "eventID", "name", "startDateTime", "endDateTime", "location", "buildingName",
+            "roomNumber", "capacity", "club_name", "clubID", "club_type")}
+        description = event["description"]
+        summary["description"] = description[:PREVIEW_CHARS] if description else description
+
+        if self._free:
+            slot = self._free.pop()
+            self._docs[slot], self._doc_terms[slot] = summary, weighted
+        else:
+            slot = len(self._docs)
+            self._docs.append(summary)
+            self._doc_terms.append(weighted)
+            self._grow(slot + 1)
+        start = event["startDateTime"]
+        self._lengths[slot] = length
+        self._norms[slot] = K1 * (1 - B + B * length / self._norm_avgdl)
+        self._starts[slot] = start.timestamp() if isinstance(start, datetime) else np.nan
+        self._clubs[slot] = event["clubID"] if event["clubID"] is not None else -1
+        self._types[slot] = self._type_codes.setdefault(event["club_type"], len(self._type_codes))
+
+        self._slots[event["eventID"]] = slot
+        self._total_length += length
+        for term, tf in weighted.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                for gram in trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            self._postings[term][slot] = tf
+            self._compiled.pop(term, None)
+
+    def _remove(self, event_id):
+        slot = self._slots.pop(event_id, None)
+        if slot is None:
+            return
+        for term in self._doc_terms[slot]:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+            self._compiled.pop(term, None)
+        self._total_length -= self._lengths[slot]
+        self._docs[slot], self._doc_terms[slot] = None, None
+        self._lengths[slot] = 0.0
+        self._free.append(slot)
+
+    def _postings_arrays(self, term):
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            slots = np.fromiter(postings.keys(), dtype=np.intp, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            compiled = self._compiled[term] = (slots, tfs)
+        return compiled
+
+    # querying ---------------------------------------------------------------
+
+    def search(self, query, k=20, start_from=None, start_to=None, club_id=None, club_type=None):
+        """
+        The k best events for `query` as (score, event) pairs, best first,
+        the number of matching events, and the typo corrections used
+        ({query term: [terms searched instead]}, empty for an exact search).
+        start_from / start_to (exclusive) bound startDateTime; club_id and
+        club_type filter on the host club.
+        """
+        filters = (start_from, start_to, club_id, club_type)
+        with self._lock:
+            query_terms = set(terms(query))
+            weights = dict.fromkeys(query_terms, 1.0)
+            ranked, total = self._rank(weights, k, *filters)
+            self._fuzzy_counts["searches"] += 1
+            if total >= FUZZY_MIN_HITS:
+                return ranked, total, {}
+
+            self._fuzzy_counts["fallbacks"] += 1
+            corrections = {}
+            rare = sorted((t for t in query_terms if len(self._postings.get(t, ())) < FUZZY_MIN_HITS),
+                          key=len, reverse=True)
+            for term in rare[:FUZZY_MAX_TERMS]:
+                for match, distance in self._corrections(term):
+                    weights[match] = max(weights.get(match, 0.0), FUZZY_PENALTY ** distance)
+                    corrections.setdefault(term, []).append(match)
+            if not corrections:
+                return ranked, total, {}
+
+            fuzzy_ranked, fuzzy_total = self._rank(weights, k, *filters)
+            if fuzzy_total <= total:
+                return ranked, total, {}
+            self._fuzzy_counts["rescued"] += 1
+            if not total:
+                self._fuzzy_counts["rescued_from_empty"] += 1
+            return fuzzy_ranked, fuzzy_total, corrections
+
+    def _corrections(self, term):
+        """Up to FUZZY_EXPANSIONS indexed terms within max_edits(term) of term, as (term, distance)."""
+        limit = max_edits(term)
+        if not limit:
+            return []
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        # an insert, delete or substitution changes at most three trigrams, a transposition four
+        needed = max(len(grams) - 4 * limit, 1)
+        candidates = [t for t, count in shared.items()
+                      if count >= needed and t != term and abs(len(t) - len(term)) <= limit]
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, candidates,
+                                    key=lambda t: (shared[t], len(self._postings[t])))
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(term, candidate, limit)
+            if distance <= limit:
+                matches.append((distance, -len(self._postings[candidate]), candidate))
+        return [(candidate, distance) for distance, _, candidate in sorted(matches)[:FUZZY_EXPANSIONS]]
+
+    def _rank(self, weights, k, start_from, start_to, club_id, club_type):
+        """Score the events containing any term of `weights` ({term: multiplier})."""
+        n = len(self._slots)
+        scores = np.zeros(len(self._docs))
+        matched = []
+        for term, weight in weights.items():
+            compiled = self._postings_arrays(term)
+            if compiled is None:
+                continue
+            slots, tfs = compiled
+            idf = math.log(1 + (n - len(slots) + 0.5) / (len(slots) + 0.5))
+            scores[slots] += weight * idf * tfs * (K1 + 1) / (tfs + self._norms[slots])
+            matched.append(slots)
+        if not matched:
+            return [], 0
+
+        candidates = matched[0]
+        if len(matched) > 1:
+            candidates = np.sort(np.concatenate(matched))
+            candidates = candidates[np.concatenate(([True], candidates[1:] != candidates[:-1]))]
+        keep = np.ones(len(candidates), dtype=bool)
+        if start_from is not None:
+            keep &= self._starts[candidates] >= start_from.timestamp()
+        if start_to is not None:
+            keep &= self._starts[candidates] < start_to.timestamp()
+        if club_id is not None:
+            keep &= self._clubs[candidates] == club_id
+        if club_type is not None:
+            keep &= self._types[candidates] == self._type_codes.get(club_type, -2)
+        candidates = candidates[keep]
+
+        candidate_scores = scores[candidates]
+        if len(candidates) > k:
+            top = np.argpartition(-candidate_scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        docs = self._docs
+        return ([(float(candidate_scores[i]), docs[candidates[i]]) for i in top],
+                len(candidates))
+
+    def fuzzy_stats(self):
+        """How often searches fell back to typo matching, and how often that found more events."""
+        with self._lock:
+            counts = dict(self._fuzzy_counts)
+        for name in ("searches", "fallbacks", "rescued", "rescued_from_empty"):
+            counts.setdefault(name, 0)
+        counts["fallback_rate"] = round(counts["fallbacks"] / counts["searches"], 4) if counts["searches"] else 0.0
+        counts["rescue_rate"] = round(counts["rescued"] / counts["fallbacks"], 4) if counts["fallbacks"] else 0.0
+        return counts
+
+
+event_search = EventSearchIndex()
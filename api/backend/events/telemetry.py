@@ -0,0 +1,275 @@
+#------------------------------------------------------------
+# Batched search telemetry for /events/search.
+#
+# A search is recorded as its query, student and the events it showed;
+# a click as one event and student. Both only touch in-process state:
+# searches and clicks go on bounded lists, and impressions and clicks
+# are also summed per eventID in two Counters, so a popular event shown
+# in a thousand searches is a single increment. A background thread
+# flushes everything every SEARCH_TELEMETRY_FLUSH_MS in one transaction:
+#
+#   - the events' Search_Result rows are looked up with one IN query,
+#     and missing ones created with one multi-row INSERT IGNORE;
+#   - Searches, Search_Logs and Searches_Search_Results rows are written
+#     with one multi-row INSERT each (search IDs come from ID_Sequences,
+#     see migration 008), and clicks into Search_Clicks (migration 011)
+#     for the discovery funnel;
+#   - the searches are added to the daily search rollups and the
+#     keyword search counters, and cached responses tagged "searches"
+#     are invalidated after the commit;
+#   - appearances and clicks are added with UPDATE ... CASE statements
+#     of up to UPDATE_CHUNK rows.
+#
+# Searches and logged clicks past SEARCH_TELEMETRY_MAX_PENDING are
+# dropped (counted in stats()); a failed flush is retried once and then
+# dropped.
+#------------------------------------------------------------
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from pymysql.cursors import DictCursor
+
+from backend.analytics import rollups
+from backend.cache import cache
+from backend.db_connection import db, in_list
+from backend.keywords import frequency
+
+QUERY_CHARS = 255
+UPDATE_CHUNK = 500
+SHUTDOWN_TIMEOUT = 5.0
+
+
+def allocate_ids(cursor, sequence, count):
+    """Reserve `count` consecutive IDs from ID_Sequences; returns the first. Needs a dict cursor."""
+    cursor.execute(
+        "UPDATE ID_Sequences SET nextID = LAST_INSERT_ID(nextID + %s) WHERE name = %s",
+        (count, sequence),
+    )
+    if cursor.rowcount != 1:
+        raise RuntimeError(f"ID_Sequences has no {sequence!r} row; apply migration 008")
+    cursor.execute("SELECT LAST_INSERT_ID() AS next")
+    return int(cursor.fetchone()["next"]) - count
+
+
+class SearchTelemetry:
+    def __init__(self):
+        self.enabled = False
+        self.flush_seconds = 2.0
+        self.max_pending = 10000
+        self.logger = None
+        self._lock = threading.Lock()
+        self._searches = []           # (timestamp, query, studentID, results, [eventIDs shown])
+        self._appearances = Counter()  # eventID -> impressions
+        self._clicks = Counter()       # eventID -> clicks
+        self._click_log = []          # (timestamp, eventID, studentID)
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._stats = {
+            "searches": 0, "clicks": 0, "written_searches": 0, "flushes": 0,
+            "dropped_full": 0, "dropped_write_error": 0, "write_errors": 0, "last_flush_ms": 0.0,
+        }
+
+    def init_app(self, app):
+        app.config.setdefault("SEARCH_TELEMETRY_ENABLED", True)
+        app.config.setdefault("SEARCH_TELEMETRY_FLUSH_MS", 2000)
+        app.config.setdefault("SEARCH_TELEMETRY_MAX_PENDING", 10000)
+
+        self.enabled = bool(app.config["SEARCH_TELEMETRY_ENABLED"])
+        self.flush_seconds = app.config["SEARCH_TELEMETRY_FLUSH_MS"] / 1000.0
+        self.max_pending = app.config["SEARCH_TELEMETRY_MAX_PENDING"]
+        self.logger = app.logger
+        if self.enabled:
+            atexit.register(self.shutdown)
+
+    def record_search(self, query, event_ids, results, student_id=None):
+        """Count one search that found `results` events, and an impression for each one it showed."""
+        if not self.enabled:
+            return
+        self._ensure_writer()
+        event_ids = list(dict.fromkeys(event_ids))
+        with self._lock:
+            if len(self._searches) >= self.max_pending:
+                self._stats["dropped_full"] += 1
+                return
+            self._searches.append((datetime.now(), query[:QUERY_CHARS], student_id, results, event_ids))
+            self._appearances.update(event_ids)
+            self._stats["searches"] += 1
+
+    def record_click(self, event_id, student_id=None):
+        if not self.enabled:
+            return
+        self._ensure_writer()
+        with self._lock:
+            self._clicks[event_id] += 1
+            self._stats["clicks"] += 1
+            if len(self._click_log) >= self.max_pending:
+                self._stats["dropped_full"] += 1
+                return
+            self._click_log.append((datetime.now(), event_id, student_id))
+
+    def flush(self):
+        """Write everything recorded so far from the calling thread."""
+        with self._lock:
+            searches, self._searches = self._searches, []
+            appearances, self._appearances = self._appearances, Counter()
+            clicks, self._clicks = self._clicks, Counter()
+            click_log, self._click_log = self._click_log, []
+        if not (searches or clicks):
+            return
+
+        started = time.perf_counter()
+        for attempt in (1, 2):
+            try:
+                with db.connection() as conn:
+                    with conn.cursor(DictCursor) as cursor:
+                        self._write(cursor, searches, appearances, clicks, click_log)
+                    conn.commit()
+                break
+            except Exception as e:
+                with self._lock:
+                    self._stats["write_errors"] += 1
+                if attempt == 2:
+                    with self._lock:
+                        self._stats["dropped_write_error"] += len(searches)
+                    if self.logger:
+                        self.logger.error(f"SearchTelemetry: dropped {len(searches)} searches: {e}")
+                    return
+                time.sleep(self.flush_seconds)
+
+        cache.invalidate("searches")
+        with self._lock:
+            self._stats["written_searches"] += len(searches)
+            self._stats["flushes"] += 1
+            self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def shutdown(self):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(SHUTDOWN_TIMEOUT)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending_searches"] = len(self._searches)
+            stats["pending_events"] = len(set(self._appearances) | set(self._clicks))
+        stats["enabled"] = self.enabled
+        return stats
+
+    # writer ----------------------------------------------------------
+
+    def _ensure_writer(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # forked worker: the parent's pending records belong to the parent
+                self._searches, self._appearances, self._clicks = [], Counter(), Counter()
+                self._click_log = []
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="search-telemetry", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def _write(self, cursor, searches, appearances, clicks, click_log=()):
+        result_ids = self._result_ids(cursor, set(appearances) | set(clicks))
+
+        if searches:
+            students = self._existing_students(cursor, {s[2] for s in searches} - {None})
+            first_id = allocate_ids(cursor, "Searches", len(searches))
+            search_rows, log_rows, bridge_rows = [], [], []
+            deltas = rollups.Deltas()
+            for search_id, (timestamp, query, student_id, results, event_ids) in enumerate(searches, first_id):
+                student_id = student_id if student_id in students else None
+                search_rows.append((search_id, timestamp, query, student_id))
+                log_rows.append((student_id, query, results, timestamp))
+                shown = [(search_id, result_ids[e]) for e in event_ids if e in result_ids]
+                bridge_rows.extend(shown)
+                deltas.search(timestamp, query, no_results=not shown)
+            cursor.executemany(
+                "INSERT INTO Searches (searchID, timestamp, searchQuery, studentID) VALUES (%s, %s, %s, %s)",
+                search_rows,
+            )
+            cursor.executemany(
+                "INSERT INTO Search_Logs (studentID, searchQuery, resultsCount, timestamp) VALUES (%s, %s, %s, %s)",
+                log_rows,
+            )
+            if bridge_rows:
+                cursor.executemany(
+                    "INSERT INTO Searches_Search_Results (searchID, resultID) VALUES (%s, %s)",
+                    bridge_rows,
+                )
+            deltas.write(cursor)
+            frequency.count_searches(cursor, [(timestamp, query) for timestamp, query, *_ in searches])
+
+        if click_log:
+            cursor.executemany(
+                "INSERT INTO Search_Clicks (timestamp, eventID, studentID) VALUES (%s, %s, %s)",
+                list(click_log),
+            )
+
+        increments = sorted(
+            (result_ids[e], appearances.get(e, 0), clicks.get(e, 0))
+            for e in set(appearances) | set(clicks) if e in result_ids
+        )
+        for i in range(0, len(increments), UPDATE_CHUNK):
+            chunk = increments[i:i + UPDATE_CHUNK]
+            cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+            args = [v for r, shown, _ in chunk for v in (r, shown)]
+            args += [v for r, _, clicked in chunk for v in (r, clicked)]
+            args += [r for r, _, _ in chunk]
+            cursor.execute(f"""
+                UPDATE Search_Result
+                SET appearances = COALESCE(appearances, 0) + CASE resultID {cases} END,
+                    clicks = COALESCE(clicks, 0) + CASE resultID {cases} END
+                WHERE resultID IN ({in_list(chunk)})
+            """, args)
+
+    def _result_ids(self, cursor, event_ids):
+        """{eventID: resultID}, creating Search_Result rows as needed. Deleted events are left out."""
+        if not event_ids:
+            return {}
+        event_ids = sorted(event_ids)
+        ids = self._select_result_ids(cursor, event_ids)
+        missing = [e for e in event_ids if e not in ids]
+        if missing:
+            first_id = allocate_ids(cursor, "Search_Result", len(missing))
+            # IGNORE: another process may have created the row meanwhile,
+            # or the event may be gone (the foreign key check is skipped)
+            cursor.executemany(
+                "INSERT IGNORE INTO Search_Result (resultID, clicks, appearances, eventID) VALUES (%s, %s, %s, %s)",
+                [(result_id, 0, 0, e) for result_id, e in enumerate(missing, first_id)],
+            )
+            ids.update(self._select_result_ids(cursor, missing))
+        return ids
+
+    @staticmethod
+    def _existing_students(cursor, student_ids):
+        if not student_ids:
+            return set()
+        cursor.execute(f"SELECT studentID FROM Students WHERE studentID IN ({in_list(student_ids)})",
+                       list(student_ids))
+        return {row["studentID"] for row in cursor.fetchall()}
+
+    @staticmethod
+    def _select_result_ids(cursor, event_ids):
+        cursor.execute(
+            f"SELECT eventID, resultID FROM Search_Result WHERE eventID IN ({in_list(event_ids)})",
+            list(event_ids),
+        )
+        return {row["eventID"]: row["resultID"] for row in cursor.fetchall()}
+
+
+search_telemetry = SearchTelemetry()
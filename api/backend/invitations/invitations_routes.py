@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db
+from backend.cache import cache
 from mysql.connector import Error
 from flask import current_app
 
@@ -23,6 +24,7 @@ def create_invitation():
         """
         cursor.execute(insert_query, (event_id, sender_id, recipient_id))
         db.commit()
+        cache.invalidate("invitations")
 
         new_id = cursor.lastrowid
 
@@ -0,0 +1 @@
+# Keywords package
@@ -0,0 +1,32 @@
+#------------------------------------------------------------
+# Rebuild the keyword search-frequency counters from Search_Logs.
+#
+# Search telemetry counts new searches as it writes them; this recounts
+# the whole log, e.g. to count a new keyword's earlier searches.
+#
+#     python -m backend.keywords.backfill
+#------------------------------------------------------------
+import argparse
+
+from backend.rest_entry import create_app
+from backend.db_connection import db
+from backend.keywords import frequency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Count Search_Logs queries into Keyword_Search_Counts"
+    )
+    parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        cursor = db.cursor()
+        processed = frequency.backfill(cursor)
+        db.commit()
+        cursor.close()
+    print(f"Processed {processed} search log rows")
+
+
+if __name__ == "__main__":
+    main()
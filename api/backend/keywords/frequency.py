@@ -0,0 +1,118 @@
+#------------------------------------------------------------
+# Keyword search-frequency counters.
+#
+# Each Search_Logs query is tokenized once, matched against the
+# Keywords table, and counted into Keyword_Search_Counts
+# (keywordID, day) and Keyword_Search_Totals (keywordID). The search
+# telemetry flush that writes the Search_Logs rows adds their counts in
+# the same transaction (count_searches()), so every committed search is
+# counted once, whatever order the workers commit in. A new keyword
+# counts the searches flushed after it was created; searches logged
+# before it, or loaded in bulk, are counted by
+#
+#     python -m backend.keywords.backfill
+#------------------------------------------------------------
+import re
+from collections import Counter
+
+BATCH_SIZE = 5000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['&+.-][a-z0-9]+)*")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class KeywordMatcher:
+    """Finds which keywords (single or multi-word) occur in a search query."""
+
+    def __init__(self, keywords):
+        # keywords: {keywordID: keyword text}
+        self._phrases = {}
+        self.max_words = 1
+        for keyword_id, keyword in keywords.items():
+            phrase = tuple(tokenize(keyword))
+            if phrase:
+                self._phrases.setdefault(phrase, []).append(keyword_id)
+                self.max_words = max(self.max_words, len(phrase))
+
+    def match(self, query):
+        tokens = tokenize(query)
+        found = set()
+        for n in range(1, self.max_words + 1):
+            for i in range(len(tokens) - n + 1):
+                ids = self._phrases.get(tuple(tokens[i:i + n]))
+                if ids:
+                    found.update(ids)
+        return found
+
+
+def count_searches(cursor, searches):
+    """
+    Add [(timestamp, query)] searches to the keyword counters. Rows are
+    upserted in key order so concurrent flushes lock them alike. Needs a
+    dict cursor; the caller commits.
+    """
+    searches = [(timestamp, query) for timestamp, query in searches if timestamp is not None]
+    if not searches:
+        return
+    cursor.execute("SELECT keywordID, keyword FROM Keywords")
+    matcher = KeywordMatcher({r["keywordID"]: r["keyword"] for r in cursor.fetchall()})
+    counts = Counter()
+    for timestamp, query in searches:
+        for keyword_id in matcher.match(query):
+            counts[(keyword_id, timestamp.date())] += 1
+    _add_counts(cursor, counts)
+
+
+def backfill(cursor):
+    """Drop all counters and recount every Search_Logs row. Returns the rows read. The caller commits."""
+    cursor.execute("DELETE FROM Keyword_Search_Counts")
+    cursor.execute("DELETE FROM Keyword_Search_Totals")
+    cursor.execute("SELECT keywordID, keyword FROM Keywords")
+    matcher = KeywordMatcher({r["keywordID"]: r["keyword"] for r in cursor.fetchall()})
+
+    processed, last_id = 0, 0
+    while True:
+        cursor.execute("""
+            SELECT searchLogID, searchQuery, DATE(timestamp) AS day
+            FROM Search_Logs
+            WHERE searchLogID > %s
+            ORDER BY searchLogID
+            LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        counts = Counter()
+        for row in rows:
+            if row["day"] is None:
+                continue
+            for keyword_id in matcher.match(row["searchQuery"]):
+                counts[(keyword_id, row["day"])] += 1
+        _add_counts(cursor, counts)
+
+        processed += len(rows)
+        last_id = rows[-1]["searchLogID"]
+    return processed
+
+
+def _add_counts(cursor, counts):
+    if not counts:
+        return
+    cursor.executemany("""
+        INSERT INTO Keyword_Search_Counts (keywordID, day, searchCount)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE searchCount = searchCount + VALUES(searchCount)
+    """, sorted((k, day, n) for (k, day), n in counts.items()))
+
+    totals = Counter()
+    for (keyword_id, _), n in counts.items():
+        totals[keyword_id] += n
+    cursor.executemany("""
+        INSERT INTO Keyword_Search_Totals (keywordID, searchCount)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE searchCount = searchCount + VALUES(searchCount)
+    """, sorted(totals.items()))
@@ -0,0 +1,121 @@
+#------------------------------------------------------------
+# Event keyword tagging.
+#
+# Keyword text is resolved to IDs with one WHERE keyword IN (...)
+# query; any that are missing are created with a single multi-row
+# INSERT IGNORE (Keywords.keyword is unique, see migration 005) and
+# read back with one more IN query. Event tags are then changed as a
+# set diff, so an update only writes the associations that were added
+# or removed. The caller commits.
+#------------------------------------------------------------
+from backend.db_connection import in_list
+
+MAX_KEYWORD_LENGTH = 100
+MAX_BULK_EVENTS = 500
+
+
+def normalize(keyword):
+    """Lowercase a keyword and collapse its whitespace; None if it is empty or not text."""
+    if not isinstance(keyword, str):
+        return None
+    keyword = " ".join(keyword.split()).lower()
+    if not keyword or len(keyword) > MAX_KEYWORD_LENGTH:
+        return None
+    return keyword
+
+
+def normalize_all(keywords):
+    """Normalize and dedupe a list of keywords, keeping their order. Raises ValueError on a bad one."""
+    seen = {}
+    for keyword in keywords:
+        text = normalize(keyword)
+        if text is None:
+            raise ValueError(f"invalid keyword: {keyword!r}")
+        seen.setdefault(text, None)
+    return list(seen)
+
+
+def _select_ids(cursor, keywords):
+    cursor.execute(
+        f"SELECT keywordID, keyword FROM Keywords WHERE keyword IN ({in_list(keywords)})",
+        list(keywords),
+    )
+    return {normalize(row["keyword"]): row["keywordID"] for row in cursor.fetchall()}
+
+
+def resolve(cursor, keywords, create=True):
+    """
+    Map normalized keyword text to keywordID. With create=True the
+    missing keywords are inserted; otherwise they are left out.
+    """
+    if not keywords:
+        return {}
+    ids = _select_ids(cursor, keywords)
+    missing = [k for k in keywords if k not in ids]
+    if missing and create:
+        # INSERT IGNORE: a concurrent request may create the same keyword
+        cursor.executemany("INSERT IGNORE INTO Keywords (keyword) VALUES (%s)",
+                           [(k,) for k in missing])
+        ids.update(_select_ids(cursor, missing))
+    return ids
+
+
+def existing_events(cursor, event_ids):
+    """The subset of event_ids that exist."""
+    if not event_ids:
+        return set()
+    cursor.execute(f"SELECT eventID FROM Events WHERE eventID IN ({in_list(event_ids)})",
+                   list(event_ids))
+    return {row["eventID"] for row in cursor.fetchall()}
+
+
+def set_event_keywords(cursor, event_id, keywords):
+    """
+    Make the event's keywords exactly `keywords` (normalized text).
+    Returns {"added": [...], "removed": [...]} as keyword IDs.
+    """
+    wanted = set(resolve(cursor, keywords).values())
+    cursor.execute(
+        "SELECT keywordID FROM Events_Event_Keywords WHERE eventID = %s FOR UPDATE",
+        (event_id,),
+    )
+    current = {row["keywordID"] for row in cursor.fetchall()}
+
+    added = sorted(wanted - current)
+    removed = sorted(current - wanted)
+    if added:
+        cursor.executemany(
+            "INSERT IGNORE INTO Events_Event_Keywords (eventID, keywordID) VALUES (%s, %s)",
+            [(event_id, keyword_id) for keyword_id in added],
+        )
+    if removed:
+        cursor.execute(
+            f"DELETE FROM Events_Event_Keywords WHERE eventID = %s AND keywordID IN ({in_list(removed)})",
+            [event_id] + removed,
+        )
+    return {"added": added, "removed": removed}
+
+
+def tag_events(cursor, event_ids, keywords):
+    """Add every keyword to every event in one multi-row insert. Returns the number of new tags."""
+    keyword_ids = sorted(set(resolve(cursor, keywords).values()))
+    rows = [(event_id, keyword_id) for event_id in event_ids for keyword_id in keyword_ids]
+    if not rows:
+        return 0
+    cursor.executemany(
+        "INSERT IGNORE INTO Events_Event_Keywords (eventID, keywordID) VALUES (%s, %s)", rows
+    )
+    return cursor.rowcount
+
+
+def untag_events(cursor, event_ids, keywords):
+    """Remove the keywords from every event in one delete. Returns the number of tags removed."""
+    keyword_ids = sorted(set(resolve(cursor, keywords, create=False).values()))
+    event_ids = list(event_ids)
+    if not keyword_ids or not event_ids:
+        return 0
+    cursor.execute(f"""
+        DELETE FROM Events_Event_Keywords
+        WHERE eventID IN ({in_list(event_ids)}) AND keywordID IN ({in_list(keyword_ids)})
+    """, event_ids + keyword_ids)
+    return cursor.rowcount
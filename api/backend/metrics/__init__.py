@@ -0,0 +1,149 @@
+#------------------------------------------------------------
+# Request and database instrumentation, exposed at GET /metrics.
+#
+# Every request is timed from before_request to after_request and
+# labelled with its route template (e.g. /events/<int:event_id>), so
+# the label set stays bounded. pymysql's Cursor.execute is wrapped
+# once per process; queries run inside a request add their count,
+# time and rows to that request's route.
+#------------------------------------------------------------
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from pymysql import cursors
+
+from backend.metrics.registry import Counter, Gauge, Histogram, Registry
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# queries run outside any request (background jobs, worker threads)
+BACKGROUND = "<background>"
+
+_cursor_patch_lock = threading.Lock()
+_cursor_patched = False
+
+
+def _pool_connections():
+    from backend.db_connection import db
+    stats = db.pool_stats()
+    return {(state,): stats.get(state, 0) for state in ("size", "in_use", "idle")}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.enabled = False
+        self.registry = Registry()
+        r = self.registry
+        self.requests = r.register(Counter(
+            "clubhub_http_requests_total", "HTTP requests handled.",
+            ("route", "method", "status")))
+        self.latency = r.register(Histogram(
+            "clubhub_http_request_duration_seconds",
+            "Time from request start until the response is returned.",
+            LATENCY_BUCKETS, ("route", "method")))
+        self.response_bytes = r.register(Histogram(
+            "clubhub_http_response_size_bytes", "Response body size.",
+            SIZE_BUCKETS, ("route", "method")))
+        self.queries_per_request = r.register(Histogram(
+            "clubhub_db_queries_per_request", "SQL statements executed per request.",
+            QUERY_COUNT_BUCKETS, ("route",)))
+        self.query_time = r.register(Histogram(
+            "clubhub_db_query_duration_seconds", "Time spent in cursor.execute.",
+            QUERY_BUCKETS, ("route",)))
+        self.rows = r.register(Counter(
+            "clubhub_db_rows_returned_total", "Rows returned by buffered SELECTs.",
+            ("route",)))
+        self.pool_connections = r.register(Gauge(
+            "clubhub_db_pool_connections", "Database connections in the pool.",
+            _pool_connections, ("state",)))
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        self.enabled = bool(app.config["METRICS_ENABLED"])
+        if not self.enabled:
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule("/metrics", "metrics", self.expose, methods=["GET"])
+        _patch_cursor(self)
+        app.logger.info("RequestMetrics: exposing Prometheus metrics at /metrics")
+
+    def expose(self):
+        return Response(self.registry.render(),
+                        mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+    # request hooks ---------------------------------------------------
+
+    def _start(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_queries = 0
+
+    def _finish(self, response):
+        started = g.pop("_metrics_start", None)
+        if started is None:
+            return response
+        route = _route()
+        method = request.method
+        self.latency.observe(time.perf_counter() - started, (route, method))
+        self.requests.inc((route, method, str(response.status_code)))
+        self.queries_per_request.observe(g.pop("_metrics_queries", 0), (route,))
+
+        if response.is_streamed:
+            response.response = self._count_streamed(response.response, route, method)
+        else:
+            self.response_bytes.observe(response.calculate_content_length() or 0, (route, method))
+        return response
+
+    def _count_streamed(self, body, route, method):
+        size = 0
+        try:
+            for chunk in body:
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.response_bytes.observe(size, (route, method))
+
+    # cursor hook -----------------------------------------------------
+
+    def record_query(self, cursor, elapsed):
+        if has_request_context():
+            route = _route()
+            g._metrics_queries = g.get("_metrics_queries", 0) + 1
+        else:
+            route = BACKGROUND
+        self.query_time.observe(elapsed, (route,))
+        # unbuffered cursors don't know their row count until drained
+        if cursor.description is not None and not isinstance(cursor, cursors.SSCursor):
+            self.rows.inc((route,), max(cursor.rowcount, 0))
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else "<unmatched>"
+
+
+def _patch_cursor(recorder):
+    """Wrap Cursor.execute (once per process) to time every statement."""
+    global _cursor_patched
+    with _cursor_patch_lock:
+        if _cursor_patched:
+            return
+        original = cursors.Cursor.execute
+
+        def execute(cursor, query, args=None):
+            started = time.perf_counter()
+            try:
+                return original(cursor, query, args)
+            finally:
+                recorder.record_query(cursor, time.perf_counter() - started)
+
+        cursors.Cursor.execute = execute
+        _cursor_patched = True
+
+
+metrics = RequestMetrics()
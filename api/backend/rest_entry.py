@@ -5,6 +5,12 @@ import logging
 from logging.handlers import RotatingFileHandler
 
 from backend.db_connection import db
+from backend.cache import cache
+from backend.metrics import metrics
+from backend.audit import audit
+from backend.events.telemetry import search_telemetry
+from backend.analytics.cube import attendance_cube
+from backend.clubs import rankings
 from backend.simple.simple_routes import simple_routes
 from backend.events.event_routes import events
 from backend.clubs.club_routes import club_routes
@@ -12,6 +18,8 @@ from backend.students.student_routes import student_routes
 from backend.admin.admin_routes import admin_routes
 from backend.analytics.analytics_routes import analytics_routes
 from backend.invitations.invitations_routes import invitation_routes
+from backend.audit.audit_routes import audit_routes
+from backend.suggest.suggest_routes import suggest_routes
 
 def create_app():
     app = Flask(__name__)
@@ -46,10 +54,57 @@ def create_app():
         "DB_NAME"
     ).strip()  # Change this to your DB name
 
+    # Connection pool sizing (see backend/db_connection/pool.py)
+    app.config["MYSQL_POOL_MIN_SIZE"] = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    app.config["MYSQL_POOL_MAX_SIZE"] = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    app.config["MYSQL_POOL_MAX_LIFETIME"] = int(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+    app.config["MYSQL_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    app.config["MYSQL_POOL_PING_AFTER"] = float(os.getenv("DB_POOL_PING_AFTER", "0"))
+
     # Initialize the database object with the settings above.
-    app.logger.info("current_app(): starting the database connection")
+    # This also pre-warms the connection pool.
+    app.logger.info("current_app(): starting the database connection pool")
     db.init_app(app)
 
+    # Server-side result cache for the analytics endpoints.
+    # CACHE_BACKEND is "lru" (in-process, default), "redis" or "none".
+    app.config["CACHE_BACKEND"] = os.getenv("CACHE_BACKEND", "lru").strip()
+    app.config["CACHE_REDIS_URL"] = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0").strip()
+    app.config["CACHE_LRU_SIZE"] = int(os.getenv("CACHE_LRU_SIZE", "512"))
+    app.config["CACHE_DEFAULT_TTL"] = int(os.getenv("CACHE_DEFAULT_TTL", "60"))
+    cache.init_app(app)
+
+    # Per-route latency, DB time and response size, served at /metrics
+    # in the Prometheus text format. METRICS_ENABLED=0 turns it off.
+    app.config["METRICS_ENABLED"] = os.getenv("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+    metrics.init_app(app)
+
+    # Audit_Logs rows are queued and group-committed by a background
+    # writer every AUDIT_FLUSH_MS or AUDIT_BATCH_ROWS rows.
+    app.config["AUDIT_ENABLED"] = os.getenv("AUDIT_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+    app.config["AUDIT_QUEUE_SIZE"] = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+    app.config["AUDIT_FLUSH_MS"] = int(os.getenv("AUDIT_FLUSH_MS", "250"))
+    app.config["AUDIT_BATCH_ROWS"] = int(os.getenv("AUDIT_BATCH_ROWS", "500"))
+    app.config["AUDIT_ENQUEUE_TIMEOUT"] = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.05"))
+    audit.init_app(app)
+
+    # /events/search queries, impressions and clicks are summed in memory
+    # and written to Searches / Search_Result every SEARCH_TELEMETRY_FLUSH_MS.
+    app.config["SEARCH_TELEMETRY_ENABLED"] = os.getenv("SEARCH_TELEMETRY_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+    app.config["SEARCH_TELEMETRY_FLUSH_MS"] = int(os.getenv("SEARCH_TELEMETRY_FLUSH_MS", "2000"))
+    app.config["SEARCH_TELEMETRY_MAX_PENDING"] = int(os.getenv("SEARCH_TELEMETRY_MAX_PENDING", "10000"))
+    search_telemetry.init_app(app)
+
+    # The demographics endpoints group check-ins in an in-process NumPy
+    # store of at most ATTENDANCE_CUBE_MAX_MB, falling back to SQL beyond it.
+    app.config["ATTENDANCE_CUBE_ENABLED"] = os.getenv("ATTENDANCE_CUBE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+    app.config["ATTENDANCE_CUBE_MAX_MB"] = int(os.getenv("ATTENDANCE_CUBE_MAX_MB", "256"))
+    attendance_cube.init_app(app)
+
+    # Metric weights for the quarterly club rankings, e.g.
+    # "attendance=0.4,rating=0.3"; unnamed metrics keep their default.
+    app.config["RANKING_WEIGHTS"] = rankings.parse_weights(os.getenv("RANKING_WEIGHTS", ""))
+
     # Register the routes from each Blueprint with the app object
     # and give a url prefix to each
     app.logger.info("create_app(): registering blueprints with Flask app object.")
@@ -60,6 +115,8 @@ def create_app():
     app.register_blueprint(admin_routes, url_prefix="/admin")
     app.register_blueprint(analytics_routes, url_prefix="/analytics")
     app.register_blueprint(invitation_routes, url_prefix="/invitations")
+    app.register_blueprint(audit_routes, url_prefix="/audit")
+    app.register_blueprint(suggest_routes)
 
     # Don't forget to return the app object
     return app
@@ -1,12 +1,24 @@
 from flask import Blueprint, jsonify, request
-from backend.db_connection import db
-from mysql.connector import Error
+from backend.db_connection import db, streaming
+from backend.audit import audit
+from backend.cache import cache
+from backend.events import rsvps
+from pymysql import Error
 from flask import current_app
 
 student_routes = Blueprint('student_routes', __name__)
 
 @student_routes.route('/students', methods=['GET'])
 def get_students():
+    try:
+        fmt = streaming.requested_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if fmt:
+        return streaming.stream_response(
+            "SELECT * FROM Students ORDER BY studentID", fmt=fmt, filename="students"
+        )
+
     try:
         cursor = db.cursor(dictionary=True)
         cursor.execute("SELECT * FROM Students")
@@ -56,52 +68,65 @@ def get_student_rsvps(student_id):
 # Create RSVP
 @student_routes.route('/students/<student_id>/rsvps', methods=['POST'])
 def create_rsvp(student_id):
+    """
+    RSVP to an event. The student is confirmed while the event has
+    seats left and waitlisted once it is full.
+    """
+    cursor = None
     try:
         data = request.get_json()
         cursor = db.cursor(dictionary=True)
-        query = """
-            INSERT INTO RSVPs 
-                (studentID, eventID, status, timestamp)
-            VALUES 
-                (%s, %s, 'confirmed', CURRENT_TIMESTAMP)
-        """
-        cursor.execute(query, (student_id, data['event_id']))
+        result = rsvps.admit(cursor, student_id, data['event_id'])
+        if result is None:
+            return jsonify({"error": "Event not found"}), 404
         db.commit()
-        return jsonify({"message": "RSVP created successfully"}), 201
+        if not result["created"]:
+            return jsonify({"message": "Already RSVPed", **result}), 200
+
+        cache.invalidate("rsvps")
+        audit.record("rsvp_created", "event", data['event_id'], user_id=student_id)
+        message = "RSVP created successfully" if result["status"] == "confirmed" \
+            else "Event is full; added to the waitlist"
+        return jsonify({"message": message, **result}), 201
     except Error as e:
         current_app.logger.error(f"Error creating RSVP: {e}")
         return jsonify({"error": "Error creating RSVP"}), 500
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
 
 # Cancel RSVP
 @student_routes.route('/students/<student_id>/rsvps/<int:rsvp_id>', methods=['DELETE'])
 def cancel_rsvp(student_id, rsvp_id):
+    cursor = None
     try:
         cursor = db.cursor(dictionary=True)
-        query = """
-            DELETE FROM RSVPs
-            WHERE rsvpID = %s AND studentID = %s
-        """
-        cursor.execute(query, (rsvp_id, student_id))
+        result = rsvps.cancel(cursor, student_id, rsvp_id)
         db.commit()
 
-        if cursor.rowcount > 0:
-            return jsonify({"message": "RSVP cancelled successfully"}), 200
-        else:
+        if result is None:
             return jsonify({"error": "RSVP not found"}), 404
 
+        cache.invalidate("rsvps")
+        return jsonify({"message": "RSVP cancelled successfully", "promoted": result["promoted"]}), 200
+
     except Error as e:
         current_app.logger.error(f"Error cancelling RSVP: {e}")
         return jsonify({"error": "Error cancelling RSVP"}), 500
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
 
 # Get student invitations
 @student_routes.route('/students/<student_id>/invitations', methods=['GET'])
 def get_student_invitations(student_id):
     try:
-        cursor = db.cursor(dictionary=True)
+        fmt = streaming.requested_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cursor = None
+    try:
         query = """
             SELECT 
                 ei.invitationID as invitation_id,
@@ -119,6 +144,11 @@ def get_student_invitations(student_id):
             WHERE ei.recipientStudentID = %s
             ORDER BY ei.sentAt DESC
         """
+        if fmt:
+            return streaming.stream_response(query, (student_id,), fmt,
+                                             f"student_{student_id}_invitations_received")
+
+        cursor = db.cursor(dictionary=True)
         cursor.execute(query, (student_id,))
         invitations = cursor.fetchall()
         return jsonify(invitations), 200
@@ -126,13 +156,19 @@ def get_student_invitations(student_id):
         current_app.logger.error(f"Error fetching invitations: {e}")
         return jsonify({"error": "Error fetching invitations"}), 500
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
 
 # Get student invitations (sent + received)
 @student_routes.route('/students/<student_id>/invitations/all', methods=['GET'])
 def get_all_student_invitations(student_id):
     try:
-        cursor = db.cursor(dictionary=True)
+        fmt = streaming.requested_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cursor = None
+    try:
         query = """
             SELECT 
                 ei.invitationID AS invitation_id,
@@ -152,6 +188,11 @@ def get_all_student_invitations(student_id):
                OR ei.recipientStudentID = %s
             ORDER BY ei.sentAt DESC
         """
+        if fmt:
+            return streaming.stream_response(query, (student_id, student_id), fmt,
+                                             f"student_{student_id}_invitations")
+
+        cursor = db.cursor(dictionary=True)
         cursor.execute(query, (student_id, student_id))
         invitations = cursor.fetchall()
         return jsonify(invitations), 200
@@ -159,7 +200,8 @@ def get_all_student_invitations(student_id):
         current_app.logger.error(f"Error fetching all invitations: {e}")
         return jsonify({"error": "Error fetching invitations"}), 500
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
 
 # Update invitation status
 @student_routes.route('/students/<student_id>/invitations/<int:invitation_id>', methods=['PUT'])
@@ -175,6 +217,7 @@ def update_invitation_status(student_id, invitation_id):
         """
         cursor.execute(query, (data['status'], invitation_id, student_id))
         db.commit()
+        cache.invalidate("invitations")
 
         if cursor.rowcount > 0:
             return jsonify({"message": "Invitation status updated successfully"}), 200
@@ -0,0 +1,176 @@
+#------------------------------------------------------------
+# Typeahead over event names, club names and keywords.
+#
+# Every name is indexed under each of its word starts ("Husky
+# Hackers" under "husky hackers" and "hackers"), and all keys live in
+# one sorted Python list next to a parallel list of entry numbers, so
+# a prefix is a bisect plus a contiguous slice. Entries carry a
+# popularity (RSVPs for events, members for clubs, searches for
+# keywords) scaled to [0, 1] within their kind so the kinds can be
+# ranked together.
+#
+# A short prefix can match a large share of the keys. For every
+# prefix whose slice is longer than SCAN_LIMIT, the best TOP_K entries
+# of each kind are precomputed at build time, so no lookup scans more
+# than SCAN_LIMIT keys. Memory stays bounded by indexing at most
+# MAX_WORDS word starts per name, truncating keys to MAX_KEY_CHARS
+# and only indexing events that have not ended.
+#------------------------------------------------------------
+import heapq
+import math
+import threading
+import time
+from bisect import bisect_left
+
+KINDS = ("event", "club", "keyword")
+SCAN_LIMIT = 256
+TOP_K = 20
+MAX_WORDS = 6
+MAX_KEY_CHARS = 48
+
+
+def normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def _keys(label):
+    words = normalize(label).split(" ")
+    return {" ".join(words[i:])[:MAX_KEY_CHARS] for i in range(min(len(words), MAX_WORDS))} - {""}
+
+
+class SuggestIndex:
+    """Sorted-array prefix index, rebuilt from the DB every refresh_seconds."""
+
+    def __init__(self, refresh_seconds=300):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        # (sorted keys, entry number per key, entries, hot prefix -> top entries per kind),
+        # swapped as one tuple so lookups never see a half-built index
+        self._state = ([], [], [], {})
+
+    def _stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def ensure_loaded(self, cursor):
+        if not self._stale():
+            return
+        # the first build is waited for; after that one request rebuilds
+        # while the others keep answering from the previous index
+        if not self._lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._stale():
+                self.load(cursor)
+        finally:
+            self._lock.release()
+
+    def load(self, cursor):
+        """(Re)build the index from upcoming events, all clubs and all keywords."""
+        cursor.execute("""
+            SELECT e.eventID AS id, e.name AS label,
+                   COALESCE(c.confirmedCount, 0) + COALESCE(c.waitlistCount, 0) AS popularity
+            FROM Events e
+            LEFT JOIN Event_RSVP_Counters c ON c.eventID = e.eventID
+            WHERE COALESCE(e.endDateTime, e.startDateTime) >= CURRENT_TIMESTAMP
+        """)
+        events = cursor.fetchall()
+        cursor.execute("""
+            SELECT c.clubID AS id, c.name AS label, COUNT(m.membership_id) AS popularity
+            FROM Clubs c
+            LEFT JOIN club_memberships m ON m.club_id = c.clubID
+            GROUP BY c.clubID, c.name
+        """)
+        clubs = cursor.fetchall()
+        cursor.execute("""
+            SELECT k.keywordID AS id, k.keyword AS label, COALESCE(t.searchCount, 0) AS popularity
+            FROM Keywords k
+            LEFT JOIN Keyword_Search_Totals t ON t.keywordID = k.keywordID
+        """)
+        keywords = cursor.fetchall()
+
+        entries = []
+        for kind, rows in (("event", events), ("club", clubs), ("keyword", keywords)):
+            top = max((int(row["popularity"] or 0) for row in rows), default=0)
+            for row in rows:
+                if not row["label"]:
+                    continue
+                popularity = int(row["popularity"] or 0)
+                score = math.log1p(popularity) / math.log1p(top) if top else 0.0
+                entries.append((kind, row["id"], row["label"], popularity, score))
+
+        pairs = sorted((key, number) for number, entry in enumerate(entries) for key in _keys(entry[2]))
+        keys = [key for key, _ in pairs]
+        owners = [number for _, number in pairs]
+        hot = {}
+        self._precompute(keys, owners, entries, hot, 0, len(keys), "")
+
+        with self._lock:
+            self._state = (keys, owners, entries, hot)
+            self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _best(owners, entries, lo, hi, kinds, limit):
+        """The `limit` most popular distinct entries of `kinds` among owners[lo:hi]."""
+        seen = set()
+        candidates = []
+        for number in owners[lo:hi]:
+            if number in seen:
+                continue
+            seen.add(number)
+            if entries[number][0] in kinds:
+                candidates.append(number)
+        return heapq.nlargest(limit, candidates, key=lambda n: (entries[n][4], -n))
+
+    def _precompute(self, keys, owners, entries, hot, lo, hi, prefix):
+        """Store the top entries per kind for every prefix that matches more than SCAN_LIMIT keys."""
+        if hi - lo <= SCAN_LIMIT:
+            return
+        if prefix:
+            by_kind = {kind: [] for kind in KINDS}
+            for number in set(owners[lo:hi]):
+                by_kind[entries[number][0]].append(number)
+            hot[prefix] = {kind: heapq.nlargest(TOP_K, numbers, key=lambda n: (entries[n][4], -n))
+                           for kind, numbers in by_kind.items()}
+        depth = len(prefix)
+        i = lo
+        while i < hi:
+            if len(keys[i]) <= depth:
+                i += 1
+                continue
+            child = keys[i][:depth + 1]
+            j = bisect_left(keys, child + "\uffff", i, hi)
+            self._precompute(keys, owners, entries, hot, i, j, child)
+            i = j
+
+    def suggest(self, prefix, kinds=KINDS, limit=10):
+        """Up to `limit` entries whose name has a word starting with `prefix`, most popular first."""
+        prefix = normalize(prefix)[:MAX_KEY_CHARS]
+        kinds = tuple(kinds)
+        limit = min(limit, TOP_K)
+        if not prefix:
+            return []
+        keys, owners, entries, hot = self._state
+
+        if prefix in hot:
+            numbers = heapq.nlargest(
+                limit, (n for kind in kinds for n in hot[prefix][kind]),
+                key=lambda n: (entries[n][4], -n),
+            )
+        else:
+            lo = bisect_left(keys, prefix)
+            hi = bisect_left(keys, prefix + "\uffff", lo)
+            numbers = self._best(owners, entries, lo, hi, kinds, limit)
+
+        return [
+            {"kind": entries[n][0], "id": entries[n][1], "label": entries[n][2],
+             "popularity": entries[n][3]}
+            for n in numbers
+        ]
+
+    def stats(self):
+        keys, _, entries, hot = self._state
+        return {"entries": len(entries), "keys": len(keys), "hot_prefixes": len(hot)}
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify, request, current_app
+from backend.db_connection import db
+from backend.suggest.index import KINDS, TOP_K, suggest_index
+from pymysql import Error
+
+suggest_routes = Blueprint("suggest_routes", __name__)
+
+
+# GET /suggest - Typeahead for events, clubs and keywords [Ruth-1]
+@suggest_routes.route("/suggest", methods=["GET"])
+def suggest():
+    """
+    Names that have a word starting with `prefix`, most popular first.
+
+    Query params:
+      prefix - what the user has typed so far (required)
+      kinds  - comma-separated subset of event,club,keyword (default all)
+      limit  - number of suggestions (default 10, max 20)
+    Each suggestion is {"kind", "id", "label", "popularity"}.
+    """
+    prefix = request.args.get("prefix", "")
+    if not prefix.strip():
+        return jsonify({"error": "prefix is required"}), 400
+    kinds = [k.strip() for k in request.args.get("kinds", ",".join(KINDS)).split(",") if k.strip()]
+    unknown = set(kinds) - set(KINDS)
+    if unknown or not kinds:
+        return jsonify({"error": f"kinds must be a subset of: {', '.join(KINDS)}"}), 400
+    limit = min(max(request.args.get("limit", 10, type=int), 1), TOP_K)
+
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+        suggest_index.ensure_loaded(cursor)
+        return jsonify(suggest_index.suggest(prefix, kinds, limit)), 200
+    except Error as e:
+        current_app.logger.error(f"Error in suggest: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
@@ -0,0 +1,200 @@
+#------------------------------------------------------------
+# EXPLAIN guardrail for the blueprint queries.
+#
+# Calls every route through the Flask test client against a seeded
+# database, records each SELECT, UPDATE and DELETE the route runs,
+# then EXPLAINs it. Write routes get the sample bodies below and run
+# with COMMIT turned into ROLLBACK, so the database is left as it was.
+# The check fails when MySQL would read a table outside
+# FULL_SCAN_ALLOWED with a full scan (type = ALL), or when a recorded
+# statement cannot be EXPLAINed.
+#
+# Run inside the api container, after the migrations are applied:
+#
+#     python -m scripts.explain_guard
+#
+# tests/test_explain_guard.py runs the same check under pytest when a
+# MySQL server is configured.
+#------------------------------------------------------------
+import argparse
+import os
+import re
+import sys
+
+from pymysql import connections, cursors
+
+from backend.rest_entry import create_app
+from backend.db_connection import db
+
+# Tables that are intentionally read in full: small dimension tables
+# that drive a "one row per club/category/server" report, and Students
+# for the whole-student-body listings and demographic reports.
+FULL_SCAN_ALLOWED = {
+    "Clubs", "Categories", "Servers", "Keywords", "Majors", "Minors", "Students",
+}
+
+WRITE_METHODS = ("POST", "PUT", "DELETE")
+RECORDED = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+# Sample values for route parameters, looked up from the seed data.
+SAMPLE_QUERIES = {
+    "event_id": "SELECT MIN(eventID) AS id FROM Events",
+    "student_id": "SELECT MIN(studentID) AS id FROM Students",
+    "club_id": "SELECT MIN(clubID) AS id FROM Clubs",
+    "rsvp_id": "SELECT MIN(rsvpID) AS id FROM RSVPs",
+    "invitation_id": "SELECT MIN(invitationID) AS id FROM Event_Invitations",
+    "alert_id": "SELECT MIN(alertID) AS id FROM Alerts",
+    "keyword_id": "SELECT MIN(keywordID) AS id FROM Keywords",
+}
+
+
+def _sample_query_strings(samples):
+    """Query parameters for routes that read them, keyed by (method, rule)."""
+    return {
+        ("DELETE", "/events/<int:event_id>/keywords"): {"keyword_id": samples["keyword_id"]},
+    }
+
+
+def _sample_bodies(samples):
+    """JSON bodies for the write routes, keyed by (method, rule)."""
+    event_id, student_id = samples["event_id"], samples["student_id"]
+    return {
+        ("POST", "/events"): {"name": "explain guard", "startDateTime": "2030-01-01 18:00:00",
+                              "clubID": samples["club_id"]},
+        ("POST", "/events/search/clicks"): {"event_id": event_id, "student_id": student_id},
+        ("POST", "/events/<int:event_id>/attendance"): {"student_id": student_id},
+        ("POST", "/events/<int:event_id>/attendance/batch"): {"check_ins": [student_id]},
+        ("POST", "/events/<int:event_id>/keywords"): {"keywords": ["explain guard"]},
+        ("PUT", "/events/<int:event_id>/keywords"): {"keywords": ["explain guard"]},
+        ("POST", "/events/keywords/bulk"): {"event_ids": [event_id], "add": ["explain guard"]},
+        ("POST", "/students/<student_id>/rsvps"): {"event_id": event_id},
+        ("PUT", "/students/<student_id>/invitations/<int:invitation_id>"): {"status": "accepted"},
+        ("POST", "/invitations/invitations"): {"event_id": event_id, "sender_student_id": student_id,
+                                               "recipient_student_id": student_id},
+        ("POST", "/audit/events"): {"action_type": "login", "user_id": student_id},
+    }
+
+
+class _Recorder:
+    """
+    Wraps pymysql's Cursor.execute to remember every recorded statement
+    that ran without error. With rollback=True, Connection.commit rolls
+    back instead.
+    """
+
+    def __init__(self, rollback=False):
+        self.statements = []
+        self.rollback = rollback
+        self._execute = None
+        self._commit = None
+
+    def __enter__(self):
+        recorder = self
+        execute = self._execute = cursors.Cursor.execute
+        self._commit = connections.Connection.commit
+
+        def recording_execute(cursor, query, args=None):
+            result = execute(cursor, query, args)
+            if query.lstrip().upper().startswith(RECORDED):
+                recorder.statements.append(cursor.mogrify(query, args))
+            return result
+
+        cursors.Cursor.execute = recording_execute
+        if self.rollback:
+            connections.Connection.commit = connections.Connection.rollback
+        return self
+
+    def __exit__(self, *exc):
+        cursors.Cursor.execute = self._execute
+        connections.Connection.commit = self._commit
+
+
+def _sample_values(app):
+    values = {}
+    with app.app_context(), db.connection() as conn:
+        with conn.cursor(cursors.DictCursor) as cursor:
+            for name, query in SAMPLE_QUERIES.items():
+                cursor.execute(query)
+                values[name] = (cursor.fetchone() or {}).get("id") or 1
+    return values
+
+
+def _build_url(rule, samples):
+    url = rule.rule
+    for arg in rule.arguments:
+        url = re.sub(r"<(?:[^:<>]+:)?%s>" % arg, str(samples.get(arg, 1)), url)
+    return url
+
+
+def _collect(app):
+    """Return {"METHOD url": [sql, ...]} for every route that touches the DB."""
+    samples = _sample_values(app)
+    bodies = _sample_bodies(samples)
+    query_strings = _sample_query_strings(samples)
+    client = app.test_client()
+    collected = {}
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint == "static":
+            continue
+        url = _build_url(rule, samples)
+        for method in ("GET",) + WRITE_METHODS:
+            if method not in rule.methods:
+                continue
+            with _Recorder(rollback=method in WRITE_METHODS) as recorder:
+                client.open(url, method=method, json=bodies.get((method, rule.rule)),
+                            query_string=query_strings.get((method, rule.rule)))
+            if recorder.statements:
+                collected[f"{method} {url}"] = recorder.statements
+    return collected
+
+
+def _explain(conn, sql):
+    with conn.cursor(cursors.DictCursor) as cursor:
+        cursor.execute("EXPLAIN " + sql)
+        return cursor.fetchall()
+
+
+def check(out=sys.stdout):
+    # cached responses would hide the queries behind them
+    os.environ["CACHE_BACKEND"] = "none"
+    app = create_app()
+    collected = _collect(app)
+    failures, errors, checked = [], [], 0
+
+    with app.app_context(), db.connection() as conn:
+        for route, statements in collected.items():
+            for sql in statements:
+                checked += 1
+                try:
+                    plan = _explain(conn, sql)
+                except Exception as e:
+                    errors.append((route, sql, str(e)))
+                    continue
+                for row in plan:
+                    table = row.get("table") or ""
+                    if row.get("type") != "ALL" or table.startswith("<"):
+                        continue
+                    if table not in FULL_SCAN_ALLOWED:
+                        failures.append((route, table, row.get("possible_keys"), sql))
+
+    for route, table, keys, sql in failures:
+        print(f"FULL SCAN  {route}  table={table}  possible_keys={keys}", file=out)
+        print("    " + " ".join(sql.split())[:300], file=out)
+    for route, sql, message in errors:
+        print(f"ERROR      {route}  {message}", file=out)
+        print("    " + " ".join(sql.split())[:300], file=out)
+    print(f"{checked} queries checked across {len(collected)} routes: "
+          f"{len(failures)} full scans, {len(errors)} errors", file=out)
+    return not failures and not errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN every blueprint query and fail on full table scans"
+    )
+    parser.parse_args(argv)
+    sys.exit(0 if check() else 1)
+
+
+if __name__ == "__main__":
+    main()
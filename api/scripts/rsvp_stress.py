@@ -0,0 +1,184 @@
+#------------------------------------------------------------
+# Concurrency check for RSVP admission (backend/events/rsvps.py).
+#
+# Creates a scratch event with a small capacity and a batch of
+# scratch students, fires every RSVP in parallel (each thread on its
+# own connection), cancels a share of them while admissions are still
+# running, then checks that the event was never oversold and that the
+# counters match the RSVPs table. Scratch rows are removed afterwards.
+#
+# Run inside the api container, after migration 004 is applied:
+#
+#     python -m scripts.rsvp_stress [--students 2000] [--capacity 100]
+#                                   [--threads 64] [--cancel-ratio 0.1]
+#------------------------------------------------------------
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from backend.rest_entry import create_app
+from backend.db_connection import db
+from backend.events import rsvps
+
+
+class _Connections:
+    """One database connection per worker thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = db.connect()
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+
+
+def _setup(conn, students, capacity):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(eventID), 0) + 1 AS id FROM Events")
+        event_id = cursor.fetchone()["id"]
+        cursor.execute("SELECT MIN(clubID) AS id FROM Clubs")
+        club_id = cursor.fetchone()["id"]
+        cursor.execute("SELECT COALESCE(MAX(studentID), 0) + 1 AS id FROM Students")
+        first_student = cursor.fetchone()["id"]
+
+        start = datetime.now() + timedelta(days=30)
+        cursor.execute("""
+            INSERT INTO Events (eventID, name, startDateTime, endDateTime, clubID, capacity)
+            VALUES (%s, 'RSVP stress test', %s, %s, %s, %s)
+        """, (event_id, start, start + timedelta(hours=2), club_id, capacity))
+        rsvps.create_counters(cursor, event_id)
+
+        student_ids = list(range(first_student, first_student + students))
+        cursor.executemany("""
+            INSERT INTO Students (studentID, email, firstName, lastName)
+            VALUES (%s, %s, 'Stress', 'Test')
+        """, [(sid, f"rsvp-stress-{sid}@example.invalid") for sid in student_ids])
+    conn.commit()
+    return event_id, student_ids
+
+
+def _teardown(conn, event_id, student_ids):
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM Events WHERE eventID = %s", (event_id,))
+        # admissions and cancellations also updated the RSVP rollups
+        for table in ("Rollup_Event_Daily", "Rollup_Event_Hourly"):
+            cursor.execute(f"DELETE FROM {table} WHERE eventID = %s", (event_id,))
+        cursor.executemany("DELETE FROM Students WHERE studentID = %s",
+                           [(sid,) for sid in student_ids])
+    conn.commit()
+
+
+def _verify(conn, event_id, capacity):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT
+                COALESCE(SUM(status = 'confirmed'), 0) AS confirmed,
+                COALESCE(SUM(status = 'waitlisted'), 0) AS waitlisted
+            FROM RSVPs
+            WHERE eventID = %s
+        """, (event_id,))
+        actual = cursor.fetchone()
+        cursor.execute(
+            "SELECT confirmedCount, waitlistCount FROM Event_RSVP_Counters WHERE eventID = %s",
+            (event_id,),
+        )
+        counters = cursor.fetchone()
+    conn.commit()
+
+    confirmed, waitlisted = int(actual["confirmed"]), int(actual["waitlisted"])
+    problems = []
+    if confirmed > capacity:
+        problems.append(f"oversold: {confirmed} confirmed for capacity {capacity}")
+    if waitlisted and confirmed < capacity:
+        problems.append(f"{waitlisted} waitlisted while {capacity - confirmed} seats are free")
+    if (counters["confirmedCount"], counters["waitlistCount"]) != (confirmed, waitlisted):
+        problems.append(
+            f"counters ({counters['confirmedCount']}, {counters['waitlistCount']}) "
+            f"do not match RSVPs ({confirmed}, {waitlisted})"
+        )
+    return confirmed, waitlisted, problems
+
+
+def run(students=2000, capacity=100, threads=64, cancel_ratio=0.1, seed=None, out=sys.stdout):
+    app = create_app()
+    rng = random.Random(seed)
+    with app.app_context():
+        admin = db.connect()
+        event_id, student_ids = _setup(admin, students, capacity)
+        connections = _Connections()
+        outcomes = {"confirmed": 0, "waitlisted": 0, "cancelled": 0, "promoted": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def attempt(student_id, then_cancel):
+            conn = connections.get()
+            try:
+                with conn.cursor() as cursor:
+                    result = rsvps.admit(cursor, student_id, event_id)
+                    conn.commit()
+                    outcome = [result["status"]]
+                    if then_cancel:
+                        cancelled = rsvps.cancel(cursor, student_id, result["rsvp_id"])
+                        conn.commit()
+                        outcome.append("cancelled")
+                        outcome += ["promoted"] * len(cancelled["promoted"])
+            except Exception as e:
+                conn.rollback()
+                outcome = ["errors"]
+                print(f"student {student_id}: {e}", file=out)
+            with lock:
+                for name in outcome:
+                    outcomes[name] += 1
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                for student_id in rng.sample(student_ids, len(student_ids)):
+                    pool.submit(attempt, student_id, rng.random() < cancel_ratio)
+            elapsed = time.perf_counter() - started
+            confirmed, waitlisted, problems = _verify(admin, event_id, capacity)
+        finally:
+            connections.close()
+            _teardown(admin, event_id, student_ids)
+            admin.close()
+
+    print(f"{students} RSVPs on {threads} threads in {elapsed:.2f}s "
+          f"({students / elapsed:.0f}/s), capacity {capacity}", file=out)
+    print("admitted: {confirmed} confirmed, {waitlisted} waitlisted; "
+          "{cancelled} cancelled, {promoted} promoted, {errors} errors".format(**outcomes), file=out)
+    print(f"final: {confirmed} confirmed, {waitlisted} waitlisted", file=out)
+    for problem in problems:
+        print(f"FAIL  {problem}", file=out)
+    return not problems and not outcomes["errors"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fire parallel RSVPs at a scratch event and check it is never oversold"
+    )
+    parser.add_argument("--students", type=int, default=2000, help="number of parallel RSVPs")
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--cancel-ratio", type=float, default=0.1,
+                        help="share of RSVPs cancelled right after admission")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    ok = run(args.students, args.capacity, args.threads, args.cancel_ratio, args.seed)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the backend package is imported as `backend`, the way the api container runs it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,111 @@
+import random
+from datetime import datetime, timedelta
+
+from backend.events.conflicts import ConflictIndex, IntervalTree
+
+
+def _overlapping(spans, start, end):
+    return {key for key, (s, e) in spans.items() if s < end and e > start}
+
+
+def test_half_open_intervals():
+    tree = IntervalTree()
+    tree.insert("a", 0, 10)
+    tree.insert("b", 10, 20)
+    assert set(tree.overlapping(5, 10)) == {"a"}
+    assert set(tree.overlapping(10, 11)) == {"b"}
+    assert set(tree.overlapping(9, 11)) == {"a", "b"}
+    assert set(tree.overlapping(20, 30)) == set()
+
+
+def test_overlapping_matches_brute_force_through_inserts_and_removes():
+    rng = random.Random(7)
+    tree, spans = IntervalTree(), {}
+    for step in range(3000):
+        key = rng.randrange(300)
+        if key in spans and rng.random() < 0.3:
+            assert tree.remove(key)
+            del spans[key]
+        else:
+            # inserting an existing key replaces its interval
+            start = rng.randrange(1000)
+            spans[key] = (start, start + rng.randrange(1, 60))
+            tree.insert(key, *spans[key])
+        if step % 10 == 0:
+            start = rng.randrange(-20, 1020)
+            end = start + rng.randrange(1, 80)
+            assert set(tree.overlapping(start, end)) == _overlapping(spans, start, end)
+    assert len(tree) == len(spans)
+    assert not tree.remove(-1)
+
+
+def test_duplicate_starts():
+    tree = IntervalTree()
+    for key in range(50):
+        tree.insert(key, 100, 100 + key + 1)
+    for key in range(0, 50, 2):
+        tree.remove(key)
+    assert set(tree.overlapping(140, 200)) == {k for k in range(1, 50, 2) if 100 + k + 1 > 140}
+
+
+def _row(event_id, start, hours, club_id=1, building="Hall", room="101"):
+    return {"eventID": event_id, "name": f"event {event_id}", "startDateTime": start,
+            "endDateTime": start + timedelta(hours=hours), "location": None,
+            "buildingName": building, "roomNumber": room, "capacity": None,
+            "clubID": club_id, "club_name": None}
+
+
+def _index(rows):
+    index = ConflictIndex()
+    for row in rows:
+        index._put(row)
+    return index
+
+
+def test_put_skips_events_without_a_valid_span():
+    start = datetime.now() + timedelta(days=1)
+    index = _index([_row(1, start, 2)])
+    index._put(dict(_row(1, start, 2), endDateTime=start))
+    assert index.overlapping(start - timedelta(days=1), start + timedelta(days=1)) == []
+    index._put(dict(_row(2, start, 2), endDateTime=None))
+    assert len(index._tree) == 0
+
+
+def test_overlapping_filters_and_orders_by_start():
+    start = datetime.now() + timedelta(days=1)
+    index = _index([
+        _row(1, start + timedelta(hours=1), 2, club_id=1),
+        _row(2, start, 2, club_id=2, room="102"),
+        _row(3, start + timedelta(hours=5), 1, club_id=2),
+    ])
+    window = (start, start + timedelta(hours=3))
+    assert [e["eventID"] for e in index.overlapping(*window)] == [2, 1]
+    assert [e["eventID"] for e in index.overlapping(*window, exclude_club_id=2)] == [1]
+    assert [e["eventID"] for e in index.overlapping(*window, building="Hall", room="101")] == [1]
+
+
+def test_pairwise_matches_brute_force():
+    rng = random.Random(8)
+    base = datetime.now() + timedelta(days=1)
+    rows = [_row(event_id, base + timedelta(hours=rng.randrange(200)), rng.randrange(1, 6))
+            for event_id in range(1, 150)]
+    index = _index(rows)
+    for event_id in rng.sample(range(1, 150), 20):
+        index.remove(event_id)
+    live = [row for row in rows if row["eventID"] in index._events]
+
+    expected = {(a["eventID"], b["eventID"]) for a in live for b in live
+                if a["eventID"] < b["eventID"]
+                and a["startDateTime"] < b["endDateTime"] and b["startDateTime"] < a["endDateTime"]}
+    pairs = index.pairwise()
+    assert [(p["event1_id"], p["event2_id"]) for p in pairs if p["event1_id"] < p["event2_id"]] == \
+        [(p["event1_id"], p["event2_id"]) for p in pairs]
+    assert {(p["event1_id"], p["event2_id"]) for p in pairs} == expected
+    assert len(pairs) == len(expected)
+
+
+def test_pairwise_skips_events_that_have_ended():
+    now = datetime.now()
+    index = _index([_row(1, now - timedelta(hours=3), 1), _row(2, now - timedelta(hours=3), 2),
+                    _row(3, now + timedelta(hours=1), 1), _row(4, now + timedelta(hours=1), 1)])
+    assert [(p["event1_id"], p["event2_id"]) for p in index.pairwise()] == [(3, 4)]
@@ -0,0 +1,154 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from backend.analytics import cube
+from backend.analytics.cube import AttendanceCube
+
+EPOCH = datetime(1970, 1, 1)
+START = datetime(2025, 9, 1)
+YEARS = ["freshman", "sophomore", "junior", "senior", None]
+MAJORS = ["CS", "Biology", "History", None]
+
+
+class FakeDB:
+    def __init__(self, rng, students=300, checkins=5000):
+        self.categories = {1: "Academic", 2: "Sports", 3: "Arts"}
+        self.students = {student_id: (rng.choice(YEARS), rng.choice(MAJORS))
+                         for student_id in rng.sample(range(1, 10000), students)}
+        self.attendance = []
+        self.add(rng, checkins)
+
+    def add(self, rng, count, student_ids=None):
+        student_ids = sorted(student_ids or self.students)
+        for _ in range(count):
+            moment = START + timedelta(minutes=rng.randrange(60 * 24 * 90))
+            self.attendance.append({
+                "attendanceID": len(self.attendance) + 1,
+                "studentID": rng.choice(student_ids),
+                "eventID": rng.randrange(1, 40),
+                "clubID": rng.randrange(1, 10),
+                "categoryID": rng.choice([1, 2, 3, -1]),
+                "seconds": int((moment - EPOCH).total_seconds()),
+                "moment": moment,
+            })
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def execute(self, query, args=()):
+        db, q = self.db, " ".join(query.split())
+        if q.startswith("SELECT categoryID, name FROM Categories"):
+            self.rows = [{"categoryID": k, "name": v} for k, v in db.categories.items()]
+        elif q.startswith("SELECT studentID, year, major FROM Students"):
+            wanted = set(args) if args else db.students
+            self.rows = [{"studentID": s, "year": y, "major": m}
+                         for s, (y, m) in db.students.items() if s in wanted]
+        elif q.startswith("SELECT sea.attendanceID"):
+            last_id, limit = args
+            self.rows = [row for row in db.attendance if row["attendanceID"] > last_id][:limit]
+        elif q.startswith("SELECT COUNT(*) AS n"):
+            self.rows = [{"n": len(db.attendance),
+                          "last": max((r["attendanceID"] for r in db.attendance), default=0)}]
+        else:
+            raise AssertionError(f"unexpected query: {q}")
+
+
+def _window(db, start, end):
+    return [row for row in db.attendance
+            if (start is None or row["moment"] >= start) and (end is None or row["moment"] < end)]
+
+
+def _by(db, start, end, column):
+    """{value: (total students, active students, check-ins)} grouped by year (0) or major (1)."""
+    rows = _window(db, start, end)
+    total = Counter(info[column] for info in db.students.values())
+    active, attendance = {}, Counter()
+    for row in rows:
+        value = db.students[row["studentID"]][column]
+        active.setdefault(value, set()).add(row["studentID"])
+        attendance[value] += 1
+    return {value: (total[value], len(active.get(value, ())), attendance[value]) for value in total}
+
+
+def _preferences(db, start, end):
+    counts, students = Counter(), {}
+    for row in _window(db, start, end):
+        if row["categoryID"] not in db.categories:
+            continue
+        year, major = db.students[row["studentID"]]
+        key = (major, year, db.categories[row["categoryID"]])
+        counts[key] += 1
+        students.setdefault(key, set()).add(row["studentID"])
+    return {key: (count, len(students[key])) for key, count in counts.items()}
+
+
+def _assert_matches_brute_force(loaded, db):
+    windows = [(None, None), (START + timedelta(days=20), START + timedelta(days=50)),
+               (START + timedelta(days=85), None), (START + timedelta(days=200), None)]
+    for start, end in windows:
+        assert {r["year"]: (r["total_students"], r["active_students"], r["total_attendance"])
+                for r in loaded.by_year(start, end)} == _by(db, start, end, 0)
+        assert {r["major"]: (r["total_students"], r["active_students"], r["total_attendance"])
+                for r in loaded.by_major(start, end)} == _by(db, start, end, 1)
+        assert {(r["major"], r["year"], r["category_name"]): (r["attendance_count"], r["unique_students"])
+                for r in loaded.event_preferences(start, end)} == _preferences(db, start, end)
+
+        cohorts = Counter(db.students.values())
+        active = {}
+        for row in _window(db, start, end):
+            active.setdefault(db.students[row["studentID"]], set()).add(row["studentID"])
+        assert {(r["major"], r["year"]): (r["total_students"], r["active_students"])
+                for r in loaded.participation(start, end)} == \
+            {(major, year): (n, len(active.get((year, major), ()))) for (year, major), n in cohorts.items()}
+
+    rates = [r["participation_rate"] for r in loaded.by_major()]
+    assert rates == sorted(rates, reverse=True)
+
+
+def test_cube_matches_brute_force(monkeypatch):
+    monkeypatch.setattr(cube, "LOAD_BATCH", 700)
+    db = FakeDB(random.Random(12))
+    loaded = AttendanceCube()
+    loaded.load(FakeCursor(db))
+    assert len(loaded) == len(db.attendance)
+    _assert_matches_brute_force(loaded, db)
+
+
+def test_appended_checkins_and_new_students(monkeypatch):
+    monkeypatch.setattr(cube, "LOAD_BATCH", 700)
+    rng = random.Random(13)
+    db = FakeDB(rng, checkins=1000)
+    loaded = AttendanceCube()
+    cursor = FakeCursor(db)
+    loaded.load(cursor)
+
+    db.students.update({student_id: (rng.choice(YEARS), rng.choice(MAJORS)) for student_id in range(10000, 10020)})
+    db.add(rng, 500, student_ids=range(10000, 10020))
+    db.add(rng, 2000)
+    loaded._append(cursor)
+    assert len(loaded) == len(db.attendance)
+    _assert_matches_brute_force(loaded, db)
+
+    # deleted check-ins force a full reload
+    del db.attendance[:100]
+    loaded._append(cursor)
+    assert len(loaded) == len(db.attendance)
+    _assert_matches_brute_force(loaded, db)
+
+
+def test_over_budget_switches_the_cube_off():
+    db = FakeDB(random.Random(14), checkins=2000)
+    loaded = AttendanceCube(max_bytes=1000 * cube.ROW_BYTES)
+    loaded.load(FakeCursor(db))
+    assert loaded.ensure_fresh(FakeCursor(db)) is False
+    assert len(loaded) == 0 and loaded.stats()["over_budget"]
@@ -0,0 +1,30 @@
+import io
+import os
+
+import pymysql
+import pytest
+from dotenv import load_dotenv
+
+
+def _mysql_available():
+    """True when api/.env (or the environment) points at a MySQL server we can reach."""
+    load_dotenv()
+    if not os.getenv("DB_HOST"):
+        return False
+    try:
+        pymysql.connect(host=os.getenv("DB_HOST").strip(), port=int(os.getenv("DB_PORT", "3306")),
+                        user=os.getenv("DB_USER", "root").strip(),
+                        password=(os.getenv("MYSQL_ROOT_PASSWORD") or "").strip(),
+                        database=os.getenv("DB_NAME", "ClubHub").strip(),
+                        connect_timeout=2).close()
+    except pymysql.Error:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _mysql_available(), reason="no MySQL server configured")
+def test_blueprint_queries_avoid_full_table_scans():
+    from scripts import explain_guard
+
+    out = io.StringIO()
+    assert explain_guard.check(out), out.getvalue()
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from backend.analytics.funnel import CHECKIN, CLICK, IMPRESSION, RSVP, Journeys
+
+T0 = datetime(2025, 10, 1, 12, 0)
+
+
+def _at(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+
+def test_full_journey_credits_the_search_keyword():
+    journeys = Journeys()
+    assert journeys.step(_at(0), IMPRESSION, 1, 10, "chess") == "chess"
+    assert journeys.step(_at(1), CLICK, 1, 10) == "chess"
+    assert journeys.step(_at(2), RSVP, 1, 10) == "chess"
+    assert journeys.step(_at(3), CHECKIN, 1, 10) == "chess"
+
+
+def test_last_search_before_the_click_gets_the_credit():
+    journeys = Journeys()
+    journeys.step(_at(0), IMPRESSION, 1, 10, "chess")
+    assert journeys.step(_at(1), IMPRESSION, 1, 10, "board games") == "board games"
+    assert journeys.step(_at(2), CLICK, 1, 10) == "board games"
+    # later impressions are counted but do not take over a journey that has moved on
+    assert journeys.step(_at(3), IMPRESSION, 1, 10, "strategy") == "strategy"
+    assert journeys.step(_at(4), RSVP, 1, 10) == "board games"
+
+
+def test_steps_out_of_order_do_not_count():
+    journeys = Journeys()
+    assert journeys.step(_at(0), CLICK, 1, 10) is None
+    journeys.step(_at(1), IMPRESSION, 1, 10, "chess")
+    assert journeys.step(_at(2), RSVP, 1, 10) is None
+    assert journeys.step(_at(3), CLICK, 1, 10) == "chess"
+    assert journeys.step(_at(4), CLICK, 1, 10) is None
+    # another student or event is a separate journey
+    assert journeys.step(_at(5), RSVP, 2, 10) is None
+    assert journeys.step(_at(5), RSVP, 1, 11) is None
+
+
+def test_anonymous_impressions_count_but_are_not_followed():
+    journeys = Journeys()
+    assert journeys.step(_at(0), IMPRESSION, None, 10, "chess") == "chess"
+    assert journeys.step(_at(1), CLICK, None, 10) is None
+    assert len(journeys) == 0
+
+
+def test_journeys_expire_after_the_window():
+    journeys = Journeys(window=timedelta(days=1))
+    journeys.step(_at(0), IMPRESSION, 1, 10, "chess")
+    journeys.step(_at(0), IMPRESSION, 2, 10, "chess")
+    assert journeys.step(_at(60 * 20), CLICK, 2, 10) == "chess"
+    # student 1 did not move within a day; student 2's click kept their journey open
+    assert journeys.step(_at(60 * 25), CLICK, 1, 10) is None
+    assert journeys.step(_at(60 * 25), RSVP, 2, 10) == "chess"
+    assert len(journeys) == 1
+
+
+def test_limit_drops_the_least_recently_advanced():
+    journeys = Journeys(limit=2)
+    journeys.step(_at(0), IMPRESSION, 1, 10, "a")
+    journeys.step(_at(1), IMPRESSION, 2, 10, "b")
+    journeys.step(_at(2), CLICK, 1, 10)
+    journeys.step(_at(3), IMPRESSION, 3, 10, "c")
+    assert len(journeys) == 2
+    assert journeys.step(_at(4), CLICK, 2, 10) is None
+    assert journeys.step(_at(4), RSVP, 1, 10) == "a"
+    assert journeys.step(_at(4), CLICK, 3, 10) == "c"
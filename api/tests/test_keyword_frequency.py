@@ -0,0 +1,101 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from backend.keywords import frequency
+from backend.keywords.frequency import KeywordMatcher
+
+
+class FakeCursor:
+    """Keywords, Search_Logs and the two counter tables, for the queries frequency.py runs."""
+
+    def __init__(self, keywords, logs=()):
+        self.keywords = dict(keywords)
+        self.logs = list(logs)  # (timestamp, query), searchLogID is position + 1
+        self.counts = Counter()
+        self.totals = Counter()
+        self.upserts = []
+        self.rows = []
+
+    def fetchall(self):
+        return self.rows
+
+    def executemany(self, query, rows):
+        self.upserts.append(list(rows))
+        for args in rows:
+            self.execute(query, args)
+
+    def execute(self, query, args=()):
+        q = " ".join(query.split())
+        self.rows = []
+        if q.startswith("SELECT keywordID, keyword FROM Keywords"):
+            self.rows = [{"keywordID": k, "keyword": v} for k, v in self.keywords.items()]
+        elif q.startswith("SELECT searchLogID, searchQuery, DATE(timestamp) AS day FROM Search_Logs"):
+            last_id, limit = args
+            self.rows = [{"searchLogID": i, "searchQuery": query,
+                          "day": timestamp.date() if timestamp else None}
+                         for i, (timestamp, query) in enumerate(self.logs, 1) if i > last_id][:limit]
+        elif q.startswith("DELETE FROM Keyword_Search_Counts"):
+            self.counts.clear()
+        elif q.startswith("DELETE FROM Keyword_Search_Totals"):
+            self.totals.clear()
+        elif q.startswith("INSERT INTO Keyword_Search_Counts"):
+            self.counts[args[:2]] += args[2]
+        elif q.startswith("INSERT INTO Keyword_Search_Totals"):
+            self.totals[args[0]] += args[1]
+        else:
+            raise AssertionError(f"unexpected query: {q}")
+
+
+KEYWORDS = {1: "career fair", 2: "career", 3: "c++", 4: "rock-climbing", 5: "jazz"}
+
+
+def test_matcher_finds_single_and_multi_word_keywords():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.match("Spring CAREER fair") == {1, 2}
+    assert matcher.match("fair career") == {2}
+    assert matcher.match("rock-climbing wall, jazz") == {4, 5}
+    assert matcher.match("rock climbing") == set()
+    assert matcher.match("") == set()
+
+
+def test_count_searches_counts_per_keyword_and_day():
+    cursor = FakeCursor(KEYWORDS)
+    day = datetime(2025, 10, 1, 9)
+    frequency.count_searches(cursor, [
+        (day, "career fair"), (day, "jazz night"), (day + timedelta(days=1), "career"),
+        (None, "jazz"), (day, "nothing here"),
+    ])
+    assert cursor.counts == {(1, day.date()): 1, (2, day.date()): 1, (5, day.date()): 1,
+                             (2, day.date() + timedelta(days=1)): 1}
+    assert cursor.totals == {1: 1, 2: 2, 5: 1}
+    # rows are upserted in key order, so concurrent flushes lock them alike
+    assert all(rows == sorted(rows) for rows in cursor.upserts)
+
+
+def test_new_keywords_count_the_searches_after_them():
+    cursor = FakeCursor(KEYWORDS)
+    day = datetime(2025, 10, 1, 9)
+    frequency.count_searches(cursor, [(day, "hackathon")])
+    cursor.keywords[6] = "hackathon"
+    frequency.count_searches(cursor, [(day, "hackathon signup")])
+    assert cursor.totals[6] == 1
+
+
+def test_flushed_counts_match_a_backfill(monkeypatch):
+    monkeypatch.setattr(frequency, "BATCH_SIZE", 7)
+    rng = random.Random(15)
+    words = ["career", "fair", "jazz", "c++", "rock-climbing", "night", "club"]
+    start = datetime(2025, 10, 1)
+    logs = [(start + timedelta(hours=rng.randrange(200)), " ".join(rng.sample(words, 3)))
+            for _ in range(100)]
+
+    flushed = FakeCursor(KEYWORDS)
+    for i in range(0, len(logs), 9):
+        frequency.count_searches(flushed, logs[i:i + 9])
+
+    recounted = FakeCursor(KEYWORDS, logs)
+    recounted.counts[(1, start.date())] = 99  # stale counts are dropped
+    assert frequency.backfill(recounted) == len(logs)
+    assert +recounted.counts == +flushed.counts
+    assert +recounted.totals == +flushed.totals
@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+from backend.db_connection.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.open = True
+        self.rollbacks = 0
+        self.fail_ping = False
+        self.fail_rollback = False
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise OSError("connection lost")
+        self.rollbacks += 1
+
+    def ping(self, reconnect=False):
+        if self.fail_ping:
+            raise OSError("gone away")
+
+    def close(self):
+        self.open = False
+
+
+class Connector:
+    def __init__(self):
+        self.made = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.made))
+        self.made.append(conn)
+        return conn
+
+
+def _pool(**kwargs):
+    connect = Connector()
+    kwargs.setdefault("min_size", 0)
+    return ConnectionPool(connect, **kwargs), connect
+
+
+def test_min_size_larger_than_max_size():
+    with pytest.raises(ValueError):
+        ConnectionPool(Connector(), min_size=3, max_size=2)
+
+
+def test_warm_opens_min_size():
+    pool, connect = _pool(min_size=3, max_size=5)
+    assert pool.warm() == 3
+    assert pool.warm() == 0
+    assert pool.stats()["idle"] == 3 and len(connect.made) == 3
+
+
+def test_checkin_rolls_back_and_reuses_lifo():
+    pool, connect = _pool(max_size=3)
+    first, second = pool.checkout(), pool.checkout()
+    pool.checkin(first)
+    pool.checkin(second)
+    assert first.conn.rollbacks == 1
+    assert pool.checkout() is second
+    assert pool.checkout() is first
+    assert len(connect.made) == 2
+
+
+def test_checkout_times_out_when_exhausted():
+    pool, _ = _pool(max_size=2, timeout=0.05)
+    held = [pool.checkout(), pool.checkout()]
+    with pytest.raises(PoolTimeout):
+        pool.checkout()
+    assert pool.stats()["timeouts"] == 1
+
+    # a connection returned while waiting is handed to the waiter
+    pool.timeout = 5
+    threading.Timer(0.05, pool.checkin, (held[0],)).start()
+    assert pool.checkout() is held[0]
+    assert pool.stats()["wait_seconds_max"] > 0
+
+
+def test_expired_connections_are_recycled():
+    pool, connect = _pool(max_size=2, max_lifetime=0.05)
+    entry = pool.checkout()
+    pool.checkin(entry)
+    time.sleep(0.06)
+    fresh = pool.checkout()
+    assert fresh.conn is not entry.conn and not entry.conn.open
+    time.sleep(0.06)
+    pool.checkin(fresh)
+    assert not fresh.conn.open
+    stats = pool.stats()
+    assert stats["connections_recycled"] == 2 and stats["size"] == 0
+
+
+def test_failed_ping_replaces_the_connection():
+    pool, connect = _pool(max_size=2)
+    entry = pool.checkout()
+    pool.checkin(entry)
+    entry.conn.fail_ping = True
+    replaced = pool.checkout()
+    assert replaced.conn is not entry.conn and not entry.conn.open
+    assert pool.stats()["ping_failures"] == 1
+
+
+def test_broken_connections_are_discarded():
+    pool, _ = _pool(max_size=2)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.close()
+            raise RuntimeError("query failed")
+    entry = pool.checkout()
+    entry.conn.fail_rollback = True
+    pool.checkin(entry)
+    stats = pool.stats()
+    assert stats["size"] == 0 and stats["idle"] == 0 and stats["in_use"] == 0
+
+
+def test_connection_error_keeps_a_healthy_connection():
+    pool, _ = _pool(max_size=2)
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError("query failed")
+    assert pool.stats()["idle"] == 1
+
+
+def test_failed_connect_frees_the_slot():
+    pool, connect = _pool(max_size=1, timeout=0.05)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("refused")
+        return connect()
+
+    pool._connect = flaky
+    with pytest.raises(OSError):
+        pool.checkout()
+    assert pool.stats()["size"] == 0
+    assert pool.checkout().conn is connect.made[0]
+
+
+def test_stats_under_concurrency():
+    pool, connect = _pool(max_size=4, timeout=5)
+
+    def work():
+        for _ in range(50):
+            with pool.connection():
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert stats["checkouts"] == 400
+    assert stats["in_use"] == 0 and stats["peak_in_use"] <= 4
+    assert stats["size"] == stats["idle"] == len(connect.made) <= 4
+    pool.close()
+    assert pool.stats()["size"] == 0 and not any(c.open for c in connect.made)
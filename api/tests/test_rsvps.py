@@ -0,0 +1,206 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from backend.events import rsvps
+
+
+class FakeDB:
+    """In-memory Events, Event_RSVP_Counters, RSVPs and RSVP rollups for the queries rsvps.py runs."""
+
+    def __init__(self):
+        self.events = {}
+        self.counters = {}
+        self.rsvps = {}
+        self.rollup = Counter()
+        self.clock = datetime(2025, 10, 1, 9, 0)
+
+    def add_event(self, event_id, capacity, counters=True):
+        self.events[event_id] = {"capacity": capacity, "clubID": 7}
+        if counters:
+            self.counters[event_id] = {"confirmedCount": 0, "waitlistCount": 0}
+
+    def tick(self):
+        self.clock += timedelta(minutes=1)
+        return self.clock
+
+    def statuses(self, event_id):
+        return Counter(r["status"] for r in self.rsvps.values() if r["eventID"] == event_id)
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+        self.lastrowid = None
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+    def executemany(self, query, rows):
+        for args in rows:
+            self.execute(query, args)
+
+    def execute(self, query, args=()):
+        db, q = self.db, " ".join(query.split())
+        self.rows = []
+        if q.startswith("SELECT capacity, clubID FROM Events"):
+            event = db.events.get(args[0])
+            self.rows = [dict(event)] if event else []
+        elif q.startswith("SELECT confirmedCount, waitlistCount FROM Event_RSVP_Counters"):
+            counters = db.counters.get(args[0])
+            self.rows = [dict(counters)] if counters else []
+        elif q.startswith("INSERT IGNORE INTO Event_RSVP_Counters (eventID, confirmedCount"):
+            statuses = db.statuses(args[1])
+            db.counters.setdefault(args[0], {"confirmedCount": statuses["confirmed"],
+                                             "waitlistCount": statuses["waitlisted"]})
+        elif q.startswith("INSERT IGNORE INTO Event_RSVP_Counters (eventID)"):
+            db.counters.setdefault(args[0], {"confirmedCount": 0, "waitlistCount": 0})
+        elif q.startswith("SELECT rsvpID, status FROM RSVPs WHERE studentID"):
+            self.rows = [{"rsvpID": i, "status": r["status"]} for i, r in db.rsvps.items()
+                         if (r["studentID"], r["eventID"]) == tuple(args)]
+        elif q.startswith("UPDATE RSVPs SET status = %s, timestamp = CURRENT_TIMESTAMP"):
+            db.rsvps[args[1]].update(status=args[0], timestamp=db.tick())
+        elif q.startswith("INSERT INTO RSVPs"):
+            self.lastrowid = max(db.rsvps, default=0) + 1
+            db.rsvps[self.lastrowid] = {"studentID": args[0], "eventID": args[1],
+                                        "status": args[2], "timestamp": db.tick()}
+        elif q.startswith("SELECT timestamp FROM RSVPs WHERE rsvpID"):
+            self.rows = [{"timestamp": db.rsvps[args[0]]["timestamp"]}]
+        elif q.startswith(("SELECT eventID FROM RSVPs", "SELECT status, timestamp FROM RSVPs")):
+            row = db.rsvps.get(args[0])
+            if row and row["studentID"] == args[1]:
+                self.rows = [dict(row)]
+        elif q.startswith("DELETE FROM RSVPs WHERE rsvpID"):
+            del db.rsvps[args[0]]
+        elif q.startswith("SELECT rsvpID, studentID FROM RSVPs WHERE eventID = %s AND status = 'waitlisted'"):
+            waiting = sorted((r["timestamp"], i, r["studentID"]) for i, r in db.rsvps.items()
+                             if r["eventID"] == args[0] and r["status"] == "waitlisted")
+            if len(args) > 1:
+                waiting = waiting[:args[1]]
+            self.rows = [{"rsvpID": i, "studentID": s} for _, i, s in waiting]
+        elif q.startswith("UPDATE RSVPs SET status = 'confirmed'"):
+            db.rsvps[args[0]]["status"] = "confirmed"
+        elif q.startswith("UPDATE Event_RSVP_Counters"):
+            counters = db.counters[args[2]]
+            counters["confirmedCount"] += args[0]
+            counters["waitlistCount"] += args[1]
+        elif q.startswith("INSERT INTO Rollup_Event_Daily"):
+            day, event_id, _, attendance, count = args
+            db.rollup[(day, event_id)] += count
+        elif q.startswith("INSERT INTO Rollup_Event_Hourly"):
+            pass
+        else:
+            raise AssertionError(f"unexpected query: {q}")
+
+
+def _setup(capacity, **kwargs):
+    db = FakeDB()
+    db.add_event(1, capacity, **kwargs)
+    return db, FakeCursor(db)
+
+
+def _assert_consistent(db, event_id=1):
+    statuses = db.statuses(event_id)
+    counters = db.counters[event_id]
+    assert (counters["confirmedCount"], counters["waitlistCount"]) == \
+        (statuses["confirmed"], statuses["waitlisted"])
+    capacity = db.events[event_id]["capacity"]
+    if capacity is not None:
+        assert statuses["confirmed"] <= capacity
+        assert not statuses["waitlisted"] or statuses["confirmed"] == capacity
+    # the rollup counts every RSVP that is not cancelled
+    assert sum(n for (_, e), n in db.rollup.items() if e == event_id) == \
+        statuses["confirmed"] + statuses["waitlisted"]
+
+
+def test_admit_confirms_until_full_then_waitlists():
+    db, cursor = _setup(capacity=2)
+    results = [rsvps.admit(cursor, student_id, 1) for student_id in (10, 11, 12, 13)]
+    assert [r["status"] for r in results] == ["confirmed", "confirmed", "waitlisted", "waitlisted"]
+    assert all(r["created"] for r in results)
+    _assert_consistent(db)
+
+
+def test_admit_returns_existing_rsvp_unchanged():
+    db, cursor = _setup(capacity=2)
+    first = rsvps.admit(cursor, 10, 1)
+    again = rsvps.admit(cursor, 10, 1)
+    assert again == {"rsvp_id": first["rsvp_id"], "status": "confirmed", "created": False}
+    _assert_consistent(db)
+
+
+def test_admit_unknown_event():
+    db, cursor = _setup(capacity=2)
+    assert rsvps.admit(cursor, 10, 99) is None
+
+
+def test_unlimited_capacity_confirms_everyone():
+    db, cursor = _setup(capacity=None)
+    assert {rsvps.admit(cursor, s, 1)["status"] for s in range(50)} == {"confirmed"}
+    _assert_consistent(db)
+
+
+def test_cancel_confirmed_promotes_oldest_waitlisted():
+    db, cursor = _setup(capacity=1)
+    seat = rsvps.admit(cursor, 10, 1)
+    first = rsvps.admit(cursor, 11, 1)
+    rsvps.admit(cursor, 12, 1)
+
+    result = rsvps.cancel(cursor, 10, seat["rsvp_id"])
+    assert result["status"] == "confirmed"
+    assert result["promoted"] == [{"rsvp_id": first["rsvp_id"], "student_id": 11}]
+    assert db.rsvps[first["rsvp_id"]]["status"] == "confirmed"
+    _assert_consistent(db)
+
+
+def test_cancel_waitlisted_promotes_nobody():
+    db, cursor = _setup(capacity=1)
+    rsvps.admit(cursor, 10, 1)
+    waiting = rsvps.admit(cursor, 11, 1)
+    result = rsvps.cancel(cursor, 11, waiting["rsvp_id"])
+    assert result["status"] == "waitlisted" and result["promoted"] == []
+    _assert_consistent(db)
+
+
+def test_cancel_someone_elses_rsvp():
+    db, cursor = _setup(capacity=1)
+    rsvp = rsvps.admit(cursor, 10, 1)
+    assert rsvps.cancel(cursor, 11, rsvp["rsvp_id"]) is None
+    assert rsvps.cancel(cursor, 10, rsvp["rsvp_id"] + 1) is None
+    _assert_consistent(db)
+
+
+def test_rollup_follows_readmission():
+    db, cursor = _setup(capacity=1)
+    rsvp = rsvps.admit(cursor, 10, 1)
+    rsvps.cancel(cursor, 10, rsvp["rsvp_id"])
+    assert sum(db.rollup.values()) == 0
+    rsvps.admit(cursor, 10, 1)
+    assert sum(db.rollup.values()) == 1
+    _assert_consistent(db)
+
+
+def test_counters_seeded_for_event_without_them():
+    db, cursor = _setup(capacity=2, counters=False)
+    db.rsvps[1] = {"studentID": 10, "eventID": 1, "status": "confirmed", "timestamp": db.tick()}
+    db.rollup[(db.clock.date(), 1)] += 1
+    assert rsvps.admit(cursor, 11, 1)["status"] == "confirmed"
+    assert rsvps.admit(cursor, 12, 1)["status"] == "waitlisted"
+    _assert_consistent(db)
+
+
+def test_random_admissions_and_cancellations_stay_consistent():
+    rng = random.Random(4)
+    db, cursor = _setup(capacity=5)
+    active = {}
+    for _ in range(300):
+        student_id = rng.randrange(20)
+        if student_id in active and rng.random() < 0.5:
+            rsvps.cancel(cursor, student_id, active.pop(student_id))
+        else:
+            active[student_id] = rsvps.admit(cursor, student_id, 1)["rsvp_id"]
+        _assert_consistent(db)
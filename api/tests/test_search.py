@@ -0,0 +1,202 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.events import search
+from backend.events.search import EventSearchIndex, edit_distance, terms
+
+WORDS = ("robot chess hackathon workshop career fair music jazz poetry film coding "
+         "design startup volunteer climbing yoga debate theater research finance").split()
+
+
+def _event(event_id, name, description="", keywords=(), club_id=1, club_type="academic",
+           start=datetime(2025, 11, 1, 18)):
+    return {
+        "eventID": event_id, "name": name, "description": description,
+        "searchDescription": None, "startDateTime": start, "endDateTime": None,
+        "location": None, "buildingName": None, "roomNumber": None, "capacity": None,
+        "club_name": f"club {club_id}", "clubID": club_id, "club_type": club_type,
+        "keywords": list(keywords),
+    }
+
+
+def _index(events):
+    index = EventSearchIndex()
+    for event in events:
+        index._put(event)
+    index._renormalize()
+    return index
+
+
+def _brute_force(index, query):
+    """BM25 from the per-document term weights, with the index's length normalizer."""
+    docs = {slot: weighted for slot, weighted in enumerate(index._doc_terms) if weighted is not None}
+    n = len(docs)
+    scores = {}
+    for term in set(terms(query)):
+        containing = [slot for slot, weighted in docs.items() if term in weighted]
+        idf = math.log(1 + (n - len(containing) + 0.5) / (len(containing) + 0.5))
+        for slot in containing:
+            tf = docs[slot][term]
+            length = sum(docs[slot].values())
+            norm = search.K1 * (1 - search.B + search.B * length / index._norm_avgdl)
+            scores[slot] = scores.get(slot, 0.0) + idf * tf * (search.K1 + 1) / (tf + norm)
+    return {index._docs[slot]["eventID"]: score for slot, score in scores.items()}
+
+
+def _random_events(rng, count, first_id=1):
+    return [_event(event_id,
+                   " ".join(rng.sample(WORDS, 2)),
+                   " ".join(rng.choice(WORDS) for _ in range(rng.randrange(0, 12))),
+                   rng.sample(WORDS, rng.randrange(0, 3)),
+                   club_id=rng.randrange(1, 5))
+            for event_id in range(first_id, first_id + count)]
+
+
+def _assert_matches_brute_force(index, queries):
+    for query in queries:
+        expected = _brute_force(index, query)
+        ranked, total, corrections = index.search(query, k=len(expected) + 5)
+        if total < search.FUZZY_MIN_HITS:
+            continue  # the fuzzy fallback may have widened the query
+        assert corrections == {}
+        assert total == len(expected)
+        got = {event["eventID"]: score for score, event in ranked}
+        assert got.keys() == expected.keys()
+        for event_id, score in got.items():
+            assert score == pytest.approx(expected[event_id])
+        scores = [score for score, _ in ranked]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_terms_drop_stopwords_and_fold_plurals():
+    assert terms("The Robotics Workshops of the Libraries") == ["robotic", "workshop", "library"]
+
+
+def test_name_outweighs_description():
+    index = _index([_event(1, "chess night"), _event(2, "games", "bring your chess set")])
+    ranked, total, _ = index.search("chess")
+    assert [event["eventID"] for _, event in ranked] == [1, 2]
+    assert total == 2
+
+
+def test_bm25_matches_brute_force():
+    rng = random.Random(1)
+    index = _index(_random_events(rng, 300))
+    _assert_matches_brute_force(index, [" ".join(rng.sample(WORDS, rng.randrange(1, 4))) for _ in range(50)])
+
+
+def test_incremental_put_and_remove_match_brute_force():
+    rng = random.Random(2)
+    index = _index(_random_events(rng, 200))
+    # replace, remove and add events without a full rebuild
+    for event in _random_events(rng, 50, first_id=1):
+        index._put(event)
+    for event_id in rng.sample(range(1, 201), 60):
+        index._remove(event_id)
+    for event in _random_events(rng, 40, first_id=1000):
+        index._put(event)
+    assert len(index) == 200 - 60 + 40
+    _assert_matches_brute_force(index, [" ".join(rng.sample(WORDS, rng.randrange(1, 4))) for _ in range(50)])
+
+
+def test_remove_drops_postings_and_reuses_slot():
+    index = _index([_event(1, "zeppelin talk"), _event(2, "chess night")])
+    slot = index._slots[1]
+    index._remove(1)
+    assert "zeppelin" not in index._postings
+    assert all("zeppelin" not in grams for grams in index._trigrams.values())
+    assert index.search("zeppelin")[1] == 0
+    index._put(_event(3, "jazz brunch"))
+    assert index._slots[3] == slot
+    assert [event["eventID"] for _, event in index.search("jazz")[0]] == [3]
+
+
+def test_put_replaces_an_events_terms():
+    index = _index([_event(1, "chess night")])
+    index._put(_event(1, "poetry night"))
+    assert index.search("chess")[1] == 0
+    assert index.search("poetry")[1] == 1
+    assert len(index) == 1
+
+
+def test_filters():
+    start = datetime(2025, 11, 1, 18)
+    index = _index([
+        _event(1, "chess night", club_id=1, club_type="games", start=start),
+        _event(2, "chess club", club_id=2, club_type="games", start=start + timedelta(days=7)),
+        _event(3, "chess clinic", club_id=2, club_type="academic", start=start + timedelta(days=14)),
+    ])
+
+    def ids(**filters):
+        return sorted(event["eventID"] for _, event in index.search("chess", **filters)[0])
+
+    assert ids(club_id=2) == [2, 3]
+    assert ids(club_type="games") == [1, 2]
+    assert ids(club_type="unknown") == []
+    assert ids(start_from=start + timedelta(days=1)) == [2, 3]
+    assert ids(start_to=start + timedelta(days=14)) == [1, 2]
+
+
+def test_top_k_keeps_the_best():
+    rng = random.Random(3)
+    index = _index(_random_events(rng, 400))
+    everything, total, _ = index.search("robot chess", k=1000)
+    top, top_total, _ = index.search("robot chess", k=10)
+    assert top_total == total
+    assert [score for score, _ in top] == pytest.approx([score for score, _ in everything[:10]])
+
+
+def test_fuzzy_fallback_corrects_a_typo():
+    index = _index([_event(1, "robotics workshop"), _event(2, "chess night")])
+    ranked, total, corrections = index.search("workshp")
+    assert corrections == {"workshp": ["workshop"]}
+    assert [event["eventID"] for _, event in ranked] == [1]
+    # corrected matches score below what an exact match would
+    assert ranked[0][0] < index.search("workshop")[0][0][0]
+    assert index.fuzzy_stats()["rescued_from_empty"] == 1
+
+
+def test_fuzzy_fallback_leaves_short_terms_and_enough_hits_alone():
+    index = _index([_event(i, "chess night") for i in range(1, 5)] + [_event(9, "jazz")])
+    assert index.search("jaz") == ([], 0, {})          # too short to correct
+    ranked, total, corrections = index.search("chess")
+    assert total == 4 and corrections == {}
+    assert index.fuzzy_stats()["fallbacks"] == 1
+
+
+def _osa_distance(a, b):
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def test_edit_distance_is_bounded_osa_distance():
+    rng = random.Random(5)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcd") for _ in range(rng.randrange(0, 7)))
+        b = "".join(rng.choice("abcd") for _ in range(rng.randrange(0, 7)))
+        limit = rng.randrange(0, 3)
+        assert edit_distance(a, b, limit) == min(_osa_distance(a, b), limit + 1)
+
+
+def test_corrections_find_every_term_within_the_edit_bound():
+    rng = random.Random(6)
+    index = _index(_random_events(rng, 200))
+    vocabulary = list(index._postings)
+    for term in ("workshpo", "hackaton", "climbng", "finanse", "reserch", "poetyr"):
+        limit = search.max_edits(term)
+        expected = sorted((_osa_distance(term, t), -len(index._postings[t]), t)
+                          for t in vocabulary if t != term and _osa_distance(term, t) <= limit)
+        assert index._corrections(term) == \
+            [(t, distance) for distance, _, t in expected[:search.FUZZY_EXPANSIONS]]
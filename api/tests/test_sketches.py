@@ -0,0 +1,126 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.analytics import sketches
+from backend.analytics.sketches import REGISTERS, RELATIVE_ERROR, estimate, register_of
+
+
+def _sketch(student_ids):
+    registers = np.zeros(REGISTERS, dtype=np.uint8)
+    for student_id in student_ids:
+        index, rank = register_of(student_id)
+        registers[index] = max(registers[index], rank)
+    return registers
+
+
+class FakeCursor:
+    """Activity_Sketches as a dict, for the queries add_checkins() and distinct_students() run."""
+
+    def __init__(self):
+        self.table = {}
+        self.rows = []
+
+    def fetchall(self):
+        return self.rows
+
+    def executemany(self, query, rows):
+        for args in rows:
+            self.execute(query, args)
+
+    def execute(self, query, args=()):
+        q = " ".join(query.split())
+        self.rows = []
+        if q.startswith("SELECT day, scope, scopeKey, sketch FROM Activity_Sketches"):
+            keys = [tuple(args[i:i + 3]) for i in range(0, len(args), 3)]
+            self.rows = [{"day": k[0], "scope": k[1], "scopeKey": k[2], "sketch": self.table[k]}
+                         for k in keys if k in self.table]
+        elif q.startswith("INSERT INTO Activity_Sketches") and q.endswith("sketch = sketch"):
+            self.table.setdefault(tuple(args[:3]), args[3])
+        elif q.startswith("INSERT INTO Activity_Sketches"):
+            self.table[tuple(args[:3])] = args[3]
+        elif q.startswith("SELECT scopeKey, sketch FROM Activity_Sketches"):
+            args = list(args)
+            scope, start = args.pop(0), args.pop(0)
+            end = args.pop(0) if "day < %s" in q else None
+            keys = set(args) if "scopeKey IN" in q else None
+            self.rows = [{"scopeKey": k, "sketch": sketch} for (day, s, k), sketch in self.table.items()
+                         if s == scope and day >= start and (end is None or day < end)
+                         and (keys is None or k in keys)]
+        else:
+            raise AssertionError(f"unexpected query: {q}")
+
+
+def test_empty_sketch_estimates_zero():
+    assert estimate(np.zeros(REGISTERS, dtype=np.uint8)) == 0
+
+
+def test_small_counts_are_close_to_exact():
+    for n in (1, 2, 10, 100, 1000):
+        assert abs(estimate(_sketch(range(n))) - n) <= max(1, 0.02 * n)
+
+
+def test_estimate_within_error_bound():
+    rng = random.Random(10)
+    for n in (20000, 60000, 250000):
+        student_ids = rng.sample(range(10 ** 9), n)
+        assert abs(estimate(_sketch(student_ids)) - n) / n < 3 * RELATIVE_ERROR
+
+
+def test_merging_sketches_estimates_the_union():
+    first, second = _sketch(range(0, 40000)), _sketch(range(20000, 60000))
+    assert abs(estimate(np.maximum(first, second)) - 60000) / 60000 < 3 * RELATIVE_ERROR
+
+
+def test_sixty_thousand_checkins_through_the_day_sketches():
+    rng = random.Random(11)
+    cursor = FakeCursor()
+    start = datetime(2025, 10, 1, 9)
+    majors = ["Computer Science", "computer  science ", "Biology", None, "  "]
+    students = {student_id: rng.choice(majors) for student_id in range(1, 20001)}
+    checkins = []
+    for _ in range(60000):
+        student_id = rng.randrange(1, 20001)
+        moment = start + timedelta(days=rng.randrange(7), minutes=rng.randrange(600))
+        checkins.append((moment, student_id, rng.randrange(1, 4), students[student_id]))
+    for i in range(0, len(checkins), sketches.BATCH_SIZE):
+        sketches.add_checkins(cursor, checkins[i:i + sketches.BATCH_SIZE])
+
+    # the overall sketch is written in ALL_SHARDS rows per day
+    assert {k for (_, scope, k) in cursor.table if scope == sketches.ALL} == \
+        {str(i) for i in range(sketches.ALL_SHARDS)}
+
+    def exact(select):
+        counts = {}
+        for moment, student_id, club_id, major in checkins:
+            key = select(club_id, major)
+            if key is not None:
+                counts.setdefault(key, set()).add(student_id)
+        return {key: len(ids) for key, ids in counts.items()}
+
+    cases = [
+        (sketches.ALL, exact(lambda club, major: "")),
+        (sketches.CLUB, exact(lambda club, major: str(club))),
+        (sketches.MAJOR, exact(lambda club, major: sketches.scope_key(sketches.MAJOR, major)
+                               if major and major.strip() else None)),
+    ]
+    for scope, expected in cases:
+        got = sketches.distinct_students(cursor, start, scope=scope)
+        assert got.keys() == expected.keys()
+        for key, count in expected.items():
+            assert abs(got[key] - count) / count < 3 * RELATIVE_ERROR
+
+    got = sketches.distinct_students(cursor, start, scope=sketches.MAJOR, keys=["COMPUTER SCIENCE"])
+    assert list(got) == ["computer science"]
+
+
+def test_add_checkins_skips_sketches_that_would_not_change():
+    cursor = FakeCursor()
+    moment = datetime(2025, 10, 1, 9)
+    sketches.add_checkins(cursor, [(moment, 1, 5, "Biology")])
+    before = dict(cursor.table)
+    writes = []
+    cursor.executemany = lambda query, rows: writes.append(rows)
+    sketches.add_checkins(cursor, [(moment, 1, 5, "biology"), (None, 2, 5, None)])
+    assert writes == [] and cursor.table == before
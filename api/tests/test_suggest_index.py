@@ -0,0 +1,89 @@
+import math
+import random
+
+from backend.suggest import index as suggest
+from backend.suggest.index import SuggestIndex, normalize
+
+SYLLABLES = ("ha", "hu", "sky", "ro", "bo", "chess", "jazz", "co", "de", "film", "art", "run")
+
+
+class FakeCursor:
+    """Answers the events, clubs and keywords queries load() runs, in that order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.rows = []
+
+    def execute(self, query, args=()):
+        self.rows = self.results.pop(0)
+
+    def fetchall(self):
+        return self.rows
+
+
+def _label(rng):
+    return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randrange(1, 3)))
+                    for _ in range(rng.randrange(1, 4)))
+
+
+def _rows(rng, count):
+    return [{"id": i, "label": _label(rng), "popularity": rng.randrange(0, 500)} for i in range(count)]
+
+
+def _brute_force(results, prefix, kinds, limit):
+    """Rank every matching entry by popularity scaled within its kind, ties by load order."""
+    prefix = normalize(prefix)
+    candidates, number = [], 0
+    for kind, rows in zip(suggest.KINDS, results):
+        top = max((row["popularity"] for row in rows), default=0)
+        for row in rows:
+            if not row["label"]:
+                continue
+            words = normalize(row["label"]).split(" ")
+            if kind in kinds and any(" ".join(words[i:]).startswith(prefix) for i in range(len(words))):
+                score = math.log1p(row["popularity"]) / math.log1p(top) if top else 0.0
+                candidates.append((-score, number, kind, row["id"]))
+            number += 1
+    return [(kind, entry_id) for _, _, kind, entry_id in sorted(candidates)[:min(limit, suggest.TOP_K)]]
+
+
+def _load(results):
+    index = SuggestIndex()
+    index.load(FakeCursor(*results))
+    return index
+
+
+def test_word_starts():
+    index = _load([[{"id": 1, "label": "Husky  Hackers Night", "popularity": 3}], [], []])
+    for prefix in ("hus", "HACK", "night", "hackers ni"):
+        assert [s["id"] for s in index.suggest(prefix)] == [1]
+    assert index.suggest("ackers") == []
+    assert index.suggest("   ") == []
+
+
+def test_suggest_matches_brute_force():
+    rng = random.Random(9)
+    results = [_rows(rng, 400), _rows(rng, 150), _rows(rng, 600)]
+    results[1].append({"id": 999, "label": None, "popularity": 10})
+    index = _load(results)
+    # short prefixes match far more than SCAN_LIMIT keys and are answered from the hot table
+    assert index.stats()["hot_prefixes"] > 0
+    prefixes = ["h", "c", "ha", "chess", "jazz f", "skyro", "zz", "fil"] + \
+        [normalize(_label(rng))[:rng.randrange(1, 6)] for _ in range(100)]
+    for prefix in prefixes:
+        for kinds in (suggest.KINDS, ("club",), ("event", "keyword")):
+            for limit in (1, 10, 50):
+                got = [(s["kind"], s["id"]) for s in index.suggest(prefix, kinds, limit)]
+                assert got == _brute_force(results, prefix, kinds, limit), (prefix, kinds, limit)
+
+
+def test_popularity_is_scaled_within_each_kind():
+    index = _load([
+        [{"id": 1, "label": "chess night", "popularity": 5}],
+        [{"id": 2, "label": "chess club", "popularity": 5000},
+         {"id": 3, "label": "chess masters", "popularity": 40}],
+        [],
+    ])
+    # the event is the most popular of the events, so it ties with the biggest club
+    assert [(s["kind"], s["id"]) for s in index.suggest("chess")] == \
+        [("event", 1), ("club", 2), ("club", 3)]
@@ -12,8 +12,11 @@ logger = logging.getLogger(__name__)
 # import the main streamlit library as well
 # as SideBarLinks function from src/modules folder
 import streamlit as st
+import requests
 from modules.nav import SideBarLinks
 
+API_BASE_URL = "http://web-api:4000"
+
 # Page config
 st.set_page_config(
     page_title="ClubHub",
@@ -56,6 +59,15 @@ st.write('#### HI! As which user would you like to log in?')
 # functionality, we put a button on the screen that the user 
 # can click to MIMIC logging in as that mock user. 
 
+def record_login(role, user_id=None):
+    """Best-effort audit of the persona login; never blocks entering the app."""
+    try:
+        requests.post(f"{API_BASE_URL}/audit/events",
+                      json={"action_type": "login", "user_id": user_id, "details": role},
+                      timeout=2)
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Could not record login: {e}")
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
@@ -71,6 +83,7 @@ with col1:
     if st.button("Enter as Ruth", use_container_width=True):
         st.session_state['authenticated'] = True
         st.session_state['role'] = 'student'
+        record_login('student', user_id=10000001)
         st.session_state['first_name'] = 'Ruth'
         logger.info("Logging in as Student Persona")
         st.switch_page("pages/1_Ruth_Event_Discovery.py")
@@ -88,6 +101,7 @@ with col2:
     if st.button("Enter as Sofia", use_container_width=True):
         st.session_state['authenticated'] = True
         st.session_state['role'] = 'event_coordinator'
+        record_login('event_coordinator')
         st.session_state['first_name'] = 'Sofia'
         logger.info("Logging in as Event Coordinator Persona")
         st.switch_page("pages/6_Sofia_My_Events.py")
@@ -106,6 +120,7 @@ with col3:
     if st.button("Enter as David", use_container_width=True):
         st.session_state['authenticated'] = True
         st.session_state['role'] = 'administrator'
+        record_login('administrator')
         st.session_state['first_name'] = 'David'
         logger.info("Logging in as System Administrator Persona")
         st.switch_page("pages/20_Admin_Home.py")
@@ -123,6 +138,7 @@ with col4:
     if st.button("Enter as Marcus", use_container_width=True):
         st.session_state['authenticated'] = True
         st.session_state['role'] = 'data_analyst'
+        record_login('data_analyst')
         st.session_state['first_name'] = 'Marcus'
         logger.info("Logging in as Data Analyst Persona")
         st.switch_page("pages/41_Engagement_Overview.py")
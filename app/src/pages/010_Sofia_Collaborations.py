@@ -29,11 +29,11 @@ st.title("🤝 Collaboration Opportunities")
 st.markdown("Discover clubs that host similar events for cross-promotion and partnerships")
 st.divider()
 
-# Fetch similar clubs
-@st.cache_data(ttl=300)
-def fetch_similar_clubs(club_id):
+# Fetch similar clubs (the API serves a precomputed neighbour list, so no caching here)
+def fetch_similar_clubs(club_id, limit=20):
     try:
-        response = requests.get(f"{API_BASE_URL}/clubs/{club_id}/similar", timeout=5)
+        response = requests.get(f"{API_BASE_URL}/clubs/{club_id}/similar",
+                                params={"limit": limit}, timeout=5)
         if response.status_code == 200:
             return response.json()
         else:
@@ -43,7 +43,6 @@ def fetch_similar_clubs(club_id):
         return []
 
 # Fetch own club info
-@st.cache_data(ttl=300)
 def fetch_club_info(club_id):
     try:
         response = requests.get(f"{API_BASE_URL}/clubs/{club_id}", timeout=5)
@@ -166,6 +165,7 @@ else:
     
     with col_filter2:
         sort_options = {
+            'Most Similar': 'similarity',
             'Most Events': 'total_events',
             'Highest Attendance': 'avg_attendance',
             'Alphabetical': 'club_name'
@@ -217,6 +217,7 @@ else:
                 total_events = int(club.get('total_events', 0))
                 avg_att = club.get('avg_attendance', 0)
                 
+                st.metric("Similarity", f"{club.get('similarity', 0):.0%}")
                 st.metric("Total Events", total_events)
                 st.metric("Avg Attendance", f"{avg_att:.0f}")
                 
@@ -259,7 +260,6 @@ col_action1, col_action2, col_action3 = st.columns([1, 1, 2])
 
 with col_action1:
     if st.button("🔄 Refresh Data", use_container_width=True):
-        st.cache_data.clear()
         st.rerun()
 
 with col_action2:
@@ -275,4 +275,4 @@ with col_action2:
 
 # Footer
 st.divider()
-st.markdown("*Similar clubs are identified based on shared categories and event types. Clubs with 5+ events are prioritized.*")
\ No newline at end of file
+st.markdown("*Similar clubs are ranked by shared categories, event keywords and types, overlapping members and attendance patterns.*")
\ No newline at end of file
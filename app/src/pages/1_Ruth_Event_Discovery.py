@@ -1,6 +1,6 @@
 import streamlit as st
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Page config
 st.set_page_config(
@@ -16,6 +16,9 @@ if 'clear_trigger' not in st.session_state:
 # API Base URL
 API_BASE_URL = "http://web-api:4000"
 
+# Events fetched per "Load more"
+PAGE_SIZE = 20
+
 # Sidebar navigation
 st.sidebar.title("🎒 Ruth's Pages")
 st.sidebar.markdown("**Current:** Event Discovery")
@@ -32,7 +35,19 @@ st.markdown("Find events happening on campus")
 st.divider()
 
 # Search bar
-search_query = st.text_input("🔍 Search events by name...", placeholder="Type to search...")
+search_query = st.text_input("🔍 Search events by name, description, keyword or club...", placeholder="Type to search...")
+
+# Clubs whose name matches the typed prefix, for the club filter
+@st.cache_data(ttl=60)
+def fetch_club_suggestions(prefix):
+    try:
+        response = requests.get(f"{API_BASE_URL}/suggest",
+                                params={"prefix": prefix, "kinds": "club", "limit": 10}, timeout=5)
+        if response.status_code == 200:
+            return response.json()
+        return []
+    except Exception:
+        return []
 
 # Filter row
 col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
@@ -46,9 +61,10 @@ with col2:
                             key=f"type_{st.session_state.clear_trigger}")
 
 with col3:
-    club_filter = st.selectbox("🎯 Club", ["All Clubs", "Husky Hackers", "Dance Collective", "Investment Club", 
-                                    "Environmental Action Group", "Debate Society", "Soccer League", 
-                                    "Photography Club", "Pre-Med Society", "ISA", "Robotics Team"],
+    club_prefix = st.text_input("🎯 Club", placeholder="Start typing a club...",
+                            key=f"club_prefix_{st.session_state.clear_trigger}")
+    club_ids = {c['label']: c['id'] for c in fetch_club_suggestions(club_prefix.strip())} if club_prefix.strip() else {}
+    club_filter = st.selectbox("Matching clubs", ["All Clubs"] + list(club_ids), label_visibility="collapsed",
                             key=f"club_{st.session_state.clear_trigger}")
 
 with col4:
@@ -73,63 +89,75 @@ def create_rsvp(event_id, event_name):
     except:
         return False
 
-# Fetch events from API
+# Count a click on a search result for the search analytics
+def record_search_click(event_id):
+    try:
+        requests.post(f"{API_BASE_URL}/events/search/clicks", json={"event_id": event_id, "student_id": STUDENT_ID}, timeout=2)
+    except Exception:
+        pass
+
+# Build the filter params; the API does the filtering
+filters = {}
+if search_query:
+    filters['q'] = search_query
+if date_filter != "All Dates":
+    days_ahead = {"Today": 1, "This Week": 8, "This Month": 31}[date_filter]
+    window_end = datetime.combine(datetime.now().date() + timedelta(days=days_ahead), datetime.min.time())
+    filters['to'] = window_end.isoformat()
+if type_filter != "All Types":
+    filters['club_type'] = type_filter
+if club_filter != "All Clubs":
+    filters['club_id'] = club_ids[club_filter]
+
+# Fetch one page of events from the API; a search query is ranked by relevance
 @st.cache_data(ttl=60)  # Cache for 60 seconds
-def fetch_events():
+def fetch_events_page(filter_items, after=None):
+    params = dict(filter_items)
+    params['limit'] = PAGE_SIZE
+    if after:
+        params['after'] = after
+    endpoint = "/events/search" if 'q' in params else "/events"
+    if 'q' in params:
+        params['student_id'] = STUDENT_ID
     try:
-        response = requests.get(f"{API_BASE_URL}/events", timeout=5)
+        response = requests.get(f"{API_BASE_URL}{endpoint}", params=params, timeout=5)
         if response.status_code == 200:
             return response.json()
         else:
-            return []
+            return {"events": [], "next_cursor": None}
     except Exception as e:
         st.error(f"Could not connect to API: {e}")
-        return []
-
-# Get events
-events = fetch_events()
-
-# Apply all filters
-filtered_events = events.copy()
-
-# Search filter
-if search_query:
-    filtered_events = [e for e in filtered_events if search_query.lower() in e.get('name', '').lower()]
-
-# Date filter
-if date_filter != "All Dates":
-    today = datetime.now().date()
-    temp_events = []
-    for event in filtered_events:
-        try:
-            # Handle both string and datetime objects
-            dt_str = str(event.get('startDateTime'))
-            if 'GMT' in dt_str:
-                # Remove timezone info if present
-                dt_str = dt_str.split(' GMT')[0]
-            event_date = datetime.strptime(dt_str, "%a, %d %b %Y %H:%M:%S").date()
-            days_diff = (event_date - today).days
-            
-            if date_filter == "Today" and days_diff == 0:
-                temp_events.append(event)
-            elif date_filter == "This Week" and 0 <= days_diff <= 7:
-                temp_events.append(event)
-            elif date_filter == "This Month" and 0 <= days_diff <= 30:
-                temp_events.append(event)
-        except:
-            pass
-    filtered_events = temp_events
-
-# Club filter
-if club_filter != "All Clubs":
-    filtered_events = [e for e in filtered_events if club_filter.lower() in e.get('club_name', '').lower()]
-
-# Type filter
-if type_filter != "All Types":
-    filtered_events = [e for e in filtered_events if e.get('club_type', '') == type_filter]
+        return {"events": [], "next_cursor": None}
 
-# Use filtered_events instead of events from here on
-events = filtered_events
+# Fetch the full event (with the complete description) for the details panel
+@st.cache_data(ttl=60)
+def fetch_event_details(event_id):
+    try:
+        response = requests.get(f"{API_BASE_URL}/events/{event_id}", timeout=5)
+        if response.status_code == 200:
+            return response.json()
+        return {}
+    except Exception:
+        return {}
+
+# Pages loaded so far for the current filters; reset when filters change
+filter_items = tuple(sorted(filters.items()))
+if st.session_state.get('event_filters') != filter_items:
+    st.session_state.event_filters = filter_items
+    st.session_state.event_cursors = [None]
+
+events = []
+next_cursor = None
+corrections = {}
+for after in st.session_state.event_cursors:
+    page = fetch_events_page(filter_items, after)
+    events.extend(page.get('events', []))
+    next_cursor = page.get('next_cursor')
+    corrections = page.get('corrections') or corrections
+
+if corrections:
+    similar = ", ".join(sorted({word for words in corrections.values() for word in words}))
+    st.caption(f"No exact matches for some words, so results also include: {similar}")
 
 # Display events in grid
 if not events:
@@ -181,18 +209,26 @@ else:
                 with col_b:
                     if st.button("Details →", key=f"details_{event.get('eventID')}", use_container_width=True):
                         st.session_state[f'show_details_{event.get("eventID")}'] = True
+                        if search_query:
+                            record_search_click(event.get('eventID'))
                         st.rerun()
 
                     # Show details if toggled
                     if st.session_state.get(f'show_details_{event.get("eventID")}', False):
+                        details = fetch_event_details(event.get('eventID')) or event
                         with st.expander("📋 Full Details", expanded=True):
-                            st.markdown(f"**Description:** {event.get('description', 'No description')}")
+                            st.markdown(f"**Description:** {details.get('description', 'No description')}")
                             st.markdown(f"**Building:** {event.get('buildingName', 'N/A')}")
                             st.markdown(f"**Room:** {event.get('roomNumber', 'N/A')}")
                             if st.button("Close", key=f"close_{event.get('eventID')}"):
                                 st.session_state[f'show_details_{event.get("eventID")}'] = False
                                 st.rerun()
 
+    if next_cursor:
+        if st.button("Load more events", use_container_width=True):
+            st.session_state.event_cursors.append(next_cursor)
+            st.rerun()
+
 # Footer
 st.divider()
 st.markdown("*Events are updated in real-time from the ClubHub database*")
\ No newline at end of file
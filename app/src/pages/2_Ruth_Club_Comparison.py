@@ -27,11 +27,15 @@ st.title("⚖️ Club Comparison")
 st.markdown("Try comparing your clubs side-by-side to find the best fit 🧐")
 st.divider()
 
-# Fetch all clubs
+# Club names matching what the user typed, from the typeahead API
 @st.cache_data(ttl=60)
-def fetch_all_clubs():
+def fetch_club_suggestions(prefix):
     try:
-        response = requests.get(f"{API_BASE_URL}/clubs/clubs", timeout=5)
+        response = requests.get(
+            f"{API_BASE_URL}/suggest",
+            params={"prefix": prefix, "kinds": "club", "limit": 10},
+            timeout=5
+        )
         if response.status_code == 200:
             return response.json()
         else:
@@ -53,96 +57,99 @@ def fetch_club_comparison(club_ids):
         st.error(f"Could not fetch comparison: {e}")
         return []
 
-# Get all clubs
-all_clubs = fetch_all_clubs()
+# Clubs picked so far stay selected while the user searches for more
+if 'compare_clubs' not in st.session_state:
+    st.session_state.compare_clubs = {}
 
-if not all_clubs:
-    st.warning("No clubs available. Check your database connection.")
+st.markdown("### Select Clubs to Compare (2-4 clubs)")
+club_prefix = st.text_input("Find a club:", placeholder="Start typing a club name...")
+suggestions = fetch_club_suggestions(club_prefix.strip()) if club_prefix.strip() else []
+if club_prefix.strip() and not suggestions:
+    st.caption("No clubs match that name")
+
+# Create a mapping of club names to IDs
+club_options = {**st.session_state.compare_clubs, **{s['label']: s['id'] for s in suggestions}}
+
+# Multi-select for clubs
+selected_club_names = st.multiselect(
+    "Choose clubs:",
+    options=list(club_options.keys()),
+    default=list(st.session_state.compare_clubs),
+    max_selections=4,
+    help="Select 2-4 clubs to compare"
+)
+st.session_state.compare_clubs = {name: club_options[name] for name in selected_club_names}
+
+# Compare button
+if len(selected_club_names) < 2:
+    st.info("👆 Select at least 2 clubs to compare")
 else:
-    # Create club selection
-    st.markdown("### Select Clubs to Compare (2-4 clubs)")
-    
-    # Create a mapping of club names to IDs
-    club_options = {club['club_name']: club['club_id'] for club in all_clubs}
-    
-    # Multi-select for clubs
-    selected_club_names = st.multiselect(
-        "Choose clubs:",
-        options=list(club_options.keys()),
-        max_selections=4,
-        help="Select 2-4 clubs to compare"
-    )
-    
-    # Compare button
-    if len(selected_club_names) < 2:
-        st.info("👆 Select at least 2 clubs to compare")
-    else:
-        if st.button("Compare Selected Clubs", type="primary", use_container_width=True):
-            # Get club IDs for selected clubs
-            selected_club_ids = [club_options[name] for name in selected_club_names]
+    if st.button("Compare Selected Clubs", type="primary", use_container_width=True):
+        # Get club IDs for selected clubs
+        selected_club_ids = [club_options[name] for name in selected_club_names]
+        
+        # Fetch comparison data
+        comparison_data = fetch_club_comparison(selected_club_ids)
+        
+        if comparison_data:
+            st.divider()
+            st.markdown("### 📊 Comparison Results")
+            
+            # Create comparison table
+            comparison_df = pd.DataFrame(comparison_data)
+            
+            # Rename columns for display
+            column_names = {
+                'club_name': 'Club Name',
+                'curriculum': 'Curator',
+                'budget': 'Budget ($)',
+                'number_of_members': 'Members',
+                'benefits': 'Benefits',
+                'competitiveness_level': 'Competitiveness'
+            }
+            
+            comparison_df = comparison_df.rename(columns=column_names)
+            
+            # Display as table
+            st.dataframe(
+                comparison_df,
+                use_container_width=True,
+                hide_index=True
+            )
             
-            # Fetch comparison data
-            comparison_data = fetch_club_comparison(selected_club_ids)
+            # Visual comparison charts
+            st.divider()
+            st.markdown("### 📈 Visual Comparison")
             
-            if comparison_data:
-                st.divider()
-                st.markdown("### 📊 Comparison Results")
-                
-                # Create comparison table
-                comparison_df = pd.DataFrame(comparison_data)
-                
-                # Rename columns for display
-                column_names = {
-                    'club_name': 'Club Name',
-                    'curriculum': 'Curator',
-                    'budget': 'Budget ($)',
-                    'number_of_members': 'Members',
-                    'benefits': 'Benefits',
-                    'competitiveness_level': 'Competitiveness'
-                }
-                
-                comparison_df = comparison_df.rename(columns=column_names)
-                
-                # Display as table
-                st.dataframe(
-                    comparison_df,
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                # Visual comparison charts
-                st.divider()
-                st.markdown("### 📈 Visual Comparison")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("**Budget Comparison**")
-                    budget_chart = comparison_df[['Club Name', 'Budget ($)']].sort_values('Budget ($)', ascending=False).set_index('Club Name')
-                    st.bar_chart(budget_chart, height=500, use_container_width=True)
-                
-                with col2:
-                    st.markdown("**Member Count Comparison**")
-                    members_chart = comparison_df[['Club Name', 'Members']].set_index('Club Name')
-                    st.bar_chart(members_chart)
-                
-                # Highlight best/worst
-                st.divider()
-                st.markdown("### 💡 Quick Insights")
-                
-                col_a, col_b = st.columns(2)
-                
-                with col_a:
-                    # Largest club
-                    max_members = comparison_df.loc[comparison_df['Members'].idxmax()]
-                    st.success(f"🏆 **Largest:** {max_members['Club Name']} ({max_members['Members']} members)")
-                
-                with col_b:
-                    # Highest budget
-                    max_budget = comparison_df.loc[comparison_df['Budget ($)'].idxmax()]
-                    st.info(f"💰 **Highest Budget:** {max_budget['Club Name']} (${max_budget['Budget ($)']})")
-            else:
-                st.error("Could not load comparison data. Please try again.")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("**Budget Comparison**")
+                budget_chart = comparison_df[['Club Name', 'Budget ($)']].sort_values('Budget ($)', ascending=False).set_index('Club Name')
+                st.bar_chart(budget_chart, height=500, use_container_width=True)
+            
+            with col2:
+                st.markdown("**Member Count Comparison**")
+                members_chart = comparison_df[['Club Name', 'Members']].set_index('Club Name')
+                st.bar_chart(members_chart)
+            
+            # Highlight best/worst
+            st.divider()
+            st.markdown("### 💡 Quick Insights")
+            
+            col_a, col_b = st.columns(2)
+            
+            with col_a:
+                # Largest club
+                max_members = comparison_df.loc[comparison_df['Members'].idxmax()]
+                st.success(f"🏆 **Largest:** {max_members['Club Name']} ({max_members['Members']} members)")
+            
+            with col_b:
+                # Highest budget
+                max_budget = comparison_df.loc[comparison_df['Budget ($)'].idxmax()]
+                st.info(f"💰 **Highest Budget:** {max_budget['Club Name']} (${max_budget['Budget ($)']})")
+        else:
+            st.error("Could not load comparison data. Please try again.")
 
 # Footer
 st.divider()
@@ -30,81 +30,44 @@ events_by_month_df = pd.DataFrame()
 top_clubs_df = pd.DataFrame()
 
 try:
-    response = requests.get(f"{API_URL}/current-metrics")
+    # One request returns every dashboard section
+    response = requests.get(f"{API_URL}/overview")
     if response.status_code == 200:
-        current_metrics = response.json()
+        overview = response.json()
+
+        current_metrics = overview.get("current_metrics") or {}
         events = current_metrics.get("total_events", 0)
         rsvps = current_metrics.get("total_rsvps", 0)
         checkins = current_metrics.get("total_checkins", 0)
         active_users = current_metrics.get("active_users", 0)
-    else:
-        st.error("Failed to fetch current period metrics.")
-        current_metrics = {}
-except requests.exceptions.RequestException as e:
-    st.error(f"Error fetching current period metrics: {e}")
-    current_metrics = {}
 
-
-try:
-    response = requests.get(f"{API_URL}/previous-metrics")
-    if response.status_code == 200:
-        previous_metrics = response.json()
+        previous_metrics = overview.get("previous_metrics") or {}
         past_events = previous_metrics.get("total_events", 0)
         past_rsvps = previous_metrics.get("total_rsvps", 0)
         past_checkins = previous_metrics.get("total_checkins", 0)
         past_active_users = previous_metrics.get("active_users", 0)
-    else:
-        st.error(f"Failed to fetch previous metrics. Status: {response.status_code}")
-        previous_metrics = {}
-except requests.exceptions.RequestException as e:
-    st.error(f"Error fetching previous metrics: {e}")
-    previous_metrics = {}
 
-try:
-    response = requests.get(f"{API_URL}/events-by-month")
-    if response.status_code == 200:
-        events_by_month_data = response.json()
+        events_by_month_data = overview.get("events_by_month") or []
         if events_by_month_data:
-            # Store as DataFrame
             events_by_month_df = pd.DataFrame(events_by_month_data)
         else:
             st.info("No event data available")
-    else:
-        st.error("Failed to fetch events by month.")
-        events_by_month_data = {}
-except requests.exceptions.RequestException as e:
-    st.error(f"Error fetching events by month: {e}")
-    events_by_month_data = {}
 
-try:
-    response = requests.get(f'{API_URL}/top-clubs')
-    if response.status_code == 200:
-        top_clubs_data = response.json()
+        top_clubs_data = overview.get("top_clubs") or []
         if top_clubs_data:
             top_clubs_df = pd.DataFrame(top_clubs_data)
         else:
             st.info("No top clubs data available")
-    else:
-        st.error("Failed to fetch top clubs data.")
-        top_clubs_data = {}
-except requests.exceptions.RequestException as e:
-    st.error(f"Error fetching top clubs data: {e}")
-    top_clubs_data = {}
 
-try:
-    response = requests.get(f'{API_URL}/engagement-rate')
-    if response.status_code == 200:
-        engagement_rate = response.json()
+        engagement_rate = overview.get("engagement_rate") or {}
         if engagement_rate:
-            engagement = engagement_rate.get("engagement_rate", 0)
+            engagement = engagement_rate.get("engagement_rate") or 0
         else:
             st.info("No engagement trends data available")
     else:
-        st.error("Failed to fetch engagement trends data.")
-        engagement_trends_data = {}
+        st.error(f"Failed to fetch engagement overview. Status: {response.status_code}")
 except requests.exceptions.RequestException as e:
-    st.error(f"Error fetching engagement trends data: {e}")
-    engagement_trends_data = {}
+    st.error(f"Error fetching engagement overview: {e}")
 
 if past_events == 0:
     past_events = 1
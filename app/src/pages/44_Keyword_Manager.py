@@ -24,9 +24,16 @@ API_URL = "http://web-api:4000/events"
 
 df = pd.DataFrame()
 try:
-    response = requests.get(API_URL)
-    response.raise_for_status()
-    data = response.json()
+    # GET /events is paginated; follow next_cursor until the last page
+    data, params = [], {"limit": 100}
+    while True:
+        response = requests.get(API_URL, params=params)
+        response.raise_for_status()
+        page = response.json()
+        data.extend(page.get("events", []))
+        if not page.get("next_cursor"):
+            break
+        params["after"] = page["next_cursor"]
     df = pd.DataFrame(data)
 except requests.exceptions.RequestException as e:
     st.error(f"Error fetching data: {e}")
@@ -39,9 +46,14 @@ if not df.empty:
     selected_event = st.selectbox("Select Event to View Keywords", events)
     event_id = df[df['name'] == selected_event]['eventID'].values[0]
     
+    window = st.radio("Search counts over", ["All time", "Last 90 days", "Last 30 days", "Last 7 days"],
+                      horizontal=True)
+    window_days = {"All time": None, "Last 90 days": 90, "Last 30 days": 30, "Last 7 days": 7}[window]
+
     keywords_df = pd.DataFrame()
     try:
-        response = requests.get(f"{API_URL}/{event_id}/keywords")
+        response = requests.get(f"{API_URL}/{event_id}/keywords",
+                                params={"days": window_days} if window_days else None)
         response.raise_for_status()
         keywords_data = response.json()
         keywords_df = pd.DataFrame(keywords_data)
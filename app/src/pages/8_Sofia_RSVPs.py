@@ -55,7 +55,7 @@ def fetch_event_rsvps(event_id):
     except Exception as e:
         return []
 
-# Check in student
+# Check in student: "ok", "retry" (API unreachable or 5xx), or the error from a 4xx
 def check_in_student(event_id, student_id):
     try:
         response = requests.post(
@@ -66,9 +66,61 @@ def check_in_student(event_id, student_id):
             },
             timeout=5
         )
-        return response.status_code == 201
-    except:
-        return False
+    except requests.exceptions.RequestException:
+        return "retry"
+    # 200 = already checked in (e.g. scanned twice)
+    if response.status_code in (200, 201):
+        return "ok"
+    if response.status_code >= 500:
+        return "retry"
+    # a 4xx (unknown student or event) will fail again if retried
+    try:
+        return response.json().get("error", f"HTTP {response.status_code}")
+    except ValueError:
+        return f"HTTP {response.status_code}"
+
+# Offline-tolerant check-in queue: scans are stamped and kept in the
+# session, then sent in batches. Anything that fails to send stays
+# queued for the next sync, and re-sending is harmless because the
+# batch endpoint treats repeat scans as duplicates.
+SYNC_BATCH_SIZE = 20
+
+if "checkin_queue" not in st.session_state:
+    st.session_state["checkin_queue"] = []
+
+def queue_check_in(event_id, student_id):
+    st.session_state["checkin_queue"].append({
+        "event_id": event_id,
+        "student_id": student_id,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    })
+
+def sync_check_ins():
+    """Send queued scans per event; returns (sent, still queued). Rejected batches are dropped."""
+    pending = st.session_state["checkin_queue"]
+    remaining = []
+    sent = 0
+    by_event = {}
+    for scan in pending:
+        by_event.setdefault(scan["event_id"], []).append(scan)
+    for event_id, scans in by_event.items():
+        try:
+            response = requests.post(
+                f"{API_BASE_URL}/events/{event_id}/attendance/batch",
+                json={"check_ins": [{"student_id": s["student_id"], "timestamp": s["timestamp"]}
+                                    for s in scans]},
+                timeout=5
+            )
+        except requests.exceptions.RequestException:
+            remaining.extend(scans)
+            continue
+        if response.status_code == 200:
+            sent += len(scans)
+        elif response.status_code >= 500:
+            remaining.extend(scans)
+        # a 4xx (e.g. the event was deleted) would fail on every retry: drop it
+    st.session_state["checkin_queue"] = remaining
+    return sent, len(remaining)
 
 # Get events
 events_data = fetch_events_with_rsvps(CLUB_ID)
@@ -148,6 +200,28 @@ else:
             
             # Detailed RSVP list
             st.markdown("### 📋 RSVP List")
+
+            queue_mode = st.toggle(
+                "📶 Queue check-ins (offline-tolerant)",
+                key="checkin_queue_mode",
+                help="Check-ins are saved locally and sent in batches; "
+                     "use this at the door when the connection is unreliable."
+            )
+            queued = st.session_state["checkin_queue"]
+            if queue_mode or queued:
+                col_q1, col_q2 = st.columns([3, 1])
+                with col_q1:
+                    st.caption(f"⏳ {len(queued)} check-in(s) waiting to sync")
+                with col_q2:
+                    if st.button("Sync now", disabled=not queued, use_container_width=True):
+                        sent, left = sync_check_ins()
+                        if sent:
+                            st.cache_data.clear()
+                        if left:
+                            st.warning(f"Synced {sent}; {left} still queued (API unreachable?)")
+                        else:
+                            st.success(f"Synced {sent} check-in(s)")
+            queued_ids = {(q["event_id"], q["student_id"]) for q in queued}
             
             rsvps = fetch_event_rsvps(selected_event_id)
             
@@ -187,16 +261,30 @@ else:
                                     checked_in = rsvp.get('checked_in', False)
                                     if checked_in:
                                         st.success("✅ Checked In")
+                                    elif (selected_event_id, student_id) in queued_ids:
+                                        st.info("⏳ Check-in queued")
                                 
                                 with col_c:
-                                    if not checked_in:
+                                    if not checked_in and (selected_event_id, student_id) not in queued_ids:
                                         if st.button("Check In", key=f"checkin_{student_id}", use_container_width=True):
-                                            if check_in_student(selected_event_id, student_id):
-                                                st.success("Checked in!")
-                                                st.cache_data.clear()
+                                            if queue_mode:
+                                                queue_check_in(selected_event_id, student_id)
+                                                if len(st.session_state["checkin_queue"]) >= SYNC_BATCH_SIZE:
+                                                    sync_check_ins()
+                                                    st.cache_data.clear()
                                                 st.rerun()
                                             else:
-                                                st.error("Check-in failed")
+                                                outcome = check_in_student(selected_event_id, student_id)
+                                                if outcome == "ok":
+                                                    st.success("Checked in!")
+                                                    st.cache_data.clear()
+                                                    st.rerun()
+                                                elif outcome == "retry":
+                                                    # API unreachable: keep the scan instead of losing it
+                                                    queue_check_in(selected_event_id, student_id)
+                                                    st.warning("Check-in failed; queued for the next sync")
+                                                else:
+                                                    st.error(f"Check-in rejected: {outcome}")
                 
                 with tab2:
                     waitlist_rsvps = [r for r in rsvps if r.get('status') == 'waitlisted']
@@ -0,0 +1,56 @@
+-- ========================================
+-- Migration 001: secondary indexes
+-- ========================================
+-- clubhub_db.sql only defines primary keys and a few unique keys.
+-- These indexes cover the WHERE / JOIN / ORDER BY columns used by the
+-- API blueprints. Verify with: python -m scripts.explain_guard
+
+USE ClubHub;
+
+-- Applied migrations are recorded here (one row per migration file)
+CREATE TABLE IF NOT EXISTS Schema_Migrations (
+   version INT PRIMARY KEY,
+   description VARCHAR(200) NOT NULL,
+   appliedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Events: upcoming/recent listings, per-club windows, monthly counts
+CREATE INDEX idx_events_start ON Events (startDateTime, eventID);
+CREATE INDEX idx_events_club_start ON Events (clubID, startDateTime);
+
+-- Students: demographic group-bys (year, major) read only the index
+CREATE INDEX idx_students_year_major ON Students (year, major);
+CREATE INDEX idx_students_major_year ON Students (major, year);
+
+-- Attendance: per-event check-ins, time windows, per-student windows
+CREATE INDEX idx_sea_event_time ON Students_Event_Attendees (eventID, timestamp, studentID);
+CREATE INDEX idx_sea_time_student ON Students_Event_Attendees (timestamp, studentID, eventID);
+CREATE INDEX idx_sea_student_time ON Students_Event_Attendees (studentID, timestamp);
+
+-- RSVPs: per-event summaries and per-student confirmed lists
+CREATE INDEX idx_rsvps_event_status ON RSVPs (eventID, status);
+CREATE INDEX idx_rsvps_event_time ON RSVPs (eventID, timestamp);
+CREATE INDEX idx_rsvps_student_status ON RSVPs (studentID, status, eventID);
+
+-- Invitations: inbox / outbox ordered by sentAt, accepted counts per window
+CREATE INDEX idx_invites_recipient_sent ON Event_Invitations (recipientStudentID, sentAt);
+CREATE INDEX idx_invites_sender_sent ON Event_Invitations (senderStudentID, sentAt);
+CREATE INDEX idx_invites_status_sent ON Event_Invitations (status, sentAt);
+
+-- Searches: 90-day windows grouped by query
+CREATE INDEX idx_searches_time_query ON Searches (timestamp, searchQuery);
+CREATE INDEX idx_ssr_search_result ON Searches_Search_Results (searchID, resultID);
+
+-- Audit logs: weekly report totals per action type
+CREATE INDEX idx_audit_action_time ON Audit_Logs (actionType, timestamp, userID, entityID);
+
+-- Admin views: recent event log, unresolved alerts
+CREATE INDEX idx_eventlog_time ON EventLog (logTimestamp);
+CREATE INDEX idx_alerts_solved ON Alerts (isSolved, alertID);
+
+-- Reports and rankings listings
+CREATE INDEX idx_reports_generated ON Engagement_Reports (generatedAt);
+CREATE INDEX idx_rankings_period ON Rankings (rankingYear, rankingQuarter, clubID);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(1, 'Secondary indexes for blueprint filters, joins and sort orders');
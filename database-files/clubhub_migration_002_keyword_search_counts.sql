@@ -0,0 +1,36 @@
+-- ========================================
+-- Migration 002: keyword search-frequency counters
+-- ========================================
+-- Search_Logs queries are tokenized once, when search telemetry writes
+-- them, and counted per keyword per day, so keyword popularity no
+-- longer needs a LIKE '%keyword%' scan of every search log row.
+-- Fill from existing logs with: python -m backend.keywords.backfill
+
+USE ClubHub;
+
+-- High-water marks for incremental ingest jobs (last source row processed)
+CREATE TABLE IF NOT EXISTS Ingest_Watermarks (
+   name VARCHAR(100) PRIMARY KEY,
+   lastID BIGINT NOT NULL DEFAULT 0,
+   updatedAt DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Searches per keyword per day
+CREATE TABLE Keyword_Search_Counts (
+   keywordID INT NOT NULL,
+   day DATE NOT NULL,
+   searchCount INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (keywordID, day),
+   INDEX idx_ksc_day (day, keywordID),
+   FOREIGN KEY (keywordID) REFERENCES Keywords(keywordID) ON DELETE CASCADE
+);
+
+-- All-time searches per keyword
+CREATE TABLE Keyword_Search_Totals (
+   keywordID INT PRIMARY KEY,
+   searchCount INT NOT NULL DEFAULT 0,
+   FOREIGN KEY (keywordID) REFERENCES Keywords(keywordID) ON DELETE CASCADE
+);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(2, 'Keyword search-frequency counters and ingest watermarks');
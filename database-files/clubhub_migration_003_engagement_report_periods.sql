@@ -0,0 +1,22 @@
+-- ========================================
+-- Migration 003: one engagement report per period
+-- ========================================
+-- Report generation upserts on (reportPeriodStart, reportPeriodEnd),
+-- so re-running a week replaces its row instead of duplicating it.
+-- Backfill past weeks with: python -m backend.analytics.reports --weeks N
+
+USE ClubHub;
+
+-- Keep only the newest row of any period that was generated twice
+DELETE older
+FROM Engagement_Reports older
+JOIN Engagement_Reports newer
+  ON newer.reportPeriodStart = older.reportPeriodStart
+ AND newer.reportPeriodEnd = older.reportPeriodEnd
+ AND newer.reportID > older.reportID;
+
+ALTER TABLE Engagement_Reports
+   ADD UNIQUE KEY uq_reports_period (reportPeriodStart, reportPeriodEnd);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(3, 'Unique report period on Engagement_Reports for idempotent report generation');
@@ -0,0 +1,34 @@
+-- ========================================
+-- Migration 004: per-event RSVP counters
+-- ========================================
+-- RSVP admission locks the event's counter row, compares
+-- confirmedCount with Events.capacity and confirms or waitlists in
+-- the same transaction, so concurrent RSVPs cannot oversell an event.
+-- Stress check: python -m scripts.rsvp_stress
+
+USE ClubHub;
+
+CREATE TABLE IF NOT EXISTS Event_RSVP_Counters (
+   eventID INT PRIMARY KEY,
+   confirmedCount INT NOT NULL DEFAULT 0,
+   waitlistCount INT NOT NULL DEFAULT 0,
+   FOREIGN KEY (eventID) REFERENCES Events(eventID) ON DELETE CASCADE
+);
+
+-- Oldest waitlisted RSVP of an event, for promotion on cancellation
+CREATE INDEX idx_rsvps_event_waitlist ON RSVPs (eventID, status, timestamp, rsvpID);
+
+INSERT INTO Event_RSVP_Counters (eventID, confirmedCount, waitlistCount)
+SELECT
+   e.eventID,
+   COALESCE(SUM(r.status = 'confirmed'), 0),
+   COALESCE(SUM(r.status = 'waitlisted'), 0)
+FROM Events e
+LEFT JOIN RSVPs r ON r.eventID = e.eventID
+GROUP BY e.eventID
+ON DUPLICATE KEY UPDATE
+   confirmedCount = VALUES(confirmedCount),
+   waitlistCount = VALUES(waitlistCount);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(4, 'Per-event RSVP counters for capacity-aware admission');
@@ -0,0 +1,41 @@
+-- ========================================
+-- Migration 005: generated keyword IDs, unique keyword text
+-- ========================================
+-- The keyword service resolves keyword text to IDs with one IN query
+-- and creates the missing ones with a single multi-row INSERT IGNORE,
+-- which needs Keywords.keywordID to be generated and keyword to be
+-- unique.
+
+USE ClubHub;
+
+-- Fold keywords that share the same text onto the lowest ID
+CREATE TEMPORARY TABLE Keyword_Duplicates AS
+SELECT k.keywordID AS duplicateID, keep.keywordID AS keepID
+FROM Keywords k
+JOIN (
+   SELECT keyword, MIN(keywordID) AS keywordID
+   FROM Keywords
+   GROUP BY keyword
+) keep ON keep.keyword = k.keyword AND keep.keywordID <> k.keywordID;
+
+INSERT IGNORE INTO Events_Event_Keywords (eventID, keywordID)
+SELECT eek.eventID, d.keepID
+FROM Events_Event_Keywords eek
+JOIN Keyword_Duplicates d ON eek.keywordID = d.duplicateID;
+
+-- cascades to their event tags and search counters; the kept keyword's
+-- counters pick the searches up again on the next full backfill
+DELETE k FROM Keywords k
+JOIN Keyword_Duplicates d ON k.keywordID = d.duplicateID;
+
+DROP TEMPORARY TABLE Keyword_Duplicates;
+
+-- keywordID is referenced by foreign keys, which block MODIFY otherwise
+SET FOREIGN_KEY_CHECKS = 0;
+ALTER TABLE Keywords
+   MODIFY keywordID INT NOT NULL AUTO_INCREMENT,
+   ADD UNIQUE KEY uq_keywords_keyword (keyword);
+SET FOREIGN_KEY_CHECKS = 1;
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(5, 'Auto-increment keyword IDs and unique keyword text');
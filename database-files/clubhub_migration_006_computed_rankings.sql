@@ -0,0 +1,32 @@
+-- ========================================
+-- Migration 006: computed quarterly rankings
+-- ========================================
+-- The ranking job (backend/clubs/rankings.py) upserts one row per
+-- (rankingType, rankingYear, rankingQuarter, clubID) with its score,
+-- its position and the numbers the score came from. The unique key
+-- also serves GET /clubs/rankings, which reads one quarter at a time.
+-- Compute past quarters with: python -m backend.clubs.rankings --quarters N
+
+USE ClubHub;
+
+-- Keep only the newest row of any club/quarter/type that appears twice
+DELETE older
+FROM Rankings older
+JOIN Rankings newer
+  ON newer.clubID = older.clubID
+ AND newer.rankingType <=> older.rankingType
+ AND newer.rankingYear <=> older.rankingYear
+ AND newer.rankingQuarter <=> older.rankingQuarter
+ AND newer.rankID > older.rankID;
+
+ALTER TABLE Rankings
+   ADD COLUMN rankPosition INT,
+   ADD COLUMN attendanceCount INT,
+   ADD COLUMN rsvpCount INT,
+   ADD COLUMN newMembers INT,
+   ADD COLUMN avgRating DECIMAL(3,2),
+   ADD COLUMN computedAt DATETIME,
+   ADD UNIQUE KEY uq_rankings_period (rankingType, rankingYear, rankingQuarter, clubID);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(6, 'Computed quarterly rankings: unique period key, position and score inputs');
@@ -0,0 +1,13 @@
+-- ========================================
+-- Migration 007: index Events.lastUpdated
+-- ========================================
+-- The in-process event search index polls for events edited since its
+-- last check (WHERE lastUpdated >= ?); without this index every poll
+-- scans the whole Events table.
+
+USE ClubHub;
+
+CREATE INDEX idx_events_last_updated ON Events (lastUpdated);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(7, 'Index Events.lastUpdated for incremental search index refresh');
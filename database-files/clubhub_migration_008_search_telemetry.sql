@@ -0,0 +1,28 @@
+-- ========================================
+-- Migration 008: search telemetry
+-- ========================================
+-- /events/search now records every search in Searches, the events it
+-- showed in Searches_Search_Results and their impressions and clicks in
+-- Search_Result (one row per event). Rows are written in batches by the
+-- API (backend/events/telemetry.py), which needs to know IDs before it
+-- inserts: Searches.searchID and Search_Result.resultID are not
+-- AUTO_INCREMENT, so IDs are handed out in blocks from ID_Sequences.
+
+USE ClubHub;
+
+CREATE TABLE IF NOT EXISTS ID_Sequences (
+   name VARCHAR(64) PRIMARY KEY,
+   nextID INT NOT NULL
+);
+
+INSERT INTO ID_Sequences (name, nextID)
+SELECT 'Searches', COALESCE(MAX(searchID), 0) + 1 FROM Searches;
+
+INSERT INTO ID_Sequences (name, nextID)
+SELECT 'Search_Result', COALESCE(MAX(resultID), 0) + 1 FROM Search_Result;
+
+-- Impressions and clicks are counted per event
+ALTER TABLE Search_Result ADD UNIQUE KEY uq_search_result_event (eventID);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(8, 'ID sequences and one Search_Result row per event for search telemetry');
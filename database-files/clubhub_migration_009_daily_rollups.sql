@@ -0,0 +1,123 @@
+-- ========================================
+-- Migration 009: activity rollups
+-- ========================================
+-- Check-ins, RSVPs and searches summed per day (and per hour for
+-- events), so windowed analytics add up days x groups rows instead of
+-- re-aggregating raw rows on every request. The check-in, RSVP and
+-- search telemetry transactions add their own changes (see
+-- backend/analytics/rollups.py); the rollups are seeded here from the
+-- existing rows. Cancelled RSVPs and rows without a timestamp are not
+-- counted. Recount after a bulk import with:
+--     python -m backend.analytics.rollups --rebuild
+
+USE ClubHub;
+
+-- Check-ins and RSVPs per event per day (by the check-in / RSVP time)
+CREATE TABLE IF NOT EXISTS Rollup_Event_Daily (
+   day DATE NOT NULL,
+   eventID INT NOT NULL,
+   clubID INT,
+   attendance INT NOT NULL DEFAULT 0,
+   rsvps INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (day, eventID),
+   INDEX idx_red_event (eventID, day)
+);
+
+-- The same per hour, for rolling windows that do not start at midnight
+CREATE TABLE IF NOT EXISTS Rollup_Event_Hourly (
+   hour DATETIME NOT NULL,
+   eventID INT NOT NULL,
+   clubID INT,
+   attendance INT NOT NULL DEFAULT 0,
+   rsvps INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (hour, eventID),
+   INDEX idx_reh_event (eventID, hour)
+);
+
+-- Check-ins per student year, major and club category per day.
+-- Unknown values are stored as 0 / '' (they are part of the key).
+CREATE TABLE IF NOT EXISTS Rollup_Demographic_Daily (
+   day DATE NOT NULL,
+   year INT NOT NULL DEFAULT 0,
+   major VARCHAR(100) NOT NULL DEFAULT '',
+   categoryID INT NOT NULL DEFAULT 0,
+   attendance INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (day, year, major, categoryID)
+);
+
+-- Searches per query per day, and how many of them showed no results
+CREATE TABLE IF NOT EXISTS Rollup_Search_Daily (
+   day DATE NOT NULL,
+   searchQuery VARCHAR(255) NOT NULL,
+   searches INT NOT NULL DEFAULT 0,
+   noResults INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (day, searchQuery)
+);
+
+INSERT INTO Rollup_Event_Daily (day, eventID, clubID, attendance, rsvps)
+SELECT day, eventID, MAX(clubID), SUM(attendance), SUM(rsvps)
+FROM (
+   SELECT DATE(sea.timestamp) AS day, sea.eventID, e.clubID, 1 AS attendance, 0 AS rsvps
+   FROM Students_Event_Attendees sea
+   JOIN Events e ON e.eventID = sea.eventID
+   WHERE sea.timestamp IS NOT NULL
+   UNION ALL
+   SELECT DATE(r.timestamp), r.eventID, e.clubID, 0, 1
+   FROM RSVPs r
+   JOIN Events e ON e.eventID = r.eventID
+   WHERE r.timestamp IS NOT NULL AND r.status <> 'cancelled'
+) activity
+GROUP BY day, eventID
+ON DUPLICATE KEY UPDATE
+   attendance = VALUES(attendance),
+   rsvps = VALUES(rsvps);
+
+INSERT INTO Rollup_Event_Hourly (hour, eventID, clubID, attendance, rsvps)
+SELECT hour, eventID, MAX(clubID), SUM(attendance), SUM(rsvps)
+FROM (
+   SELECT DATE_FORMAT(sea.timestamp, '%Y-%m-%d %H:00:00') AS hour, sea.eventID, e.clubID,
+          1 AS attendance, 0 AS rsvps
+   FROM Students_Event_Attendees sea
+   JOIN Events e ON e.eventID = sea.eventID
+   WHERE sea.timestamp IS NOT NULL
+   UNION ALL
+   SELECT DATE_FORMAT(r.timestamp, '%Y-%m-%d %H:00:00'), r.eventID, e.clubID, 0, 1
+   FROM RSVPs r
+   JOIN Events e ON e.eventID = r.eventID
+   WHERE r.timestamp IS NOT NULL AND r.status <> 'cancelled'
+) activity
+GROUP BY hour, eventID
+ON DUPLICATE KEY UPDATE
+   attendance = VALUES(attendance),
+   rsvps = VALUES(rsvps);
+
+INSERT INTO Rollup_Demographic_Daily (day, year, major, categoryID, attendance)
+SELECT
+   DATE(sea.timestamp),
+   COALESCE(s.year, 0),
+   COALESCE(s.major, ''),
+   COALESCE(c.categoryID, 0),
+   COUNT(*)
+FROM Students_Event_Attendees sea
+JOIN Events e ON e.eventID = sea.eventID
+LEFT JOIN Clubs c ON c.clubID = e.clubID
+LEFT JOIN Students s ON s.studentID = sea.studentID
+WHERE sea.timestamp IS NOT NULL
+GROUP BY DATE(sea.timestamp), COALESCE(s.year, 0), COALESCE(s.major, ''), COALESCE(c.categoryID, 0)
+ON DUPLICATE KEY UPDATE attendance = VALUES(attendance);
+
+INSERT INTO Rollup_Search_Daily (day, searchQuery, searches, noResults)
+SELECT
+   DATE(s.timestamp),
+   COALESCE(s.searchQuery, ''),
+   COUNT(*),
+   SUM(NOT EXISTS (SELECT 1 FROM Searches_Search_Results ssr WHERE ssr.searchID = s.searchID))
+FROM Searches s
+WHERE s.timestamp IS NOT NULL
+GROUP BY DATE(s.timestamp), COALESCE(s.searchQuery, '')
+ON DUPLICATE KEY UPDATE
+   searches = VALUES(searches),
+   noResults = VALUES(noResults);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(9, 'Daily and hourly activity rollups');
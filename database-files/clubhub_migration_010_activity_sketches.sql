@@ -0,0 +1,25 @@
+-- ========================================
+-- Migration 010: active-student sketches
+-- ========================================
+-- One HyperLogLog sketch per day of the students who checked in:
+-- overall (scopeKey ''), per club (scopeKey = clubID) and per major.
+-- A sketch is 4096 one-byte registers, zlib-compressed, so a quiet
+-- club-day is a few dozen bytes. Distinct students over any window are
+-- estimated by merging the window's day sketches (about 1.6% standard
+-- error); see backend/analytics/sketches.py. Updated on check-in; fill
+-- from existing check-ins with:
+--     python -m backend.analytics.sketches --rebuild
+
+USE ClubHub;
+
+CREATE TABLE IF NOT EXISTS Activity_Sketches (
+   day DATE NOT NULL,
+   scope ENUM('all', 'club', 'major') NOT NULL,
+   scopeKey VARCHAR(100) NOT NULL DEFAULT '',
+   sketch BLOB NOT NULL,
+   PRIMARY KEY (day, scope, scopeKey),
+   INDEX idx_sketch_scope (scope, scopeKey, day)
+);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(10, 'Per-day HyperLogLog sketches of active students');
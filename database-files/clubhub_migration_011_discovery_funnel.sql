@@ -0,0 +1,43 @@
+-- ========================================
+-- Migration 011: discovery funnel
+-- ========================================
+-- Search_Result only keeps a click total per event, so clicks are now
+-- also logged one row each (written in batches by the search
+-- telemetry). backend/analytics/funnel.py follows each student from a
+-- search that showed an event, to a click on it, an RSVP and a
+-- check-in, and stores the day's stage counts per event and search
+-- query in Funnel_Daily. Ingest_Watermarks 'funnel_days' holds
+-- TO_DAYS() of the last finished day. Fill past days with:
+--     python -m backend.analytics.funnel --from 2025-09-01
+
+USE ClubHub;
+
+CREATE TABLE IF NOT EXISTS Search_Clicks (
+   clickID INT PRIMARY KEY AUTO_INCREMENT,
+   timestamp DATETIME NOT NULL,
+   eventID INT NOT NULL,
+   studentID INT,
+   INDEX idx_search_clicks_time (timestamp)
+);
+
+-- Stage counts by the day each stage happened, attributed to the
+-- search query that started the student's journey to the event
+CREATE TABLE IF NOT EXISTS Funnel_Daily (
+   day DATE NOT NULL,
+   eventID INT NOT NULL,
+   keyword VARCHAR(255) NOT NULL,
+   clubID INT,
+   impressions INT NOT NULL DEFAULT 0,
+   clicks INT NOT NULL DEFAULT 0,
+   rsvps INT NOT NULL DEFAULT 0,
+   checkins INT NOT NULL DEFAULT 0,
+   PRIMARY KEY (day, eventID, keyword)
+);
+
+-- the funnel reads RSVPs in time order
+CREATE INDEX idx_rsvps_time ON RSVPs (timestamp);
+
+INSERT IGNORE INTO Ingest_Watermarks (name, lastID) VALUES ('funnel_days', 0);
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(11, 'Search click log and daily discovery funnel');
@@ -0,0 +1,18 @@
+-- ========================================
+-- Migration 012: exact sketch scope keys
+-- ========================================
+-- scopeKey compared case- and accent-insensitively, so a major spelled
+-- differently from the stored one matched its row in SQL but not in the
+-- Python lookup, and its sketch was overwritten. Keys are now compared
+-- byte for byte; majors are stored in lowercase and the overall sketch
+-- is split into shards (see backend/analytics/sketches.py). Rebuild the
+-- sketches once after applying:
+--     python -m backend.analytics.sketches --rebuild
+
+USE ClubHub;
+
+ALTER TABLE Activity_Sketches
+   MODIFY scopeKey VARCHAR(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL DEFAULT '';
+
+INSERT INTO Schema_Migrations (version, description) VALUES
+(12, 'Binary sketch scope keys');